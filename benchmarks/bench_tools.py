@@ -0,0 +1,307 @@
+"""
+Benchmark every MCP tool against the in-process stub backend.
+
+Tools are called through an in-memory MCP client, so the numbers include
+middleware, argument validation and result serialization. No backend or
+network is needed.
+
+Usage:
+    uv run python benchmarks/bench_tools.py
+    uv run python benchmarks/bench_tools.py --concurrency 32 --calls 500 --latency 0.005
+    uv run python benchmarks/bench_tools.py --tools get_order_snapshot get_orders_summary
+    uv run python benchmarks/bench_tools.py --output after.json --compare before.json
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import platform
+import random
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List, Optional
+
+from fastmcp import Client
+
+from backend_mcp.client import client
+from backend_mcp.config import settings
+from backend_mcp.metrics import percentile
+from backend_mcp.server import mcp
+from backend_mcp.stub_backend import create_stub_app, stub_transport
+from backend_mcp.tools import orders_tool
+
+# -----Arguments for one call of each tool (rng, number of orders) -> kwargs
+Scenario = Callable[[random.Random, int], Dict[str, Any]]
+
+SCENARIOS: Dict[str, Scenario] = {
+    # -----Menu tools
+    "get_menu_items": lambda rng, n: {"category": rng.choice(["appetizer", "main_course", "dessert"])},
+    "get_menu_item_details": lambda rng, n: {"item_id": rng.randint(1, 60)},
+    "create_menu_item": lambda rng, n: {"name": "Bench", "price": 9.5, "category": "side"},
+    "update_menu_item": lambda rng, n: {"item_id": rng.randint(1, 60), "price": 11.0},
+
+    # -----Order tools
+    "create_order": lambda rng, n: {
+        "customer_id": rng.randint(1, 50), "order_type": "dine_in",
+        "items": [{"menu_item_id": rng.randint(1, 60), "quantity": 1}],
+    },
+    "get_order_details": lambda rng, n: {"order_id": rng.randint(1, n)},
+    "get_customer_orders": lambda rng, n: {"customer_id": rng.randint(1, 50)},
+    "get_orders_by_status": lambda rng, n: {"status": rng.choice(["pending", "delivered"])},
+    "update_order_status": lambda rng, n: {"order_id": rng.randint(1, n), "status": "ready"},
+    "get_order_journey": lambda rng, n: {"order_id": rng.randint(1, n)},
+    "get_order_snapshot": lambda rng, n: {"order_id": rng.randint(1, n)},
+    "get_orders_details_batch": lambda rng, n: {"order_ids": rng.sample(range(1, n + 1), 10)},
+    "get_orders_journey_batch": lambda rng, n: {"order_ids": rng.sample(range(1, n + 1), 10)},
+    "get_filtered_orders": lambda rng, n: {"status": "pending", "min_amount": 50.0, "limit": 50},
+    "get_orders_summary": lambda rng, n: {"order_type": "delivery"},
+
+    # -----Customer tools
+    "register_customer": lambda rng, n: {
+        "email": "bench@example.com", "first_name": "Bench", "last_name": "Mark", "password": "secret",
+    },
+    "get_customer_profile": lambda rng, n: {"customer_id": rng.randint(1, 50)},
+    "update_customer_profile": lambda rng, n: {"customer_id": rng.randint(1, 50), "phone": "555"},
+    "customer_login": lambda rng, n: {"email": "bench@example.com", "password": "secret"},
+
+    # -----Promo tools
+    "apply_promo_code": lambda rng, n: {"promo_code": "PROMO1", "order_amount": 42.0},
+    "get_promo_details": lambda rng, n: {"promo_id": rng.randint(1, 20)},
+
+    # -----Review tools
+    "get_order_reviews": lambda rng, n: {"order_id": rng.randint(1, n)},
+    "get_orders_reviews_batch": lambda rng, n: {"order_ids": rng.sample(range(1, n + 1), 10)},
+    "create_review": lambda rng, n: {"customer_id": 1, "rating": 5, "order_id": rng.randint(1, n)},
+
+    # -----Analytics tools
+    "get_dashboard_stats": lambda rng, n: {},
+    "get_popular_items": lambda rng, n: {"limit": 10},
+    "get_revenue_stats": lambda rng, n: {"start_date": "2026-01-01", "end_date": "2026-06-30"},
+
+    # -----Staff tools
+    "staff_login": lambda rng, n: {"email": "staff@example.com", "password": "secret"},
+
+    # -----Health tools
+    "check_backend_health": lambda rng, n: {},
+}
+
+
+async def run_tool(
+    mcp_client: Client,
+    tool: str,
+    calls: int,
+    concurrency: int,
+    orders: int,
+    seed: int,
+) -> Dict[str, Any]:
+
+    """
+    Call `tool` `calls` times with `concurrency` calls in flight.
+
+    Returns:
+        Throughput, latency percentiles (ms) and error count
+    """
+
+    rng = random.Random(seed)
+    arguments = [SCENARIOS[tool](rng, orders) for _ in range(calls)]
+    latencies: List[float] = []
+    errors = 0
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def call(kwargs: Dict[str, Any]) -> None:
+        nonlocal errors
+        async with semaphore:
+            started = time.perf_counter()
+            result = await mcp_client.call_tool(tool, kwargs, raise_on_error=False)
+            latencies.append(time.perf_counter() - started)
+            if result.is_error:
+                errors += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*[call(kwargs) for kwargs in arguments])
+    elapsed = time.perf_counter() - started
+
+    ordered = sorted(latencies)
+    return {
+        "calls": calls,
+        "errors": errors,
+        "elapsed_s": round(elapsed, 4),
+        "throughput_rps": round(calls / elapsed, 2) if elapsed else 0.0,
+        "mean_ms": round(sum(ordered) / len(ordered) * 1000, 3),
+        "p50_ms": round(percentile(ordered, 50) * 1000, 3),
+        "p95_ms": round(percentile(ordered, 95) * 1000, 3),
+        "p99_ms": round(percentile(ordered, 99) * 1000, 3),
+    }
+
+
+async def measure_allocations(
+    mcp_client: Client,
+    tool: str,
+    calls: int,
+    orders: int,
+    seed: int,
+) -> Dict[str, Any]:
+
+    """
+    Memory allocated by sequential calls of `tool`, traced with tracemalloc.
+
+    Measured in a separate pass because tracing slows everything down.
+    """
+
+    rng = random.Random(seed)
+    arguments = [SCENARIOS[tool](rng, orders) for _ in range(calls)]
+
+    tracemalloc.start()
+    try:
+        before, _ = tracemalloc.get_traced_memory()
+        tracemalloc.reset_peak()
+        for kwargs in arguments:
+            await mcp_client.call_tool(tool, kwargs, raise_on_error=False)
+        after, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return {
+        "alloc_peak_kb": round((peak - before) / 1024, 1),
+        "alloc_retained_kb": round((after - before) / 1024, 1),
+    }
+
+
+async def run_benchmarks(
+    tools: Optional[List[str]] = None,
+    calls: int = 200,
+    concurrency: int = 16,
+    warmup: int = 10,
+    alloc_calls: int = 20,
+    latency: float = 0.0,
+    jitter: float = 0.0,
+    orders: int = 1000,
+    description_size: int = 64,
+    seed: int = 0,
+) -> Dict[str, Any]:
+
+    """Benchmark `tools` (all by default) and return a JSON-serializable report"""
+
+    tools = tools or list(SCENARIOS)
+    unknown = sorted(set(tools) - set(SCENARIOS))
+    if unknown:
+        raise ValueError(f"No benchmark scenario for: {', '.join(unknown)}")
+
+    app = create_stub_app(latency=latency, jitter=jitter, seed=seed, orders=orders,
+                          description_size=description_size)
+
+    # -----Point the shared backend client at the stub app
+    await client.use_transport(stub_transport(app))
+    orders_tool.reset_supported_filters()
+
+    results: Dict[str, Any] = {}
+    async with Client(mcp) as mcp_client:
+        for tool in tools:
+            for kwargs in [SCENARIOS[tool](random.Random(seed), orders)] * warmup:
+                await mcp_client.call_tool(tool, kwargs, raise_on_error=False)
+
+            results[tool] = await run_tool(mcp_client, tool, calls, concurrency, orders, seed)
+            if alloc_calls:
+                results[tool].update(await measure_allocations(mcp_client, tool, alloc_calls, orders, seed))
+            print(_format_row(tool, results[tool]), file=sys.stderr)
+
+    await client.aclose()
+    return {
+        "meta": {
+            "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "calls": calls,
+            "concurrency": concurrency,
+            "stub": {"latency": latency, "jitter": jitter, "orders": orders,
+                     "description_size": description_size, "seed": seed},
+            "settings": {"cache_enabled": settings.cache_enabled,
+                         "singleflight_enabled": settings.singleflight_enabled,
+                         "hedge_enabled": settings.hedge_enabled},
+        },
+        "results": results,
+    }
+
+
+def compare(report: Dict[str, Any], baseline: Dict[str, Any], threshold: float) -> List[str]:
+
+    """
+    Tools whose p95 latency or throughput got worse than `threshold` (a fraction)
+    compared to `baseline`.
+    """
+
+    regressions = []
+    for tool, current in report["results"].items():
+        previous = baseline.get("results", {}).get(tool)
+        if previous is None:
+            continue
+        if previous["p95_ms"] and current["p95_ms"] > previous["p95_ms"] * (1 + threshold):
+            regressions.append(f"{tool}: p95 {previous['p95_ms']}ms -> {current['p95_ms']}ms")
+        if current["throughput_rps"] < previous["throughput_rps"] * (1 - threshold):
+            regressions.append(
+                f"{tool}: throughput {previous['throughput_rps']}/s -> {current['throughput_rps']}/s"
+            )
+    return regressions
+
+
+def _format_row(tool: str, result: Dict[str, Any]) -> str:
+    alloc = f"  peak {result['alloc_peak_kb']:>8.1f} KB" if "alloc_peak_kb" in result else ""
+    return (
+        f"{tool:<28} {result['throughput_rps']:>9.1f}/s  "
+        f"p50 {result['p50_ms']:>8.2f}  p95 {result['p95_ms']:>8.2f}  p99 {result['p99_ms']:>8.2f} ms  "
+        f"errors {result['errors']}{alloc}"
+    )
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark MCP tools against the stub backend")
+    parser.add_argument("--tools", nargs="*", help="Tools to benchmark (default: all)")
+    parser.add_argument("--calls", type=int, default=200, help="Calls per tool")
+    parser.add_argument("--concurrency", type=int, default=16, help="Calls in flight per tool")
+    parser.add_argument("--warmup", type=int, default=10, help="Untimed calls per tool")
+    parser.add_argument("--alloc-calls", type=int, default=20, help="Calls traced for allocations (0 disables)")
+    parser.add_argument("--latency", type=float, default=0.0, help="Stub backend latency in seconds")
+    parser.add_argument("--jitter", type=float, default=0.0, help="Extra random stub latency in seconds")
+    parser.add_argument("--orders", type=int, default=1000, help="Orders in the stub backend")
+    parser.add_argument("--description-size", type=int, default=64, help="Bytes of filler text per record")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="Write the JSON report to this file")
+    parser.add_argument("--compare", help="Baseline JSON report to compare against")
+    parser.add_argument("--threshold", type=float, default=0.1, help="Allowed regression (fraction)")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.ERROR, stream=sys.stderr)
+    report = asyncio.run(run_benchmarks(
+        tools=args.tools,
+        calls=args.calls,
+        concurrency=args.concurrency,
+        warmup=args.warmup,
+        alloc_calls=args.alloc_calls,
+        latency=args.latency,
+        jitter=args.jitter,
+        orders=args.orders,
+        description_size=args.description_size,
+        seed=args.seed,
+    ))
+
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+    else:
+        print(text)
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            regressions = compare(report, json.load(f), args.threshold)
+        for line in regressions:
+            print(f"REGRESSION {line}", file=sys.stderr)
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,332 @@
+"""Local order analytics: incremental, columnar aggregates built from /orders/filter"""
+
+import asyncio
+import contextvars
+import logging
+import time
+from array import array
+from bisect import bisect_left, bisect_right
+from collections import Counter
+from datetime import date
+from itertools import groupby
+from typing import Any, AsyncIterator, Callable, Dict, List, Mapping, Optional, Tuple
+
+from .config import settings
+
+logger = logging.getLogger(__name__)
+
+OrderSource = Callable[..., AsyncIterator[Dict[str, Any]]]
+# -----(day ordinal or None, status, amount, ((menu_item_id, quantity), ...))
+Entry = Tuple[Optional[int], str, float, Tuple[Tuple[Any, int], ...]]
+
+PENDING_STATUS = "pending"
+COMPLETED_STATUS = "delivered"
+
+
+def _period(group_by: str) -> Callable[[int], str]:
+
+    """Label function turning a day ordinal into its day / week / month / year period"""
+
+    if group_by == "week":
+        def label(day: int) -> str:
+            year, week, _ = date.fromordinal(day).isocalendar()
+            return f"{year}-W{week:02d}"
+        return label
+
+    width = {"day": 10, "month": 7, "year": 4}.get(group_by, 10)
+    return lambda day: date.fromordinal(day).isoformat()[:width]
+
+
+def _day(order: Dict[str, Any]) -> Optional[int]:
+    try:
+        return date.fromisoformat(str(order.get("created_at") or "")[:10]).toordinal()
+    except ValueError:
+        return None
+
+
+def _items(order: Dict[str, Any]) -> Tuple[Tuple[Any, int], ...]:
+    quantities: Counter = Counter()
+    for item in order.get("items") or ():
+        if item.get("menu_item_id") is not None:
+            quantities[item["menu_item_id"]] += int(item.get("quantity") or 0)
+    return tuple(sorted(quantities.items()))
+
+
+class OrderAnalytics:
+
+    """
+    In-memory aggregates over every order, kept up to date incrementally.
+
+    Per-day revenue and order counts are stored as sorted columns (array
+    of day ordinals with parallel revenue and count arrays), so a date
+    range is two bisects and a slice sum. Item quantities and order counts
+    are kept per day for sliding windows, order counts per day and status,
+    and order counts and totals per status. Each order's last
+    contribution is remembered, so an order seen again (status change,
+    amended total) replaces its old numbers instead of double counting.
+    """
+
+    def __init__(self):
+        self._orders: Dict[Any, Entry] = {}
+        self._days = array("l")
+        self._revenue = array("d")
+        self._counts = array("l")
+        self._items: Dict[int, Counter] = {}
+        self._item_orders: Dict[int, Counter] = {}
+        self._day_status: Dict[int, Counter] = {}
+        self._status: Counter = Counter()
+        self._status_amount: Dict[str, float] = {}
+
+        self.refreshed_at: Optional[float] = None
+        self.full_refreshed_at: Optional[float] = None
+        self._synced_day: Optional[int] = None
+        self._refreshing: Optional[asyncio.Future] = None
+
+    def __len__(self) -> int:
+        return len(self._orders)
+
+    # -----Incremental updates
+
+    def upsert(self, order: Dict[str, Any]) -> bool:
+
+        """
+        Add or replace one order's contribution.
+
+        Returns:
+            True if the aggregates changed
+        """
+
+        entry: Entry = (
+            _day(order),
+            str(order.get("status")),
+            float(order.get("final_amount") or 0),
+            _items(order),
+        )
+        order_id = order.get("id")
+        previous = self._orders.get(order_id)
+        if previous == entry:
+            return False
+        if previous is not None:
+            self._apply(previous, -1)
+        self._orders[order_id] = entry
+        self._apply(entry, 1)
+        return True
+
+    def set_status(self, order_id: Any, status: str) -> bool:
+
+        """
+        Move a known order to a new status, keeping its day, amount and items.
+
+        Returns:
+            True if the aggregates changed
+        """
+
+        previous = self._orders.get(order_id)
+        if previous is None or previous[1] == status:
+            return False
+        day, _, amount, items = previous
+        self._apply(previous, -1)
+        self._orders[order_id] = (day, status, amount, items)
+        self._apply(self._orders[order_id], 1)
+        return True
+
+    def remove(self, order_id: Any) -> None:
+        previous = self._orders.pop(order_id, None)
+        if previous is not None:
+            self._apply(previous, -1)
+
+    def _apply(self, entry: Entry, sign: int) -> None:
+        day, status, amount, items = entry
+        self._status[status] += sign
+        self._status_amount[status] = self._status_amount.get(status, 0.0) + sign * amount
+        if not self._status[status]:
+            del self._status[status]
+            del self._status_amount[status]
+        if day is None:
+            return
+
+        index = bisect_left(self._days, day)
+        if index == len(self._days) or self._days[index] != day:
+            self._days.insert(index, day)
+            self._revenue.insert(index, 0.0)
+            self._counts.insert(index, 0)
+        self._revenue[index] += sign * amount
+        self._counts[index] += sign
+
+        statuses = self._day_status.setdefault(day, Counter())
+        statuses[status] += sign
+        if not statuses[status]:
+            del statuses[status]
+
+        quantities = self._items.setdefault(day, Counter())
+        orders = self._item_orders.setdefault(day, Counter())
+        for menu_item_id, quantity in items:
+            quantities[menu_item_id] += sign * quantity
+            orders[menu_item_id] += sign
+            if not orders[menu_item_id]:
+                del orders[menu_item_id]
+                del quantities[menu_item_id]
+
+    # -----Loading from the backend
+
+    async def refresh(self, source: OrderSource, full: bool = False) -> int:
+
+        """
+        Pull orders through `source` (iter_filtered_orders) and fold them in.
+
+        A full refresh streams every order and drops orders that are gone.
+        Otherwise only orders created in the last ANALYTICS_LOOKBACK_DAYS
+        are pulled, which catches new orders and status changes of recent ones.
+        Status changes of older orders made through this server are applied
+        by the order tools right away; other changes to them wait for the
+        next full refresh.
+
+        Returns:
+            Number of orders whose aggregates changed
+        """
+
+        full = full or self._synced_day is None or not settings.analytics_lookback_days
+        start_date = None
+        if not full:
+            start_date = date.fromordinal(self._synced_day - settings.analytics_lookback_days).isoformat()
+
+        today = date.today().toordinal()
+        changed = 0
+        seen = set()
+        orders = source(start_date=start_date)
+        try:
+            async for order in orders:
+                seen.add(order.get("id"))
+                changed += self.upsert(order)
+        finally:
+            await orders.aclose()
+
+        now = time.monotonic()
+        if full:
+            for order_id in [order_id for order_id in self._orders if order_id not in seen]:
+                self.remove(order_id)
+                changed += 1
+            self.full_refreshed_at = now
+        self.refreshed_at = now
+        self._synced_day = today
+        logger.debug(
+            f"Analytics refreshed ({'full' if full else 'incremental'}): {changed} orders changed",
+            extra={"event": "analytics.refresh", "changed": changed, "orders": len(self._orders)},
+        )
+        return changed
+
+    async def ensure_fresh(self, source: OrderSource) -> None:
+
+        """
+        Make sure there is data to answer from.
+
+        The first call waits for a full load. Afterwards stale aggregates are
+        answered from immediately while one refresh runs in the background.
+        """
+
+        if self.refreshed_at is None:
+            await asyncio.shield(self._start_refresh(source, full=True))
+            return
+
+        now = time.monotonic()
+        if now - self.refreshed_at < settings.analytics_refresh_interval:
+            return
+        full = now - (self.full_refreshed_at or 0) >= settings.analytics_full_refresh_interval
+        self._start_refresh(source, full=full)
+
+    def _start_refresh(self, source: OrderSource, full: bool) -> asyncio.Future:
+        if self._refreshing is None or self._refreshing.done():
+            # -----Fresh context: the refresh outlives the tool call and must not inherit its deadline
+            self._refreshing = asyncio.get_running_loop().create_task(
+                self.refresh(source, full=full), context=contextvars.Context()
+            )
+            self._refreshing.add_done_callback(self._refresh_done)
+        return self._refreshing
+
+    @staticmethod
+    def _refresh_done(task: asyncio.Future) -> None:
+        if not task.cancelled() and task.exception() is not None:
+            logger.warning(f"Analytics refresh failed: {task.exception()}")
+
+    # -----Queries (same shapes as the backend /orders/stats/* endpoints)
+
+    def dashboard(self, today: Optional[date] = None) -> Dict[str, Any]:
+
+        """Today's orders and revenue, plus pending and completed counts and totals"""
+
+        day = (today or date.today()).toordinal()
+        index = bisect_left(self._days, day)
+        count, revenue = 0, 0.0
+        if index < len(self._days) and self._days[index] == day:
+            count, revenue = self._counts[index], self._revenue[index]
+
+        return {
+            "todays_orders_count": count,
+            "todays_revenue": round(revenue, 2),
+            "pending_orders_count": self._status[PENDING_STATUS],
+            "completed_today_count": self._day_status.get(day, Counter())[COMPLETED_STATUS],
+            "average_order_value": round(revenue / count, 2) if count else 0.0,
+            "pending_orders_total": round(self._status_amount.get(PENDING_STATUS, 0.0), 2),
+            "completed_orders_total": round(self._status_amount.get(COMPLETED_STATUS, 0.0), 2),
+        }
+
+    def popular_items(
+        self,
+        limit: int = 10,
+        days: int = 1,
+        names: Optional[Mapping[Any, str]] = None,
+        today: Optional[date] = None,
+    ) -> List[Dict[str, Any]]:
+
+        """
+        Most ordered menu items over the last `days` days (today included).
+
+        Args:
+            limit: Number of items to return
+            days: Window length in days
+            names: Menu item names by ID
+            today: Last day of the window (defaults to today)
+
+        Returns:
+            Items ranked by total quantity, then by number of orders
+        """
+
+        end = (today or date.today()).toordinal()
+        lo = bisect_left(self._days, end - max(days, 1) + 1)
+        hi = bisect_right(self._days, end)
+
+        quantities: Counter = Counter()
+        orders: Counter = Counter()
+        for day in self._days[lo:hi]:
+            quantities.update(self._items.get(day, ()))
+            orders.update(self._item_orders.get(day, ()))
+
+        ranked = sorted(orders, key=lambda item_id: (-quantities[item_id], -orders[item_id], item_id))
+        return [
+            {
+                "rank": rank,
+                "menu_item_id": menu_item_id,
+                "menu_item_name": (names or {}).get(menu_item_id),
+                "order_count": orders[menu_item_id],
+                "total_quantity": quantities[menu_item_id],
+            }
+            for rank, menu_item_id in enumerate(ranked[:limit], 1)
+        ]
+
+    def revenue(self, start_date: str, end_date: str, group_by: str = "day") -> List[Dict[str, Any]]:
+
+        """Revenue per day / week / month / year between two dates (inclusive)"""
+
+        lo = bisect_left(self._days, date.fromisoformat(start_date[:10]).toordinal())
+        hi = bisect_right(self._days, date.fromisoformat(end_date[:10]).toordinal())
+        label = _period(group_by)
+
+        rows = zip(self._days[lo:hi], self._revenue[lo:hi], self._counts[lo:hi])
+        return [
+            {"period": period, "revenue": round(sum(revenue for _, revenue, _ in group), 2)}
+            for period, group in groupby((row for row in rows if row[2]), key=lambda row: label(row[0]))
+        ]
+
+
+# -----Global engine used by the analytics tools in local mode
+order_analytics = OrderAnalytics()
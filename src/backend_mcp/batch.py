@@ -0,0 +1,79 @@
+"""Bounded concurrent fan-out for batch tools"""
+
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Hashable, Iterable, List, Optional
+
+import httpx
+
+from .config import settings
+from .resilience import CircuitOpenError
+
+
+def describe_error(error: BaseException) -> Dict[str, Any]:
+
+    """Turn a failed backend call into a JSON-friendly error entry"""
+
+    if isinstance(error, CircuitOpenError):
+        return error.to_dict()
+    if isinstance(error, httpx.HTTPStatusError):
+        response = error.response
+        try:
+            detail = response.json().get("detail")
+        except (ValueError, AttributeError):
+            detail = None
+        return {
+            "status_code": response.status_code,
+            "error": detail or response.reason_phrase,
+        }
+    return {"error": str(error) or type(error).__name__}
+
+
+async def fan_out(
+    keys: Iterable[Hashable],
+    fetch: Callable[[Any], Awaitable[Any]],
+    key_name: str = "id",
+    concurrency: Optional[int] = None,
+) -> Dict[str, Any]:
+
+    """
+    Call `fetch` for every distinct key concurrently and collect partial results.
+
+    Args:
+        keys: Keys to fetch (duplicates are fetched once, order is preserved)
+        fetch: Coroutine function fetching a single key
+        key_name: Name of the key field in each result / error entry
+        concurrency: Max fetches in flight (defaults to BATCH_MAX_CONCURRENCY)
+
+    Returns:
+        Dict with `results` and `errors` lists, each entry tagged with its key
+    """
+
+    unique = list(dict.fromkeys(keys))
+    if len(unique) > settings.batch_max_items:
+        raise ValueError(f"Batch of {len(unique)} items exceeds the limit of {settings.batch_max_items}")
+
+    semaphore = asyncio.Semaphore(concurrency or settings.batch_max_concurrency)
+
+    async def run(key: Hashable) -> Any:
+        async with semaphore:
+            return await fetch(key)
+
+    outcomes = await asyncio.gather(*[run(key) for key in unique], return_exceptions=True)
+
+    results: List[Dict[str, Any]] = []
+    errors: List[Dict[str, Any]] = []
+    for key, outcome in zip(unique, outcomes):
+        if isinstance(outcome, asyncio.CancelledError):
+            raise outcome
+        if isinstance(outcome, Exception):
+            errors.append({key_name: key, **describe_error(outcome)})
+        else:
+            results.append({key_name: key, "data": outcome})
+
+    return {
+        "requested": len(unique),
+        "succeeded": len(results),
+        "failed": len(errors),
+        "results": results,
+        "errors": errors,
+    }
@@ -0,0 +1,201 @@
+"""In-process response cache for read-only backend endpoints"""
+
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, NamedTuple, Optional, Tuple
+
+import httpx
+
+from .singleflight import SingleFlight
+
+CacheKey = Tuple[str, Tuple[Tuple[str, str], ...]]
+
+
+class ResponseCache:
+
+    """
+    Async TTL + LRU cache for decoded backend responses.
+
+    Entries are keyed on path + normalized query params. Concurrent misses
+    for the same key share a single fetch, and writes made through this
+    server invalidate entries by path prefix.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 512,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.max_entries = max_entries
+        self._clock = clock
+        self._entries: "OrderedDict[CacheKey, Tuple[float, Any]]" = OrderedDict()
+        self._flight = SingleFlight()
+        self._generation = 0
+
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.evictions = 0
+
+    @staticmethod
+    def make_key(path: str, params: Optional[Dict] = None) -> CacheKey:
+
+        """Build a cache key, encoding params the same way httpx sends them"""
+
+        params = {k: v for k, v in (params or {}).items() if v is not None}
+        return path, tuple(sorted(httpx.QueryParams(params).multi_items()))
+
+    async def get_or_fetch(
+        self,
+        path: str,
+        params: Optional[Dict],
+        ttl: float,
+        fetch: Callable[[], Awaitable[Any]],
+    ) -> Any:
+
+        """
+        Return the cached value for path+params, fetching it on a miss.
+
+        Args:
+            path: Backend path
+            params: Query parameters
+            ttl: Seconds the fetched value stays fresh
+            fetch: Coroutine factory that loads the value from the backend
+
+        Returns:
+            Decoded response body
+        """
+
+        key = self.make_key(path, params)
+
+        entry = self._entries.get(key)
+        if entry is not None:
+            expires_at, value = entry
+            if expires_at > self._clock():
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return value
+            del self._entries[key]
+
+        # -----Concurrent misses for this key share one fetch
+        if self._flight.in_flight(key):
+            self.coalesced += 1
+        else:
+            self.misses += 1
+
+        async def load() -> Any:
+            generation = self._generation
+            value = await fetch()
+            # -----Don't store a response that raced with an invalidation
+            if generation == self._generation:
+                self._store(key, value, ttl)
+            return value
+
+        return await self._flight.do(key, load)
+
+    def _store(self, key: CacheKey, value: Any, ttl: float) -> None:
+        self._entries[key] = (self._clock() + ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def invalidate(self, prefix: str = "") -> int:
+
+        """
+        Drop every entry whose path starts with `prefix`.
+
+        Args:
+            prefix: Path prefix to invalidate (empty string clears everything)
+
+        Returns:
+            Number of entries removed
+        """
+
+        self._generation += 1
+        self._flight.forget(lambda key: key[0].startswith(prefix))
+
+        stale = [k for k in self._entries if k[0].startswith(prefix)]
+        for key in stale:
+            del self._entries[key]
+        return len(stale)
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses + self.coalesced
+        return {
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "coalesced": self.coalesced,
+            "evictions": self.evictions,
+            "hit_ratio": (self.hits + self.coalesced) / lookups if lookups else 0.0,
+        }
+
+
+class Validator(NamedTuple):
+    etag: Optional[str]
+    last_modified: Optional[str]
+    body: Any
+    size: int = 0  # -----Encoded body size in bytes, for the store's byte budget
+
+
+class ValidatorStore:
+
+    """
+    Bounded LRU store of ETag / Last-Modified validators for GET responses.
+
+    The decoded body is kept next to its validators so a `304 Not Modified`
+    can be answered without downloading or decoding the payload again.
+    The store is bounded both by entry count and by the total encoded size
+    of the bodies it holds; a body larger than the whole budget is not kept.
+    """
+
+    def __init__(self, max_entries: int = 1024, max_bytes: int = 16 * 1024 * 1024):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[CacheKey, Validator]" = OrderedDict()
+        self.bytes = 0
+
+        self.revalidations = 0
+        self.not_modified = 0
+        self.evictions = 0
+
+    def get(self, key: CacheKey) -> Optional[Validator]:
+        validator = self._entries.get(key)
+        if validator is not None:
+            self._entries.move_to_end(key)
+        return validator
+
+    def put(self, key: CacheKey, validator: Validator) -> None:
+        self.discard(key)
+        if self.max_bytes and validator.size > self.max_bytes:
+            return
+        self._entries[key] = validator
+        self.bytes += validator.size
+        while len(self._entries) > self.max_entries or (self.max_bytes and self.bytes > self.max_bytes):
+            _, evicted = self._entries.popitem(last=False)
+            self.bytes -= evicted.size
+            self.evictions += 1
+
+    def discard(self, key: CacheKey) -> None:
+        validator = self._entries.pop(key, None)
+        if validator is not None:
+            self.bytes -= validator.size
+
+    @staticmethod
+    def conditional_headers(validator: Validator) -> Dict[str, str]:
+        headers = {}
+        if validator.etag:
+            headers["If-None-Match"] = validator.etag
+        if validator.last_modified:
+            headers["If-Modified-Since"] = validator.last_modified
+        return headers
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "entries": len(self._entries),
+            "bytes": self.bytes,
+            "evictions": self.evictions,
+            "revalidations": self.revalidations,
+            "not_modified": self.not_modified,
+        }
@@ -1,9 +1,54 @@
-
 """Client for Restaurant Backend API"""
 
+import asyncio
+import logging
+import socket
+import time
 import httpx
-from typing import Optional, Dict
+from typing import Any, Optional, Dict, Tuple
 from .config import settings
+from . import codec, deadline, metrics
+from .cache import ResponseCache, Validator, ValidatorStore
+from .singleflight import SingleFlight
+from .tracing import tracer
+from .resilience import (
+    IDEMPOTENT_METHODS,
+    CircuitBreakers,
+    LatencyTracker,
+    RetryBudget,
+    backoff_delay,
+    is_retryable_error,
+    parse_retry_after,
+    route_group,
+)
+
+logger = logging.getLogger(__name__)
+
+
+def _close_abandoned(http: httpx.AsyncClient, loop: Optional[asyncio.AbstractEventLoop]) -> None:
+
+    """
+    Release the pool of a client left behind on another event loop.
+
+    While that loop is open the client is closed on it. Once it is closed
+    nothing can await there any more (aclose() raises "Event loop is
+    closed"), so the pooled connections are shut down directly; the file
+    descriptors go with the transports once they are collected.
+    """
+
+    if loop is not None and not loop.is_closed():
+        asyncio.run_coroutine_threadsafe(http.aclose(), loop)
+        return
+
+    pool = getattr(getattr(http, "_transport", None), "_pool", None)
+    for connection in getattr(pool, "connections", ()):
+        stream = getattr(getattr(connection, "_connection", None), "_network_stream", None)
+        sock = stream.get_extra_info("socket") if stream is not None else None
+        if sock is not None:
+            try:
+                sock.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass  # -----Already disconnected
 
 
 class BackendClient:
@@ -12,6 +57,7 @@ class BackendClient:
         base_url: Optional[str] = None,
         timeout: Optional[int] = None,
         api_key: Optional[str] = None,
+        transport: Optional[httpx.AsyncBaseTransport] = None,
     ):
         self.base_url = base_url or settings.backend_url
         self.timeout = timeout or settings.backend_timeout
@@ -21,28 +67,420 @@ class BackendClient:
         if self.api_key:
             self.headers["Authorization"] = f"Bearer {self.api_key}"
 
-    async def _request(self, method: str, path: str, **kwargs) -> httpx.Response:
-        async with httpx.AsyncClient(
+        # -----Connection pool (shared by every request made through this client)
+        self.limits = httpx.Limits(
+            max_connections=settings.backend_max_connections,
+            max_keepalive_connections=settings.backend_max_keepalive_connections,
+            keepalive_expiry=settings.backend_keepalive_expiry,
+        )
+        self.http2 = settings.backend_http2
+        self._transport = transport
+        self._http: Optional[httpx.AsyncClient] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+        # -----Response cache for read-only endpoints
+        self.cache = ResponseCache(max_entries=settings.cache_max_entries)
+
+        # -----ETag / Last-Modified validators for conditional GETs
+        self.validators = ValidatorStore(
+            max_entries=settings.validator_cache_max_entries,
+            max_bytes=settings.validator_cache_max_bytes,
+        )
+
+        # -----Concurrent identical GETs share one request
+        self.singleflight = SingleFlight()
+
+        # -----Retries are shared out of one process-wide budget
+        self.retry_budget = RetryBudget(
+            ratio=settings.retry_budget_ratio,
+            min_per_second=settings.retry_budget_min_per_second,
+        )
+        self.retries = 0
+
+        # -----Per route group circuit breakers (menu, orders, stats, auth, default)
+        self.breakers = CircuitBreakers(
+            failure_threshold=settings.circuit_failure_threshold,
+            recovery_timeout=settings.circuit_recovery_timeout,
+            latency_thresholds=settings.circuit_latency_thresholds,
+        )
+
+        # -----Recent latencies drive hedging; hedges are capped like retries
+        self.latencies = LatencyTracker(size=settings.latency_window_size)
+        self.hedge_budget = RetryBudget(ratio=settings.hedge_max_rate, min_per_second=0.0)
+        self.hedges_sent = 0
+        self.hedges_won = 0
+
+    def _create_http(self) -> httpx.AsyncClient:
+        options = dict(
             base_url=self.base_url,
             timeout=self.timeout,
             headers=self.headers,
-        ) as client:
-            response = await client.request(method, path, **kwargs)
-            response.raise_for_status()
+            limits=self.limits,
+            transport=self._transport,
+        )
+        try:
+            return httpx.AsyncClient(http2=self.http2, **options)
+        except ImportError:
+            # -----http2=True needs the optional 'h2' package (pip install "httpx[http2]")
+            logger.warning("HTTP/2 requested but 'h2' is not installed, falling back to HTTP/1.1")
+            self.http2 = False
+            return httpx.AsyncClient(**options)
+
+    def _get_http(self) -> httpx.AsyncClient:
+        loop = asyncio.get_running_loop()
+
+        # -----Pooled connections are bound to the loop that opened them
+        if self._http is None or self._http.is_closed or self._loop is not loop:
+            if self._http is not None and not self._http.is_closed:
+                _close_abandoned(self._http, self._loop)
+            self._http = self._create_http()
+            self._loop = loop
+        return self._http
+
+    async def start(self) -> None:
+        """Open the connection pool (called once at server startup)."""
+        self._get_http()
+
+    async def aclose(self) -> None:
+        """Close the connection pool and release pooled sockets."""
+        if self._http is not None and not self._http.is_closed:
+            if self._loop is asyncio.get_running_loop():
+                await self._http.aclose()
+            else:
+                _close_abandoned(self._http, self._loop)
+        self._http = None
+        self._loop = None
+
+    async def use_transport(self, transport: Optional[httpx.AsyncBaseTransport]) -> None:
+        """Send future requests through `transport` (e.g. the in-process stub backend)."""
+        await self.aclose()
+        self._transport = transport
+
+    async def _request(
+        self,
+        method: str,
+        path: str,
+        idempotent: Optional[bool] = None,
+        hedge: bool = False,
+        **kwargs,
+    ) -> httpx.Response:
+
+        """
+        Send a request, retrying transient failures of idempotent calls.
+
+        GET/HEAD/OPTIONS are retried by default; other methods only when the
+        caller passes `idempotent=True`. Retries back off exponentially with
+        jitter, honor Retry-After, and are limited by the retry budget.
+        With `hedge=True` each attempt may also be hedged (see _send_hedged).
+        When tracing is on, the request runs in its own span whose
+        traceparent header is sent to the backend.
+        """
+
+        if idempotent is None:
+            idempotent = method in IDEMPOTENT_METHODS
+        self.retry_budget.record_request()
+        send = self._send_hedged if hedge and idempotent and settings.hedge_enabled else self._send
+
+        with tracer.start_span(f"{method} {path}", **{
+            "http.method": method,
+            "http.route": path,
+            "backend.route_group": route_group(path),
+        }) as span:
+            if span is not None:
+                # -----Let the backend join the trace (W3C Trace Context)
+                kwargs["headers"] = {**(kwargs.get("headers") or {}), "traceparent": span.traceparent()}
+
+            attempt = 0
+            while True:
+                try:
+                    response = await send(method, path, **kwargs)
+                    if span is not None:
+                        span.set_attribute("http.status_code", response.status_code)
+                        span.set_attribute("backend.attempts", attempt + 1)
+                    return response
+                except (httpx.TransportError, httpx.HTTPStatusError) as error:
+                    delay = self._retry_delay(error, attempt) if idempotent else None
+                    if delay is None:
+                        if span is not None:
+                            span.set_attribute("backend.attempts", attempt + 1)
+                            if isinstance(error, httpx.HTTPStatusError):
+                                span.set_attribute("http.status_code", error.response.status_code)
+                        raise
+                    if logger.isEnabledFor(logging.DEBUG):
+                        logger.debug(
+                            f"Retrying {method} {path} in {delay:.2f}s after: {error!r}",
+                            extra={"event": "backend.retry", "attempt": attempt + 1, "delay": round(delay, 3)},
+                        )
+                    self.retries += 1
+                    attempt += 1
+                    await asyncio.sleep(delay)
+
+    def _timeout_for(self, path: str) -> Tuple[httpx.Timeout, bool]:
+
+        """
+        Per route group timeouts, capped by the remaining tool deadline.
+
+        Returns:
+            The timeout to use, and whether the deadline made it tighter
+        """
+
+        route = settings.route_timeouts.get(route_group(path), {})
+        read = route.get("read", self.timeout)
+        limits = {
+            "connect": route.get("connect", settings.backend_connect_timeout),
+            "read": read,
+            "write": route.get("write", read),
+            "pool": route.get("pool", settings.backend_pool_timeout),
+        }
+
+        left = deadline.remaining()
+        capped = left is not None and left < max(limits.values())
+        if capped:
+            limits = {name: min(value, left) for name, value in limits.items()}
+        return httpx.Timeout(**limits), capped
+
+    async def _send(self, method: str, path: str, **kwargs) -> httpx.Response:
+        deadline.check(f"{method} {path}")
+        timeout, capped = self._timeout_for(path)
+
+        group = route_group(path)
+        breaker = self.breakers.for_path(path)
+        breaker.before_request()
+
+        started = time.perf_counter()
+        metrics.backend_in_flight.inc(route_group=group)
+        try:
+            response = await self._get_http().request(method, path, timeout=timeout, **kwargs)
+        except httpx.TransportError as error:
+            metrics.backend_responses.inc(route_group=group, method=method, status="error")
+            # -----Running out of the tool's budget says nothing about backend health
+            if capped and isinstance(error, httpx.TimeoutException):
+                breaker.release()
+                raise deadline.DeadlineExceeded(f"Deadline exceeded during {method} {path}") from error
+            breaker.record_failure()
+            raise
+        except BaseException:
+            breaker.release()
+            raise
+        finally:
+            latency = time.perf_counter() - started
+            metrics.backend_in_flight.dec(route_group=group)
+            metrics.backend_duration.observe(latency, route_group=group, method=method)
+
+        metrics.backend_responses.inc(route_group=group, method=method, status=response.status_code)
+        if response.status_code >= 500 or response.status_code == httpx.codes.TOO_MANY_REQUESTS:
+            breaker.record_failure()
+        else:
+            breaker.record_success(latency)
+            self.latencies.for_path(path).record(latency)
+
+        # -----304 is only expected (and handled by the caller) for conditional GETs
+        if response.status_code == httpx.codes.NOT_MODIFIED and _is_conditional(response.request):
             return response
+        response.raise_for_status()
+        return response
+
+    async def _send_hedged(self, method: str, path: str, **kwargs) -> httpx.Response:
+
+        """
+        Send a request, hedging it if it is slower than usual.
+
+        If no response arrived within the route's recent latency percentile
+        (HEDGE_PERCENTILE), an identical second request is sent and whichever
+        succeeds first wins; the other is cancelled. Hedges are capped to
+        HEDGE_MAX_RATE of hedge-eligible requests.
+        """
+
+        self.hedge_budget.record_request()
+        window = self.latencies.for_path(path)
+        # -----An empty window has no percentile, even with HEDGE_MIN_SAMPLES=0
+        if len(window) < max(settings.hedge_min_samples, 1):
+            return await self._send(method, path, **kwargs)
+
+        delay = max(window.percentile(settings.hedge_percentile), settings.hedge_min_delay)
+        primary = asyncio.ensure_future(self._send(method, path, **kwargs))
+        hedge = None
+        try:
+            done, _ = await asyncio.wait({primary}, timeout=delay)
+            if done or not self.hedge_budget.try_acquire():
+                return await primary
+
+            self.hedges_sent += 1
+            hedge = asyncio.ensure_future(self._send(method, path, **kwargs))
+            pending = {primary, hedge}
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        if task is hedge:
+                            self.hedges_won += 1
+                        return task.result()
+            # -----Both attempts failed: surface the original request's error
+            return primary.result()
+        finally:
+            # -----Also reached when the caller is cancelled (e.g. by its deadline) while waiting
+            for task in (primary, hedge):
+                if task is not None and not task.done():
+                    task.cancel()
+
+    def _retry_delay(self, error: Exception, attempt: int) -> Optional[float]:
+
+        """Seconds to wait before retrying `error`, or None to give up"""
+
+        if attempt + 1 >= settings.retry_max_attempts or not is_retryable_error(error):
+            return None
+
+        delay = backoff_delay(attempt, settings.retry_backoff_base, settings.retry_backoff_max)
+        response = getattr(error, "response", None)
+        retry_after = parse_retry_after(response) if response is not None else None
+        if retry_after is not None:
+            # -----Waiting longer than allowed is the same as failing now
+            if retry_after > settings.retry_after_max:
+                return None
+            delay = max(delay, retry_after)
+
+        # -----Don't sleep past the tool's deadline
+        left = deadline.remaining()
+        if left is not None and delay >= left:
+            return None
+
+        if not self.retry_budget.try_acquire():
+            return None
+        return delay
+
+    @staticmethod
+    def decode(response: httpx.Response) -> Any:
+
+        """Decode a JSON response body straight from bytes with the configured codec"""
+
+        return codec.loads(response.content)
 
     async def get(self, path: str, params: Optional[Dict] = None) -> httpx.Response:
         return await self._request("GET", path, params=params)
 
-    async def post(self, path: str, json: Optional[Dict] = None) -> httpx.Response:
-        return await self._request("POST", path, json=json)
+    async def get_json(
+        self,
+        path: str,
+        params: Optional[Dict] = None,
+        ttl: Optional[float] = None,
+        hedge: bool = False,
+    ) -> Any:
+
+        """
+        GET `path` and return the decoded body.
+
+        Concurrent calls with the same path and params share one request
+        and its decoded result. When `ttl` is given the result is also
+        cached for that many seconds. `hedge=True` marks latency-critical
+        reads that may be hedged when the backend is slow.
+        """
 
-    async def put(self, path: str, json: Optional[Dict] = None) -> httpx.Response:
-        return await self._request("PUT", path, json=json)
+        key = ResponseCache.make_key(path, params)
+
+        async def load() -> Any:
+            if not settings.conditional_requests_enabled:
+                response = await self._request("GET", path, params=params, hedge=hedge)
+                return self.decode(response)
+            return await self._get_conditional(key, path, params, hedge)
+
+        async def fetch() -> Any:
+            if not settings.singleflight_enabled:
+                return await load()
+            return await self.singleflight.do(key, load)
+
+        if ttl and settings.cache_enabled:
+            return await self.cache.get_or_fetch(path, params, ttl, fetch)
+        return await fetch()
+
+    async def _get_conditional(
+        self,
+        key,
+        path: str,
+        params: Optional[Dict],
+        hedge: bool = False,
+    ) -> Any:
+
+        """GET with If-None-Match / If-Modified-Since, reusing the stored body on 304"""
+
+        validator = self.validators.get(key)
+        headers = None
+        if validator is not None:
+            headers = ValidatorStore.conditional_headers(validator)
+            self.validators.revalidations += 1
+
+        response = await self._request("GET", path, params=params, headers=headers, hedge=hedge)
+        if response.status_code == httpx.codes.NOT_MODIFIED:
+            self.validators.not_modified += 1
+            return validator.body
+
+        body = self.decode(response)
+        etag = response.headers.get("ETag")
+        last_modified = response.headers.get("Last-Modified")
+        if etag or last_modified:
+            self.validators.put(key, Validator(etag, last_modified, body, len(response.content)))
+        else:
+            self.validators.discard(key)
+        return body
+
+    def invalidate(self, prefix: str = "") -> int:
+
+        """Drop cached responses whose path starts with `prefix`"""
+
+        self.singleflight.forget(lambda key: key[0].startswith(prefix))
+        return self.cache.invalidate(prefix)
+
+    def stats(self) -> Dict[str, Any]:
+
+        """Cache, request coalescing, retry, circuit and hedging counters"""
+
+        return {
+            "retries": {"attempted": self.retries, **self.retry_budget.stats()},
+            "cache": self.cache.stats(),
+            "singleflight": self.singleflight.stats(),
+            "conditional": self.validators.stats(),
+            "circuits": self.breakers.snapshot(),
+            "hedging": {
+                "sent": self.hedges_sent,
+                "won": self.hedges_won,
+                "denied": self.hedge_budget.denied,
+            },
+        }
+
+    def pool_stats(self) -> Dict[str, int]:
+
+        """Open and idle pooled connections (zero before the pool is opened)"""
+
+        pool = getattr(getattr(self._http, "_transport", None), "_pool", None)
+        connections = list(getattr(pool, "connections", None) or [])
+        return {
+            "connections": len(connections),
+            "idle": sum(1 for connection in connections if connection.is_idle()),
+            "max_connections": self.limits.max_connections or 0,
+        }
+
+    async def post(
+        self,
+        path: str,
+        json: Optional[Dict] = None,
+        idempotent: bool = False,
+    ) -> httpx.Response:
+        return await self._request("POST", path, idempotent=idempotent, json=json)
+
+    async def put(
+        self,
+        path: str,
+        json: Optional[Dict] = None,
+        idempotent: bool = False,
+    ) -> httpx.Response:
+        return await self._request("PUT", path, idempotent=idempotent, json=json)
 
     async def delete(self, path: str) -> httpx.Response:
         return await self._request("DELETE", path)
 
 
+def _is_conditional(request: httpx.Request) -> bool:
+    return "If-None-Match" in request.headers or "If-Modified-Since" in request.headers
+
+
 # Safe global wrapper
 client = BackendClient()
@@ -0,0 +1,86 @@
+"""JSON encoding and decoding with the fastest installed library (orjson, msgspec or the stdlib)"""
+
+import json
+import logging
+from typing import Any, Callable, Tuple
+
+import pydantic_core
+
+from .config import settings
+
+logger = logging.getLogger(__name__)
+
+Loads = Callable[[bytes], Any]
+Dumps = Callable[[Any], str]
+
+
+def _stdlib() -> Tuple[Loads, Dumps]:
+    def dumps(value: Any) -> str:
+        return json.dumps(
+            value, ensure_ascii=False, separators=(",", ":"), default=pydantic_core.to_jsonable_python
+        )
+
+    return json.loads, dumps
+
+
+def _orjson() -> Tuple[Loads, Dumps]:
+    import orjson
+
+    options = orjson.OPT_NON_STR_KEYS
+
+    def dumps(value: Any) -> str:
+        return orjson.dumps(value, default=pydantic_core.to_jsonable_python, option=options).decode()
+
+    return orjson.loads, dumps
+
+
+def _msgspec() -> Tuple[Loads, Dumps]:
+    import msgspec
+
+    decoder = msgspec.json.Decoder()
+    encoder = msgspec.json.Encoder(enc_hook=pydantic_core.to_jsonable_python)
+
+    def loads(data: bytes) -> Any:
+        try:
+            return decoder.decode(data)
+        except msgspec.DecodeError as e:
+            raise ValueError(str(e)) from e  # -----Callers expect json.JSONDecodeError's base class
+
+    def dumps(value: Any) -> str:
+        return encoder.encode(value).decode()
+
+    return loads, dumps
+
+
+_CODECS = {"orjson": _orjson, "msgspec": _msgspec, "json": _stdlib}
+
+
+def select_codec(name: str = "auto") -> Tuple[str, Loads, Dumps]:
+
+    """
+    Pick the JSON codec.
+
+    Args:
+        name: auto, orjson, msgspec or json. "auto" takes the first one
+            installed in that order; an unavailable choice falls back to json.
+
+    Returns:
+        Codec name, loads(bytes) and dumps(value) -> str
+    """
+
+    candidates = list(_CODECS) if name == "auto" else [name]
+    for candidate in candidates:
+        factory = _CODECS.get(candidate)
+        if factory is None:
+            logger.warning(f"Unknown JSON codec {candidate!r}, using json")
+            break
+        try:
+            return (candidate, *factory())
+        except ImportError:
+            if name != "auto":
+                logger.warning(f"JSON codec {candidate!r} is not installed, using json")
+    return ("json", *_stdlib())
+
+
+# -----Codec used for backend responses and tool results
+name, loads, dumps = select_codec(settings.json_codec)
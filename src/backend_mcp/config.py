@@ -4,7 +4,7 @@
 import os
 from pydantic_settings import BaseSettings, SettingsConfigDict
 from pydantic import Field
-from typing import Optional
+from typing import Dict, Optional
 
 
 class Setting(BaseSettings):
@@ -18,7 +18,107 @@ class Setting(BaseSettings):
 
     # -----API Configuration
     backend_url: str = Field(default="http://localhost:8080", description="Backend URL")
-    backend_timeout: int = Field(default=30, description="HTTP request timeout")
+    backend_timeout: int = Field(default=30, description="HTTP request (read/write) timeout")
+    backend_connect_timeout: float = Field(default=5.0, description="Seconds to wait for a backend connection")
+    backend_pool_timeout: float = Field(default=5.0, description="Seconds to wait for a free pooled connection")
+    route_timeouts: Dict[str, Dict[str, float]] = Field(
+        default={"health": {"connect": 2.0, "read": 5.0}},
+        description="Per route group (menu, orders, stats, auth, health, default) connect/read/write/pool timeouts"
+    )
+
+    # -----Tool Deadlines
+    tool_deadline: Optional[float] = Field(default=60.0, description="Overall latency budget in seconds for one tool call")
+    tool_deadlines: Dict[str, float] = Field(default={}, description="Per tool overrides of tool_deadline")
+
+    # -----Retries
+    retry_max_attempts: int = Field(default=3, description="Max attempts per idempotent request (1 disables retries)")
+    retry_backoff_base: float = Field(default=0.1, description="Base delay in seconds for exponential backoff")
+    retry_backoff_max: float = Field(default=2.0, description="Max backoff delay in seconds before jitter")
+    retry_after_max: float = Field(default=10.0, description="Longest Retry-After (seconds) worth waiting for")
+    retry_budget_ratio: float = Field(default=0.2, description="Retries allowed as a fraction of recent requests")
+    retry_budget_min_per_second: float = Field(default=1.0, description="Retries per second always allowed by the budget")
+
+    # -----Circuit Breakers (per route group: menu, orders, stats, auth, default)
+    circuit_failure_threshold: int = Field(default=5, description="Consecutive failures that open a route group's circuit")
+    circuit_recovery_timeout: float = Field(default=30.0, description="Seconds a circuit stays open before a probe is let through")
+    circuit_latency_thresholds: Dict[str, float] = Field(
+        default={"stats": 10.0},
+        description="Per route group latency (seconds) above which a response counts as a failure"
+    )
+
+    # -----Hedged Requests
+    hedge_enabled: bool = Field(default=True, description="Hedge latency-critical reads against slow replicas")
+    hedge_percentile: float = Field(default=95.0, description="Recent latency percentile after which a hedge is sent")
+    hedge_min_delay: float = Field(default=0.05, description="Never hedge before this many seconds")
+    hedge_max_rate: float = Field(default=0.1, description="Max hedges as a fraction of hedge-eligible requests")
+    hedge_min_samples: int = Field(default=20, description="Latency samples needed before hedging a route group")
+    latency_window_size: int = Field(default=200, description="Recent latencies kept per route group")
+
+    # -----Connection Pool
+    backend_max_connections: int = Field(default=100, description="Max concurrent connections to the backend")
+    backend_max_keepalive_connections: int = Field(default=20, description="Max idle keep-alive connections kept in the pool")
+    backend_keepalive_expiry: float = Field(default=30.0, description="Seconds an idle keep-alive connection is kept open")
+    backend_http2: bool = Field(default=False, description="Use HTTP/2 (requires httpx[http2])")
+
+    # -----Response Cache
+    cache_enabled: bool = Field(default=True, description="Cache read-only backend responses")
+    cache_max_entries: int = Field(default=512, description="Max cached responses (least recently used are evicted)")
+    menu_cache_ttl: float = Field(default=300.0, description="Seconds menu listings stay cached")
+    menu_item_cache_ttl: float = Field(default=300.0, description="Seconds single menu items stay cached")
+    singleflight_enabled: bool = Field(default=True, description="Coalesce concurrent identical GET requests")
+    conditional_requests_enabled: bool = Field(default=True, description="Revalidate GETs with ETag / Last-Modified")
+    validator_cache_max_entries: int = Field(default=1024, description="Max remembered ETag / Last-Modified validators")
+    validator_cache_max_bytes: int = Field(default=16 * 1024 * 1024, description="Max total body bytes kept for conditional GETs (0 = unbounded)")
+
+    # -----JSON Codec
+    json_codec: str = Field(default="auto", description="JSON library: auto, orjson, msgspec or json")
+
+    # -----Response Shaping
+    response_budget_tokens: int = Field(default=8000, description="Max estimated tokens in a list result before it is paged (0 = off)")
+    response_chars_per_token: float = Field(default=4.0, description="JSON characters per token when estimating result size")
+
+    # -----Cursor Pagination
+    cursor_secret: Optional[str] = Field(default=None, description="HMAC key for cursor tokens (random per process when unset; cursors never outlive the process either way)")
+    cursor_ttl: float = Field(default=600.0, description="Seconds an idle cursor stays valid")
+    cursor_max_entries: int = Field(default=128, description="Max paged results kept behind cursors")
+    cursor_prefetch: bool = Field(default=True, description="Fetch the next page while the current one is consumed")
+
+    # -----Local Analytics
+    analytics_mode: str = Field(default="backend", description="Answer analytics tools from: backend or local")
+    analytics_refresh_interval: float = Field(default=60.0, description="Seconds before local aggregates are refreshed")
+    analytics_lookback_days: int = Field(default=7, description="Days of recent orders re-pulled on incremental refreshes; changes to older orders not made through this server wait for the next full refresh")
+    analytics_full_refresh_interval: float = Field(default=3600.0, description="Seconds between full re-syncs of every order")
+
+    # -----Menu Snapshot
+    menu_history_size: int = Field(default=100, description="Menu versions kept for menu://changes/{since_version}")
+    menu_notify_timeout: float = Field(default=1.0, description="Seconds a subscribed session gets to take its resource updates")
+
+    # -----Order Streaming
+    orders_page_size: int = Field(default=200, description="Orders fetched per /orders/filter page when streaming")
+    orders_prefetch_pages: int = Field(default=1, description="Pages fetched ahead while streaming orders")
+    orders_summary_max_orders: int = Field(default=100000, description="Max orders scanned by get_orders_summary")
+
+    # -----Batch Tools
+    batch_max_concurrency: int = Field(default=10, description="Max concurrent backend calls per batch tool call")
+    batch_max_items: int = Field(default=100, description="Max distinct IDs accepted by a batch tool call")
+
+    # -----Metrics
+    metrics_enabled: bool = Field(default=False, description="Serve Prometheus metrics over HTTP")
+    metrics_host: str = Field(default="127.0.0.1", description="Metrics endpoint bind address")
+    metrics_port: int = Field(default=9464, description="Metrics endpoint port (GET /metrics)")
+
+    # -----Tracing
+    tracing_exporter: str = Field(default="none", description="Span exporter: none, memory or file")
+    tracing_file: str = Field(default="traces.jsonl", description="JSON lines file written by the file exporter")
+
+    # -----Profiling
+    profiling_enabled: bool = Field(default=False, description="Register the start_profiling debug tool")
+    profiling_interval: float = Field(default=0.005, description="Seconds between profiler samples")
+    profiling_dir: str = Field(default="profiles", description="Directory profiles are written to")
+
+    # -----Session Recording
+    recording_enabled: bool = Field(default=False, description="Record tool calls for backend-mcp-replay")
+    recording_file: str = Field(default="sessions.jsonl", description="JSON lines file tool calls are recorded to")
 
     # -----API Authentication
     api_key: Optional[str] = Field(default=None, description="API key")
@@ -26,6 +126,9 @@ class Setting(BaseSettings):
 
     # -----Logging
     log_level: str = Field(default="INFO", description="Log level (DEBUG, INFO, WARNING, ERROR, CRITICAL)")
+    log_format: str = Field(default="json", description="Log format: json or text")
+    log_file: Optional[str] = Field(default=None, description="Log file path (stderr when unset; never stdout)")
+    log_sample_rates: Dict[str, float] = Field(default={}, description="Fraction of debug records kept per event or logger name")
 
     # -----Environment
     environment: str = Field(default="development", description="Environment name (development, production, staging)")
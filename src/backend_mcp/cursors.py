@@ -0,0 +1,223 @@
+"""Signed cursor tokens for every paged result, with the next page prefetched"""
+
+import asyncio
+import base64
+import hashlib
+import hmac
+import json
+import logging
+import secrets
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from . import deadline
+from .config import settings
+
+logger = logging.getLogger(__name__)
+
+Record = Dict[str, Any]
+PageFetcher = Callable[[int, int], Awaitable[List[Record]]]
+
+
+class Listing:
+
+    """Filter spec behind a cursor: how to fetch any page of one query"""
+
+    def __init__(
+        self,
+        tool: str,
+        fetch: PageFetcher,
+        page_size: int,
+        ttl: float,
+        total: Optional[int] = None,
+        extra: Optional[Dict[str, Any]] = None,
+    ):
+        self.tool = tool
+        self.fetch = fetch
+        self.page_size = page_size
+        self.ttl = ttl
+        self.total = total
+        self.extra = extra or {}
+        self.expires = time.monotonic() + ttl
+        self.prefetched: Dict[int, asyncio.Future] = {}
+
+    def prefetch(self, offset: int) -> None:
+        if offset in self.prefetched:
+            return
+        # -----Runs past the call that started it, so it must not inherit that call's deadline
+        task = asyncio.get_running_loop().create_task(
+            self.fetch(offset, self.page_size), context=deadline.unbounded_context()
+        )
+        # -----A prefetch nobody consumes must not log "exception was never retrieved"
+        task.add_done_callback(lambda done: done.cancelled() or done.exception())
+        self.prefetched[offset] = task
+
+    async def page(self, offset: int) -> List[Record]:
+        task = self.prefetched.pop(offset, None)
+        if task is not None:
+            try:
+                return await asyncio.shield(task)
+            except asyncio.CancelledError:
+                if task.cancelled():
+                    return await self.fetch(offset, self.page_size)
+                raise
+            except Exception as e:
+                logger.debug(f"Prefetched page of {self.tool} failed, fetching again: {e}")
+        return await self.fetch(offset, self.page_size)
+
+    def has_more(self, end: int, returned: int) -> bool:
+        if self.total is not None:
+            return end < self.total
+        return returned >= self.page_size
+
+    def close(self) -> None:
+        for task in self.prefetched.values():
+            task.cancel()
+        self.prefetched.clear()
+
+
+class CursorPager:
+
+    """
+    Paginate results with opaque, signed cursor tokens.
+
+    The filter spec of a query is cached server-side as a Listing; the
+    cursor only names that listing, the tool and the next offset, and is
+    HMAC-signed so it can't be forged or pointed at another tool. While a
+    page is being consumed the next one is already being fetched.
+
+    Every next_cursor can be passed to get_more_results; cursors of the
+    list tools are also accepted back by the tool that issued them.
+    """
+
+    def __init__(
+        self,
+        secret: Optional[str] = None,
+        max_entries: Optional[int] = None,
+        ttl: Optional[float] = None,
+    ):
+        secret = secret or settings.cursor_secret
+        # -----Listings live in this process's memory, so a cursor never outlives it anyway
+        self._secret = secret.encode() if secret else secrets.token_bytes(32)
+        self.max_entries = max_entries or settings.cursor_max_entries
+        self.ttl = ttl or settings.cursor_ttl
+        self._listings: "OrderedDict[str, Listing]" = OrderedDict()
+        self.prefetch_hits = 0
+
+    def __len__(self) -> int:
+        return len(self._listings)
+
+    def _sign(self, payload: bytes) -> str:
+        digest = hmac.new(self._secret, payload, hashlib.sha256).digest()[:16]
+        return base64.urlsafe_b64encode(digest).decode().rstrip("=")
+
+    def encode(self, listing_id: str, tool: str, offset: int) -> str:
+        payload = json.dumps([listing_id, tool, offset], separators=(",", ":")).encode()
+        return f"{base64.urlsafe_b64encode(payload).decode().rstrip('=')}.{self._sign(payload)}"
+
+    def decode(self, cursor: str, tool: Optional[str] = None) -> Tuple[str, int]:
+
+        """
+        Verify a cursor and return (listing_id, offset).
+
+        Args:
+            cursor: Token from a page's next_cursor
+            tool: Tool the cursor must belong to (None accepts any tool)
+
+        Raises:
+            ValueError: If the cursor is malformed, forged or for another tool
+        """
+
+        try:
+            body, signature = cursor.split(".")
+            payload = base64.urlsafe_b64decode(body + "=" * (-len(body) % 4))
+        except ValueError:
+            raise ValueError("Malformed cursor") from None
+        if not hmac.compare_digest(signature.encode(), self._sign(payload).encode()):
+            raise ValueError("Invalid cursor signature")
+        listing_id, cursor_tool, offset = json.loads(payload)
+        if tool is not None and cursor_tool != tool:
+            raise ValueError(f"Cursor belongs to {cursor_tool}, not {tool}")
+        return listing_id, offset
+
+    async def start(
+        self,
+        tool: str,
+        fetch: PageFetcher,
+        page_size: int,
+        offset: int = 0,
+        total: Optional[int] = None,
+        extra: Optional[Dict[str, Any]] = None,
+    ) -> Dict[str, Any]:
+
+        """
+        Start paginating a query.
+
+        Args:
+            tool: Tool the cursor is valid for
+            fetch: Coroutine fetching `limit` records from `offset`
+            page_size: Records per page
+            offset: Where the first page starts
+            total: Number of records, when known up front (otherwise a short page is the last)
+            extra: Keys added to every page, e.g. a summary of the whole result
+
+        Returns:
+            The first page and the cursor of the next one
+        """
+
+        listing_id = secrets.token_urlsafe(9)
+        listing = Listing(tool, fetch, max(1, page_size), self.ttl, total, extra)
+        self._listings[listing_id] = listing
+        while len(self._listings) > self.max_entries:
+            _, evicted = self._listings.popitem(last=False)
+            evicted.close()
+        return await self._page(listing_id, listing, offset)
+
+    async def resume(self, cursor: str, tool: Optional[str] = None) -> Dict[str, Any]:
+
+        """
+        The page a cursor points at.
+
+        Args:
+            cursor: Token from a page's next_cursor
+            tool: Tool the cursor must belong to (None accepts any tool)
+
+        Raises:
+            ValueError: If the cursor is invalid or its listing has expired
+        """
+
+        listing_id, offset = self.decode(cursor, tool)
+        listing = self._listings.get(listing_id)
+        if listing is None or listing.expires < time.monotonic():
+            self._drop(listing_id)
+            raise ValueError("Cursor has expired; call the tool again without a cursor")
+        self._listings.move_to_end(listing_id)
+        listing.expires = time.monotonic() + listing.ttl
+        if offset in listing.prefetched:
+            self.prefetch_hits += 1
+        return await self._page(listing_id, listing, offset)
+
+    async def _page(self, listing_id: str, listing: Listing, offset: int) -> Dict[str, Any]:
+        items = await listing.page(offset)
+        next_cursor = None
+        next_offset = offset + len(items)
+        if listing.has_more(next_offset, len(items)):
+            next_cursor = self.encode(listing_id, listing.tool, next_offset)
+            if settings.cursor_prefetch:
+                listing.prefetch(next_offset)
+        else:
+            self._drop(listing_id)
+        return {"items": items, "offset": offset, "next_cursor": next_cursor, **listing.extra}
+
+    def _drop(self, listing_id: str) -> None:
+        listing = self._listings.pop(listing_id, None)
+        if listing is not None:
+            listing.close()
+
+    def stats(self) -> Dict[str, int]:
+        return {"listings": len(self._listings), "prefetch_hits": self.prefetch_hits}
+
+
+# -----Global pager shared by the list tools, response shaping and get_more_results
+pager = CursorPager()
@@ -0,0 +1,103 @@
+"""End-to-end deadlines propagated from MCP tool calls into backend requests"""
+
+import asyncio
+import contextvars
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Awaitable, Iterator, Optional
+
+# -----Absolute time.monotonic() deadline of the current tool invocation
+_deadline: ContextVar[Optional[float]] = ContextVar("backend_mcp_deadline", default=None)
+
+
+class DeadlineExceeded(TimeoutError):
+
+    """Raised when a tool call has used up its overall latency budget"""
+
+
+@contextmanager
+def deadline_scope(seconds: Optional[float]) -> Iterator[Optional[float]]:
+
+    """
+    Run the enclosed code under a deadline `seconds` from now.
+
+    Nested scopes can only tighten the deadline, never extend it.
+    Backend requests made inside the scope (including retries and
+    concurrently spawned tasks, which copy the context) share it.
+
+    Args:
+        seconds: Budget for the enclosed code (None keeps the current deadline)
+
+    Yields:
+        The effective absolute deadline, or None when unbounded
+    """
+
+    current = _deadline.get()
+    effective = current
+    if seconds is not None:
+        candidate = time.monotonic() + seconds
+        effective = candidate if current is None else min(current, candidate)
+
+    token = _deadline.set(effective)
+    try:
+        yield effective
+    finally:
+        _deadline.reset(token)
+
+
+def remaining() -> Optional[float]:
+
+    """Seconds left before the current deadline, or None when there is none"""
+
+    current = _deadline.get()
+    if current is None:
+        return None
+    return current - time.monotonic()
+
+
+def check(operation: str = "request") -> None:
+
+    """Raise DeadlineExceeded if the current deadline has already passed"""
+
+    left = remaining()
+    if left is not None and left <= 0:
+        raise DeadlineExceeded(f"Deadline exceeded before {operation}")
+
+
+def unbounded_context() -> contextvars.Context:
+
+    """
+    Copy of the current context with no deadline.
+
+    Work shared by several callers (a coalesced request, a background
+    refresh) runs in it, so one caller's deadline can't cut the others short.
+    """
+
+    context = contextvars.copy_context()
+    context.run(_deadline.set, None)
+    return context
+
+
+async def bounded(awaitable: Awaitable[Any], operation: str = "request") -> Any:
+
+    """
+    Await `awaitable`, giving up when the current deadline passes.
+
+    Meant for shielded shared work: only this caller stops waiting, the
+    work itself carries on for everyone else.
+
+    Raises:
+        DeadlineExceeded: If the deadline passes first
+    """
+
+    left = remaining()
+    if left is None:
+        return await awaitable
+    try:
+        async with asyncio.timeout(max(left, 0)) as scope:
+            return await awaitable
+    except TimeoutError:
+        if scope.expired():
+            raise DeadlineExceeded(f"Deadline exceeded waiting for {operation}") from None
+        raise
@@ -0,0 +1,54 @@
+"""Append JSON lines to a file from a background thread, off the event loop"""
+
+import json
+import logging
+import queue
+import threading
+from typing import Any
+
+logger = logging.getLogger(__name__)
+
+# -----Queued after the last record to stop the writer thread
+_STOP = object()
+
+
+class JsonLinesWriter:
+
+    """
+    Appends records to a file as JSON, one per line.
+
+    write() only enqueues the record; a daemon thread serializes and writes
+    it, the same way logging goes through a QueueListener, so callers on
+    the event loop never wait on disk I/O. close() drains the queue.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._file = open(path, "a", encoding="utf-8")
+        self._queue: queue.SimpleQueue = queue.SimpleQueue()
+        self._thread = threading.Thread(target=self._run, name="jsonl-writer", daemon=True)
+        self._thread.start()
+
+    def write(self, record: Any) -> None:
+        self._queue.put(record)
+
+    def _run(self) -> None:
+        while True:
+            record = self._queue.get()
+            if record is _STOP:
+                break
+            try:
+                self._file.write(json.dumps(record, default=str) + "\n")
+                if self._queue.empty():
+                    self._file.flush()
+            except Exception:
+                logger.exception(f"Failed to write to {self.path}")
+        self._file.close()
+
+    def close(self) -> None:
+
+        """Write everything queued so far, then close the file"""
+
+        if self._thread.is_alive():
+            self._queue.put(_STOP)
+            self._thread.join()
@@ -0,0 +1,168 @@
+"""Structured JSON logging through a non-blocking queue, with sampling and request IDs"""
+
+import json
+import logging
+import logging.handlers
+import queue
+import sys
+import uuid
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from typing import Dict, Iterator, Optional
+
+from .config import settings
+from .tracing import current_span
+
+# -----ID and name of the tool call the current task is serving
+_request_id: ContextVar[Optional[str]] = ContextVar("backend_mcp_request_id", default=None)
+_tool: ContextVar[Optional[str]] = ContextVar("backend_mcp_tool", default=None)
+
+# -----LogRecord attributes that are not user supplied `extra` fields
+_RESERVED = frozenset(vars(logging.LogRecord("", 0, "", 0, "", None, None))) | {"message", "asctime"}
+
+
+@contextmanager
+def request_scope(tool: str, request_id: Optional[str] = None) -> Iterator[str]:
+
+    """
+    Tag every log record emitted in the enclosed code with a request ID.
+
+    Args:
+        tool: Name of the tool being called
+        request_id: ID to use (a new random one by default)
+
+    Yields:
+        The request ID
+    """
+
+    request_id = request_id or uuid.uuid4().hex[:16]
+    id_token = _request_id.set(request_id)
+    tool_token = _tool.set(tool)
+    try:
+        yield request_id
+    finally:
+        _tool.reset(tool_token)
+        _request_id.reset(id_token)
+
+
+def current_request_id() -> Optional[str]:
+    return _request_id.get()
+
+
+class ContextFilter(logging.Filter):
+
+    """Copy the request ID, tool name and trace ID of the emitting task onto the record"""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        record.request_id = _request_id.get()
+        record.tool = _tool.get()
+        span = current_span()
+        record.trace_id = span.trace_id if span is not None else None
+        return True
+
+
+class SamplingFilter(logging.Filter):
+
+    """
+    Keep only a fraction of high-volume debug records.
+
+    Records below INFO are sampled per event: the key is the record's
+    `event` extra field if present, otherwise the logger name. With a rate
+    of 0.1, one record in ten is kept (deterministically, so the first one
+    of every burst always gets through).
+    """
+
+    def __init__(self, rates: Dict[str, float]):
+        super().__init__()
+        self.rates = rates
+        self._seen: Dict[str, int] = {}
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno >= logging.INFO:
+            return True
+        key = getattr(record, "event", None) or record.name
+        rate = self.rates.get(key)
+        if rate is None or rate >= 1:
+            return True
+        if rate <= 0:
+            return False
+        seen = self._seen.get(key, 0)
+        self._seen[key] = seen + 1
+        return seen % max(1, round(1 / rate)) == 0
+
+
+class JsonFormatter(logging.Formatter):
+
+    """One JSON object per line, with `extra` fields included as top-level keys"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "timestamp": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        for key, value in record.__dict__.items():
+            if key not in _RESERVED and value is not None:
+                entry[key] = value
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            entry["exception"] = record.exc_text
+        return json.dumps(entry, default=str)
+
+
+class _QueueHandler(logging.handlers.QueueHandler):
+
+    """QueueHandler that keeps records structured (the stock one pre-formats them as text)"""
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record = logging.makeLogRecord(record.__dict__)
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+
+def configure_logging() -> logging.handlers.QueueListener:
+
+    """
+    Route all logging through a queue to stderr (or LOG_FILE).
+
+    Never writes to stdout, which belongs to the stdio MCP transport.
+    Formatting and I/O happen on the listener's thread, so logging never
+    blocks the event loop.
+
+    Returns:
+        The started listener; call stop() on shutdown to flush it
+    """
+
+    if settings.log_file:
+        target: logging.Handler = logging.FileHandler(settings.log_file, encoding="utf-8")
+    else:
+        target = logging.StreamHandler(sys.stderr)
+
+    if settings.log_format == "json":
+        target.setFormatter(JsonFormatter())
+    else:
+        target.setFormatter(logging.Formatter(
+            "%(asctime)s - %(name)s - %(levelname)s - [%(request_id)s] %(message)s"
+        ))
+
+    log_queue: queue.SimpleQueue = queue.SimpleQueue()
+    handler = _QueueHandler(log_queue)
+    handler.addFilter(SamplingFilter(settings.log_sample_rates))
+    handler.addFilter(ContextFilter())
+
+    root = logging.getLogger()
+    for existing in list(root.handlers):
+        root.removeHandler(existing)
+    root.addHandler(handler)
+    root.setLevel(getattr(logging, settings.log_level.upper(), logging.INFO))
+
+    listener = logging.handlers.QueueListener(log_queue, target, respect_handler_level=True)
+    listener.start()
+    return listener
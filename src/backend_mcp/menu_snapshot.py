@@ -0,0 +1,158 @@
+"""Versioned in-memory menu snapshot and the change log behind menu://changes"""
+
+import logging
+from collections import deque
+from typing import Any, Awaitable, Callable, Deque, Dict, List, Optional, Tuple
+
+from .config import settings
+
+logger = logging.getLogger(__name__)
+
+Change = Dict[str, Any]
+Listener = Callable[[List[str]], Awaitable[None]]
+
+
+class MenuSnapshot:
+
+    """
+    Latest known menu items and a bounded log of how they changed.
+
+    Every full menu listing or single item returned by the backend is
+    diffed against the snapshot; if anything changed the version is bumped
+    and the changes are recorded, so clients holding version N can ask for
+    just what changed since N instead of the whole menu.
+    """
+
+    def __init__(self, history_size: Optional[int] = None):
+        self.version = 0
+        self.items: Dict[Any, Dict[str, Any]] = {}
+        self._history: Deque[Tuple[int, List[Change]]] = deque(maxlen=history_size or settings.menu_history_size)
+        self._last_listing: Optional[List[Dict[str, Any]]] = None
+        self._listeners: List[Listener] = []
+
+    def add_listener(self, listener: Listener) -> None:
+
+        """Register a coroutine called with the affected menu:// URIs after each change"""
+
+        self._listeners.append(listener)
+
+    async def refresh(self, items: List[Dict[str, Any]]) -> List[Change]:
+
+        """
+        Replace the snapshot with a full menu listing.
+
+        Returns:
+            Changes since the previous snapshot (empty when nothing changed)
+        """
+
+        # -----Cached listings come back as the very same object: nothing to diff
+        if items is self._last_listing:
+            return []
+        self._last_listing = items
+
+        current = {item.get("id"): item for item in items}
+        changes = [self._diff(item_id, self.items.get(item_id), item) for item_id, item in current.items()]
+        changes += [
+            {"type": "removed", "id": item_id, "item": item}
+            for item_id, item in self.items.items() if item_id not in current
+        ]
+        return await self._commit([change for change in changes if change], current)
+
+    async def apply(self, item: Dict[str, Any]) -> List[Change]:
+
+        """Record a single created or updated item (e.g. from create_menu_item)"""
+
+        item_id = item.get("id")
+        if item_id is None:
+            return []
+        change = self._diff(item_id, self.items.get(item_id), item)
+        self._last_listing = None
+        return await self._commit([change] if change else [], {**self.items, item_id: item})
+
+    def _diff(self, item_id: Any, old: Optional[Dict[str, Any]], new: Dict[str, Any]) -> Optional[Change]:
+        if old is None:
+            return {"type": "added", "id": item_id, "item": new}
+        if old == new:
+            return None
+        fields = {
+            name: {"old": old.get(name), "new": new.get(name)}
+            for name in old.keys() | new.keys() if old.get(name) != new.get(name)
+        }
+        return {"type": "updated", "id": item_id, "item": new, "fields": fields}
+
+    async def _commit(self, changes: List[Change], items: Dict[Any, Dict[str, Any]]) -> List[Change]:
+        previous = self.items
+        self.items = items
+        if not changes:
+            return changes
+
+        self.version += 1
+        for change in changes:
+            change["version"] = self.version
+        self._history.append((self.version, changes))
+
+        categories = set()
+        for change in changes:
+            categories.add(change["item"].get("category"))
+            old = previous.get(change["id"])
+            if old is not None:
+                categories.add(old.get("category"))
+        uris = ["menu://all"] + [f"menu://category/{category}" for category in sorted(filter(None, categories))]
+
+        for listener in self._listeners:
+            try:
+                await listener(uris)
+            except Exception as e:
+                logger.warning(f"Menu change listener failed: {e}")
+        return changes
+
+    def changes_since(self, since_version: int) -> Dict[str, Any]:
+
+        """
+        What changed after `since_version`.
+
+        Each item appears once, with its latest state. If `since_version` is
+        older than the retained history (or unknown), the full menu is
+        returned instead with `full: true` so the client can resync.
+        """
+
+        oldest = self._history[0][0] if self._history else self.version + 1
+        if since_version > self.version or since_version < oldest - 1:
+            return {
+                "version": self.version,
+                "since_version": since_version,
+                "full": True,
+                "items": list(self.items.values()),
+            }
+
+        latest: Dict[Any, Change] = {}
+        for version, changes in self._history:
+            if version > since_version:
+                for change in changes:
+                    latest[change["id"]] = _merge(latest.get(change["id"]), change)
+        return {
+            "version": self.version,
+            "since_version": since_version,
+            "full": False,
+            "changes": list(latest.values()),
+        }
+
+
+def _merge(earlier: Optional[Change], later: Change) -> Change:
+
+    """Collapse two changes of the same item into one"""
+
+    if earlier is None:
+        return later
+    if earlier["type"] == "added":
+        return later if later["type"] == "removed" else {**later, "type": "added", "fields": None}
+    if later["type"] == "updated" and earlier["type"] == "updated":
+        fields = dict(earlier["fields"])
+        for name, diff in later["fields"].items():
+            fields[name] = {"old": fields.get(name, diff)["old"], "new": diff["new"]}
+        return {**later, "fields": {n: d for n, d in fields.items() if d["old"] != d["new"]}}
+    return later
+
+
+# -----Global snapshot shared by the menu tools and resources
+menu_snapshot = MenuSnapshot()
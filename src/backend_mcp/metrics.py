@@ -0,0 +1,336 @@
+"""Prometheus-style metrics for tool calls and backend requests"""
+
+import abc
+import bisect
+import contextlib
+import logging
+import math
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+LabelValues = Tuple[str, ...]
+Sample = Tuple[str, Dict[str, str], float]
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+
+def percentile(ordered: Sequence[float], p: float) -> float:
+
+    """Nearest-rank percentile of an already sorted sequence (0.0 when empty)"""
+
+    if not ordered:
+        return 0.0
+    rank = min(len(ordered) - 1, max(0, math.ceil(p / 100 * len(ordered)) - 1))
+    return ordered[rank]
+
+
+class _Metric(abc.ABC):
+    type = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+
+    def _key(self, labels: Dict[str, Any]) -> LabelValues:
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def _labels(self, key: LabelValues) -> Dict[str, str]:
+        return dict(zip(self.labelnames, key))
+
+    @abc.abstractmethod
+    def samples(self) -> Iterable[Sample]:
+        ...
+
+
+class Counter(_Metric):
+
+    """Monotonically increasing count"""
+
+    type = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[LabelValues, float] = {}
+
+    def inc(self, amount: float = 1.0, **labels: Any) -> None:
+        key = self._key(labels)
+        self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, **labels: Any) -> float:
+        return self._values.get(self._key(labels), 0.0)
+
+    def samples(self) -> Iterable[Sample]:
+        for key, value in list(self._values.items()):
+            yield self.name, self._labels(key), value
+
+
+class Gauge(_Metric):
+
+    """Value that can go up and down"""
+
+    type = "gauge"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[LabelValues, float] = {}
+
+    def set(self, value: float, **labels: Any) -> None:
+        self._values[self._key(labels)] = value
+
+    def inc(self, amount: float = 1.0, **labels: Any) -> None:
+        key = self._key(labels)
+        self._values[key] = self._values.get(key, 0.0) + amount
+
+    def dec(self, amount: float = 1.0, **labels: Any) -> None:
+        self.inc(-amount, **labels)
+
+    def value(self, **labels: Any) -> float:
+        return self._values.get(self._key(labels), 0.0)
+
+    @contextlib.contextmanager
+    def track_in_progress(self, **labels: Any) -> Iterator[None]:
+
+        """Count the enclosed block as in progress while it runs"""
+
+        self.inc(**labels)
+        try:
+            yield
+        finally:
+            self.dec(**labels)
+
+    def samples(self) -> Iterable[Sample]:
+        for key, value in list(self._values.items()):
+            yield self.name, self._labels(key), value
+
+
+class Histogram(_Metric):
+
+    """Cumulative bucketed distribution of observed values"""
+
+    type = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        self._series: Dict[LabelValues, List[float]] = {}
+
+    def observe(self, value: float, **labels: Any) -> None:
+        key = self._key(labels)
+        series = self._series.get(key)
+        if series is None:
+            # -----One slot per bucket, then +Inf, sum and count
+            series = self._series[key] = [0.0] * (len(self.buckets) + 3)
+        series[bisect.bisect_left(self.buckets, value)] += 1
+        series[-2] += value
+        series[-1] += 1
+
+    def count(self, **labels: Any) -> float:
+        series = self._series.get(self._key(labels))
+        return series[-1] if series else 0.0
+
+    def samples(self) -> Iterable[Sample]:
+        for key, series in list(self._series.items()):
+            labels = self._labels(key)
+            cumulative = 0.0
+            for bound, count in zip(self.buckets + (float("inf"),), series):
+                cumulative += count
+                yield f"{self.name}_bucket", {**labels, "le": _format_value(bound)}, cumulative
+            yield f"{self.name}_sum", labels, series[-2]
+            yield f"{self.name}_count", labels, series[-1]
+
+
+class CollectedMetric(_Metric):
+
+    """Metric whose samples are read from another component at scrape time"""
+
+    def __init__(self, name: str, documentation: str, type: str, samples: Iterable[Tuple[Dict[str, str], float]]):
+        super().__init__(name, documentation)
+        self.type = type
+        self._collected = list(samples)
+
+    def samples(self) -> Iterable[Sample]:
+        for labels, value in self._collected:
+            yield self.name, labels, value
+
+
+class MetricsRegistry:
+
+    """Holds metrics and renders them in the Prometheus text exposition format"""
+
+    def __init__(self):
+        self._metrics: List[_Metric] = []
+        self._collectors: List[Callable[[], Iterable[_Metric]]] = []
+
+    def register(self, metric: _Metric) -> _Metric:
+        self._metrics.append(metric)
+        return metric
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self.register(Counter(name, documentation, labelnames))
+
+    def gauge(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Gauge:
+        return self.register(Gauge(name, documentation, labelnames))
+
+    def histogram(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ) -> Histogram:
+        return self.register(Histogram(name, documentation, labelnames, buckets))
+
+    def add_collector(self, collector: Callable[[], Iterable[_Metric]]) -> None:
+        self._collectors.append(collector)
+
+    def collect(self) -> Iterator[_Metric]:
+        yield from self._metrics
+        for collector in self._collectors:
+            try:
+                yield from collector()
+            except Exception:
+                logger.exception("Metrics collector failed")
+
+    def render(self) -> str:
+        lines = []
+        for metric in self.collect():
+            lines.append(f"# HELP {metric.name} {metric.documentation}")
+            lines.append(f"# TYPE {metric.name} {metric.type}")
+            for name, labels, value in metric.samples():
+                lines.append(f"{name}{_format_labels(labels)} {_format_value(value)}")
+        return "\n".join(lines) + "\n"
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(labels: Dict[str, str]) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(str(value))}"' for name, value in labels.items()) + "}"
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+# -----Global registry and the metrics recorded by the server
+registry = MetricsRegistry()
+
+tool_calls = registry.counter(
+    "mcp_tool_calls_total", "MCP tool calls by outcome", ("tool", "outcome")
+)
+tool_duration = registry.histogram(
+    "mcp_tool_duration_seconds", "MCP tool call latency", ("tool",)
+)
+tools_in_flight = registry.gauge(
+    "mcp_tools_in_flight", "MCP tool calls currently running", ("tool",)
+)
+backend_duration = registry.histogram(
+    "backend_request_duration_seconds", "Backend HTTP request latency", ("route_group", "method")
+)
+backend_responses = registry.counter(
+    "backend_responses_total", "Backend HTTP responses by status code ('error' for transport failures)",
+    ("route_group", "method", "status")
+)
+backend_in_flight = registry.gauge(
+    "backend_requests_in_flight", "Backend HTTP requests currently in flight", ("route_group",)
+)
+
+
+def client_collector(client: Any) -> Callable[[], Iterable[_Metric]]:
+
+    """Build a collector exposing a BackendClient's cache, retry, hedge, circuit and pool state"""
+
+    circuit_states = {"closed": 0, "half_open": 1, "open": 2}
+
+    def collect() -> Iterable[_Metric]:
+        stats = client.stats()
+        cache = stats["cache"]
+        pool = client.pool_stats()
+
+        yield CollectedMetric("backend_cache_hits_total", "Response cache hits", "counter", [({}, cache["hits"])])
+        yield CollectedMetric("backend_cache_misses_total", "Response cache misses", "counter", [({}, cache["misses"])])
+        yield CollectedMetric("backend_cache_hit_ratio", "Response cache hit ratio (coalesced misses count as hits)", "gauge", [({}, cache["hit_ratio"])])
+        yield CollectedMetric("backend_cache_entries", "Response cache entries", "gauge", [({}, cache["entries"])])
+        yield CollectedMetric("backend_singleflight_coalesced_total", "GETs served by an identical in-flight request", "counter", [({}, stats["singleflight"]["coalesced"])])
+        yield CollectedMetric("backend_not_modified_total", "Conditional GETs answered with 304 Not Modified", "counter", [({}, stats["conditional"]["not_modified"])])
+        yield CollectedMetric("backend_validator_bytes", "Body bytes kept for conditional GETs", "gauge", [({}, stats["conditional"]["bytes"])])
+        yield CollectedMetric("backend_retries_total", "Backend request retries", "counter", [({}, stats["retries"]["attempted"])])
+        yield CollectedMetric("backend_retries_denied_total", "Retries refused by the retry budget", "counter", [({}, stats["retries"]["denied"])])
+        yield CollectedMetric("backend_hedges_sent_total", "Hedged backend requests sent", "counter", [({}, stats["hedging"]["sent"])])
+        yield CollectedMetric("backend_hedges_won_total", "Hedged requests that answered first", "counter", [({}, stats["hedging"]["won"])])
+        yield CollectedMetric(
+            "backend_circuit_state", "Circuit breaker state per route group (0=closed, 1=half_open, 2=open)", "gauge",
+            [({"route_group": group}, circuit_states[state["state"]]) for group, state in stats["circuits"].items()]
+        )
+        yield CollectedMetric(
+            "backend_pool_connections", "Pooled backend connections by state", "gauge",
+            [({"state": "active"}, pool["connections"] - pool["idle"]), ({"state": "idle"}, pool["idle"])]
+        )
+        yield CollectedMetric("backend_pool_max_connections", "Connection pool size limit", "gauge", [({}, pool["max_connections"])])
+
+    return collect
+
+
+class _MetricsApp:
+
+    """Bare ASGI app serving the registry on GET /metrics"""
+
+    def __init__(self, registry: MetricsRegistry, path: str = "/metrics"):
+        self.registry = registry
+        self.path = path
+
+    async def __call__(self, scope, receive, send) -> None:
+        if scope["type"] != "http":
+            return
+        if scope["path"] != self.path:
+            status, body, content_type = 404, b"Not Found\n", b"text/plain"
+        else:
+            status, body, content_type = 200, self.registry.render().encode(), b"text/plain; version=0.0.4"
+        await send({
+            "type": "http.response.start",
+            "status": status,
+            "headers": [(b"content-type", content_type), (b"content-length", str(len(body)).encode())],
+        })
+        await send({"type": "http.response.body", "body": body})
+
+
+def create_metrics_server(host: str, port: int, metrics_registry: Optional[MetricsRegistry] = None):
+
+    """
+    Build a uvicorn server exposing the registry on http://host:port/metrics.
+
+    The server is meant to run as a task on the MCP server's own event loop,
+    so it leaves process signal handling to the MCP transport.
+    """
+
+    import uvicorn
+
+    class MetricsServer(uvicorn.Server):
+        @contextlib.contextmanager
+        def capture_signals(self) -> Iterator[None]:
+            yield
+
+    config = uvicorn.Config(
+        _MetricsApp(metrics_registry or registry),
+        host=host,
+        port=port,
+        log_level="warning",
+        access_log=False,
+        lifespan="off",
+    )
+    return MetricsServer(config)
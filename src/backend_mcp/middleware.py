@@ -0,0 +1,192 @@
+"""MCP middleware applied around every tool call"""
+
+import asyncio
+import time
+
+from fastmcp.exceptions import ToolError
+from fastmcp.server.middleware import CallNext, Middleware, MiddlewareContext
+from fastmcp.tools.tool import ToolResult
+from mcp.types import TextContent
+
+from . import codec, metrics, profiling
+from .config import settings
+from .deadline import DeadlineExceeded, deadline_scope
+from .logging_config import current_request_id, request_scope
+from .recording import recorder
+from .resilience import CircuitOpenError
+from .shaping import estimate_tokens, shape
+from .tracing import tracer
+
+
+class RequestContextMiddleware(Middleware):
+
+    """Give every tool call a request ID that is attached to all of its log records"""
+
+    async def on_call_tool(self, context: MiddlewareContext, call_next: CallNext):
+        with request_scope(context.message.name):
+            return await call_next(context)
+
+
+class MetricsMiddleware(Middleware):
+
+    """Count tool calls by outcome and record their latency and concurrency"""
+
+    async def on_call_tool(self, context: MiddlewareContext, call_next: CallNext):
+        name = context.message.name
+        outcome = "error"
+        started = time.perf_counter()
+        try:
+            with metrics.tools_in_flight.track_in_progress(tool=name):
+                result = await call_next(context)
+            outcome = "success"
+            return result
+        except DeadlineExceeded:
+            outcome = "deadline_exceeded"
+            raise
+        except asyncio.CancelledError:
+            outcome = "cancelled"
+            raise
+        finally:
+            metrics.tool_duration.observe(time.perf_counter() - started, tool=name)
+            metrics.tool_calls.inc(tool=name, outcome=outcome)
+
+
+class RecordingMiddleware(Middleware):
+
+    """Record each tool call's session, timing and arguments while recording is on"""
+
+    async def on_call_tool(self, context: MiddlewareContext, call_next: CallNext):
+        if not recorder.enabled:
+            return await call_next(context)
+
+        session = "default"
+        if context.fastmcp_context is not None:
+            try:
+                session = context.fastmcp_context.session_id
+            except RuntimeError:
+                pass
+
+        outcome = "error"
+        started = recorder.now()
+        try:
+            result = await call_next(context)
+            outcome = "success"
+            return result
+        finally:
+            recorder.record(
+                session,
+                context.message.name,
+                context.message.arguments,
+                started,
+                recorder.now() - started,
+                outcome,
+            )
+
+
+class ProfilingMiddleware(Middleware):
+
+    """Count finished tool calls for profiles limited to N tool calls"""
+
+    async def on_call_tool(self, context: MiddlewareContext, call_next: CallNext):
+        # -----Only calls started while a profile runs count, so start_profiling itself doesn't
+        session = profiling.active_session()
+        try:
+            return await call_next(context)
+        finally:
+            if session is not None:
+                session.tool_call_finished()
+
+
+class TracingMiddleware(Middleware):
+
+    """Run every tool call in a root span; backend requests become its children"""
+
+    async def on_call_tool(self, context: MiddlewareContext, call_next: CallNext):
+        name = context.message.name
+        with tracer.start_span(f"tools/call {name}", **{
+            "mcp.tool.name": name,
+            "mcp.request_id": current_request_id(),
+        }):
+            return await call_next(context)
+
+
+class DeadlineMiddleware(Middleware):
+
+    """
+    Give every tool call an overall latency budget.
+
+    The deadline is stored in a context variable, so every backend request
+    the tool makes (retries and concurrent fan-out included) has its
+    timeouts capped by whatever is left of the budget.
+    """
+
+    async def on_call_tool(self, context: MiddlewareContext, call_next: CallNext):
+        name = context.message.name
+        seconds = settings.tool_deadlines.get(name, settings.tool_deadline)
+        if not seconds:
+            return await call_next(context)
+
+        with deadline_scope(seconds):
+            try:
+                async with asyncio.timeout(seconds) as scope:
+                    return await call_next(context)
+            except DeadlineExceeded:
+                raise
+            except TimeoutError as e:
+                # -----Only the tool's own deadline; an inner timeout firing first stays a TimeoutError
+                if scope.expired():
+                    raise DeadlineExceeded(f"Tool '{name}' exceeded its {seconds:g}s deadline") from e
+                raise
+
+
+class CircuitOpenMiddleware(Middleware):
+
+    """
+    Report an open circuit as the structured CircuitOpenError.to_dict() error.
+
+    Any tool can hit an open circuit, not only the batch tools, so the
+    caller always gets the route group and retry_after as JSON instead of
+    a generic "Error calling tool" message.
+    """
+
+    async def on_call_tool(self, context: MiddlewareContext, call_next: CallNext):
+        try:
+            return await call_next(context)
+        except (CircuitOpenError, ToolError) as e:
+            # -----FastMCP wraps a tool's exception in a ToolError before middleware sees it
+            error = e if isinstance(e, CircuitOpenError) else e.__cause__
+            if not isinstance(error, CircuitOpenError):
+                raise
+            raise ToolError(codec.dumps(error.to_dict())) from error
+
+
+class ResponseShapingMiddleware(Middleware):
+
+    """
+    Keep list results within RESPONSE_BUDGET_TOKENS.
+
+    A list result whose JSON is over the budget is replaced by the first
+    page that fits, a cursor for get_more_results and a summary (counts,
+    totals by status) of the whole list. Results under the budget are
+    passed through without being decoded.
+    """
+
+    async def on_call_tool(self, context: MiddlewareContext, call_next: CallNext):
+        result = await call_next(context)
+        if not settings.response_budget_tokens or not isinstance(result, ToolResult):
+            return result
+        if result.structured_content is not None or len(result.content) != 1:
+            return result
+
+        block = result.content[0]
+        if not isinstance(block, TextContent) or not block.text.startswith("["):
+            return result
+        if estimate_tokens(block.text) <= settings.response_budget_tokens:
+            return result
+
+        try:
+            records = codec.loads(block.text)
+        except ValueError:
+            return result
+        shaped = await shape(context.message.name, records, len(block.text))
+        return ToolResult(content=[TextContent(type="text", text=codec.dumps(shaped))], structured_content=shaped)
@@ -0,0 +1,251 @@
+"""On-demand sampling profiler for the running server (collapsed stacks / speedscope output)"""
+
+import asyncio
+import json
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+from .config import settings
+
+# -----A stack is a tuple of "module:qualname" labels, outermost first
+Stack = Tuple[str, ...]
+
+# -----Root labels separating the two kinds of samples
+RUNNING = "[running]"
+AWAITING = "[awaiting]"
+
+FORMATS = ("speedscope", "collapsed")
+
+
+def _label(frame) -> str:
+    code = frame.f_code
+    module = frame.f_globals.get("__name__", "?")
+    return f"{module}:{getattr(code, 'co_qualname', code.co_name)}"
+
+
+def _thread_stack(frame) -> Stack:
+    labels = []
+    while frame is not None:
+        labels.append(_label(frame))
+        frame = frame.f_back
+    return tuple(reversed(labels))
+
+
+def _is_idle(frame) -> bool:
+
+    """True when the event loop is blocked in its selector waiting for I/O"""
+
+    return frame.f_code.co_name in ("select", "poll", "control") and frame.f_code.co_filename.endswith("selectors.py")
+
+
+def _task_stack(task: asyncio.Task) -> Stack:
+
+    """Await chain of a suspended task, from its root coroutine to the innermost await"""
+
+    labels = []
+    coro: Any = task.get_coro()
+    while coro is not None:
+        frame = getattr(coro, "cr_frame", None) or getattr(coro, "gi_frame", None) or getattr(coro, "ag_frame", None)
+        if frame is None:
+            break
+        labels.append(_label(frame))
+        coro = getattr(coro, "cr_await", None) or getattr(coro, "gi_yieldfrom", None) or getattr(coro, "ag_await", None)
+    return tuple(labels)
+
+
+class ProfileSession:
+
+    """
+    Sample the whole server for a while and write the profile to disk.
+
+    Two kinds of samples are taken every `interval` seconds:
+    - [running]:  the event loop thread's Python stack, i.e. where CPU time
+                  goes (JSON encoding, filtering, ...), idle selector waits excluded
+    - [awaiting]: the await chain of every suspended task that is inside
+                  backend_mcp code, i.e. where wall time goes (backend calls
+                  in client._request, semaphores, sleeps, ...)
+
+    The session stops after `seconds` or after `tool_calls` tool calls
+    have finished, whichever comes first.
+    """
+
+    def __init__(
+        self,
+        seconds: Optional[float] = None,
+        tool_calls: Optional[int] = None,
+        interval: Optional[float] = None,
+        output: Optional[str] = None,
+        format: str = "speedscope",
+    ):
+        if format not in FORMATS:
+            raise ValueError(f"Unknown profile format '{format}', expected one of {FORMATS}")
+        if seconds is None and tool_calls is None:
+            seconds = 10.0
+
+        self.seconds = seconds
+        self.tool_calls = tool_calls
+        self.interval = interval or settings.profiling_interval
+        self.format = format
+        self.output = output or self._default_output()
+
+        self.samples: Counter = Counter()
+        self.calls_seen = 0
+        self.started_at = 0.0
+        self.elapsed = 0.0
+        self._done = asyncio.Event()
+        self._thread_samples: Counter = Counter()
+        self._stop_thread = threading.Event()
+        self.task: Optional[asyncio.Task] = None
+
+    def _default_output(self) -> str:
+        stamp = datetime.now().strftime("%Y%m%d-%H%M%S")
+        suffix = "speedscope.json" if self.format == "speedscope" else "collapsed.txt"
+        return os.path.join(settings.profiling_dir, f"profile-{stamp}.{suffix}")
+
+    def tool_call_finished(self) -> None:
+        self.calls_seen += 1
+        if self.tool_calls is not None and self.calls_seen >= self.tool_calls:
+            self._done.set()
+
+    def _sample_thread(self, thread_id: int) -> None:
+        while not self._stop_thread.wait(self.interval):
+            frame = sys._current_frames().get(thread_id)
+            if frame is None or _is_idle(frame):
+                continue
+            self._thread_samples[(RUNNING,) + _thread_stack(frame)] += 1
+
+    def _sample_tasks(self) -> None:
+        current = asyncio.current_task()
+        for task in asyncio.all_tasks():
+            if task is current or task.done():
+                continue
+            stack = _task_stack(task)
+            if any(label.startswith("backend_mcp.") for label in stack):
+                self.samples[(AWAITING,) + stack] += 1
+
+    async def run(self) -> str:
+
+        """
+        Sample until the session ends, then write the profile.
+
+        Returns:
+            Path of the written profile
+        """
+
+        self.started_at = time.monotonic()
+        sampler = threading.Thread(
+            target=self._sample_thread,
+            args=(threading.get_ident(),),
+            name="backend-mcp-profiler",
+            daemon=True,
+        )
+        sampler.start()
+        try:
+            while not self._done.is_set():
+                if self.seconds is not None and time.monotonic() - self.started_at >= self.seconds:
+                    break
+                self._sample_tasks()
+                try:
+                    await asyncio.wait_for(self._done.wait(), self.interval)
+                except TimeoutError:
+                    pass
+        finally:
+            self._stop_thread.set()
+            await asyncio.to_thread(sampler.join)
+            self.elapsed = time.monotonic() - self.started_at
+            self.samples.update(self._thread_samples)
+
+        await asyncio.to_thread(self.write)
+        return self.output
+
+    def collapsed(self) -> str:
+
+        """Brendan Gregg's collapsed stack format (input of flamegraph.pl / speedscope)"""
+
+        return "".join(f"{';'.join(stack)} {count}\n" for stack, count in sorted(self.samples.items()))
+
+    def speedscope(self) -> Dict[str, Any]:
+
+        """Speedscope sampled profile, each stack weighted by its sampled time"""
+
+        frames: List[Dict[str, str]] = []
+        index: Dict[str, int] = {}
+        samples: List[List[int]] = []
+        weights: List[float] = []
+        for stack, count in sorted(self.samples.items()):
+            ids = []
+            for label in stack:
+                if label not in index:
+                    index[label] = len(frames)
+                    frames.append({"name": label})
+                ids.append(index[label])
+            samples.append(ids)
+            weights.append(round(count * self.interval, 6))
+
+        return {
+            "$schema": "https://www.speedscope.app/file-format-schema.json",
+            "exporter": "backend-mcp",
+            "name": os.path.basename(self.output),
+            "shared": {"frames": frames},
+            "profiles": [{
+                "type": "sampled",
+                "name": "backend-mcp",
+                "unit": "seconds",
+                "startValue": 0,
+                "endValue": round(sum(weights), 6),
+                "samples": samples,
+                "weights": weights,
+            }],
+        }
+
+    def write(self) -> None:
+        directory = os.path.dirname(self.output)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(self.output, "w", encoding="utf-8") as f:
+            if self.format == "speedscope":
+                json.dump(self.speedscope(), f)
+            else:
+                f.write(self.collapsed())
+
+
+# -----At most one profile is captured at a time
+_active: Optional[ProfileSession] = None
+
+
+def active_session() -> Optional[ProfileSession]:
+    return _active
+
+
+def start_profile(**options: Any) -> ProfileSession:
+
+    """
+    Start a background profiling session.
+
+    Raises:
+        RuntimeError: If a session is already running
+    """
+
+    global _active
+    if _active is not None:
+        raise RuntimeError(f"A profile is already being captured to {_active.output}")
+
+    session = ProfileSession(**options)
+    _active = session
+
+    async def run() -> None:
+        global _active
+        try:
+            await session.run()
+        finally:
+            _active = None
+
+    # -----Keep a reference so the task is not garbage collected mid-run
+    session.task = asyncio.create_task(run())
+    return session
+
@@ -0,0 +1,74 @@
+"""Field projection (sparse responses) for list tools"""
+
+from functools import lru_cache
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple, Union
+
+Record = Dict[str, Any]
+Projector = Callable[[Record], Record]
+Fields = Union[str, Sequence[str], None]
+
+# -----Compact field sets for list views, per record kind
+PRESETS: Dict[str, Dict[str, Tuple[str, ...]]] = {
+    "orders": {
+        "summary": ("id", "customer_id", "status", "order_type", "final_amount", "created_at"),
+    },
+    "menu": {
+        "summary": ("id", "name", "category", "price", "is_available"),
+    },
+}
+
+
+def resolve_fields(fields: Fields, kind: str) -> Optional[Tuple[str, ...]]:
+
+    """
+    Turn a `fields` argument into the tuple of keys to keep.
+
+    Args:
+        fields: None (everything), a preset name such as "summary", a comma
+            separated string, or a list of keys (which may include presets)
+        kind: Record kind the presets are looked up for (orders, menu)
+
+    Returns:
+        Keys in the requested order without duplicates, or None to keep every field
+    """
+
+    if not fields:
+        return None
+    names = fields.split(",") if isinstance(fields, str) else fields
+
+    presets = PRESETS.get(kind, {})
+    keys: Dict[str, None] = {}
+    for name in names:
+        name = name.strip()
+        for key in presets.get(name, (name,)):
+            if key:
+                keys[key] = None
+    return tuple(keys) or None
+
+
+@lru_cache(maxsize=128)
+def compile_projector(keys: Tuple[str, ...]) -> Projector:
+
+    """Build (once per field set) a function copying only `keys` out of a record"""
+
+    def project(record: Record) -> Record:
+        return {key: record[key] for key in keys if key in record}
+
+    return project
+
+
+def project(records: List[Record], fields: Fields, kind: str) -> List[Record]:
+
+    """
+    Project every record down to `fields`.
+
+    Records are never modified (they may be shared with the response cache);
+    projected copies are returned instead. Keys a record doesn't have are
+    left out rather than filled with null.
+    """
+
+    keys = resolve_fields(fields, kind)
+    if keys is None or not isinstance(records, list):
+        return records
+    projector = compile_projector(keys)
+    return [projector(record) for record in records]
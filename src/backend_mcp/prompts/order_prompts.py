@@ -82,8 +82,7 @@ I can provide:
 What would you like to know about your order?""",
         "suggested_tools":
         [
-            "get_order_details",
-            "get_order_journey"
+            "get_order_snapshot"
         ]
     }
 
@@ -0,0 +1,103 @@
+"""Opt-in recording of MCP tool calls, for replaying real sessions as load"""
+
+import json
+import time
+from collections import defaultdict
+from typing import Any, Callable, Dict, List, Optional
+
+from .linewriter import JsonLinesWriter
+
+# -----Argument names whose values are never written to a recording
+REDACTED_ARGUMENTS = frozenset({"password", "api_key", "token"})
+REDACTED = "***"
+
+
+class SessionRecorder:
+
+    """
+    Appends one JSON line per tool call: the session it belongs to, when it
+    started (seconds since recording began), the tool, its arguments, how
+    long it took and its outcome.
+
+    Disabled until open() is called.
+    """
+
+    def __init__(self, clock: Callable[[], float] = time.monotonic):
+        self._clock = clock
+        self._writer: Optional[JsonLinesWriter] = None
+        self._origin = 0.0
+        self.path: Optional[str] = None
+        self.recorded = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self._writer is not None
+
+    def open(self, path: str) -> None:
+        self.close()
+        self.path = path
+        self._writer = JsonLinesWriter(path)
+        self._origin = self._clock()
+
+    def now(self) -> float:
+        return self._clock() - self._origin
+
+    def record(
+        self,
+        session: str,
+        tool: str,
+        arguments: Dict[str, Any],
+        started: float,
+        duration: float,
+        outcome: str,
+    ) -> None:
+        if self._writer is None:
+            return
+        entry = {
+            "session": session,
+            "t": round(started, 6),
+            "tool": tool,
+            "arguments": {
+                name: REDACTED if name in REDACTED_ARGUMENTS else value
+                for name, value in (arguments or {}).items()
+            },
+            "duration_ms": round(duration * 1000, 3),
+            "outcome": outcome,
+        }
+        # -----Queued: the file is written by the writer thread, not on the event loop
+        self._writer.write(entry)
+        self.recorded += 1
+
+    def close(self) -> None:
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+
+
+def load_recording(path: str) -> Dict[str, List[Dict[str, Any]]]:
+
+    """
+    Read a recording back, grouped by session.
+
+    Returns:
+        Calls of each session in start order, with `t` made relative to the
+        session's first call
+    """
+
+    sessions: Dict[str, List[Dict[str, Any]]] = defaultdict(list)
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                entry = json.loads(line)
+                sessions[entry["session"]].append(entry)
+
+    for calls in sessions.values():
+        calls.sort(key=lambda entry: entry["t"])
+        first = calls[0]["t"]
+        for entry in calls:
+            entry["offset"] = entry["t"] - first
+    return dict(sessions)
+
+
+# -----Global recorder, opened at server startup when RECORDING_ENABLED is set
+recorder = SessionRecorder()
@@ -0,0 +1,218 @@
+"""
+Replay recorded MCP sessions as load against the in-process server.
+
+Every recorded session is replayed in order, keeping the gaps between its
+tool calls (divided by --speed) and the spacing between session starts.
+--concurrency runs that many copies of the whole recording at once; give
+several values to sweep and find where throughput stops scaling.
+Against the live backend, tools that change data are skipped unless
+--allow-writes is given.
+
+Usage:
+    backend-mcp-replay sessions.jsonl
+    backend-mcp-replay sessions.jsonl --speed 10 --concurrency 1 4 16 64
+    backend-mcp-replay sessions.jsonl --speed 0 --backend live --output replay.json
+    backend-mcp-replay sessions.jsonl --backend live --allow-writes
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import sys
+import time
+from typing import Any, Dict, List, Optional
+
+from fastmcp import Client
+
+from .client import client
+from .config import settings
+from .metrics import percentile
+from .recording import load_recording
+from .server import mcp
+from .stub_backend import create_stub_app, stub_transport
+
+
+# -----Tools that create or change data in the backend
+WRITE_TOOLS = frozenset({
+    "create_menu_item",
+    "update_menu_item",
+    "create_order",
+    "update_order_status",
+    "register_customer",
+    "update_customer_profile",
+    "create_review",
+})
+
+
+def without_writes(sessions: Dict[str, List[Dict[str, Any]]]) -> Dict[str, List[Dict[str, Any]]]:
+
+    """Drop calls of WRITE_TOOLS from `sessions` (and sessions left with no calls)"""
+
+    kept = {
+        session: [entry for entry in calls if entry["tool"] not in WRITE_TOOLS]
+        for session, calls in sessions.items()
+    }
+    return {session: calls for session, calls in kept.items() if calls}
+
+
+def _summarize(latencies: List[float]) -> Dict[str, float]:
+    ordered = sorted(latencies)
+    return {
+        "calls": len(ordered),
+        "p50_ms": round(percentile(ordered, 50) * 1000, 3),
+        "p95_ms": round(percentile(ordered, 95) * 1000, 3),
+        "p99_ms": round(percentile(ordered, 99) * 1000, 3),
+    }
+
+
+async def replay_sessions(
+    mcp_client: Client,
+    sessions: Dict[str, List[Dict[str, Any]]],
+    speed: float = 1.0,
+    concurrency: int = 1,
+) -> Dict[str, Any]:
+
+    """
+    Replay `sessions` `concurrency` times in parallel through `mcp_client`.
+
+    Args:
+        mcp_client: Connected MCP client
+        sessions: Recorded calls grouped by session (see load_recording)
+        speed: Time compression factor (0 replays as fast as possible)
+        concurrency: Copies of the recording replayed at once
+
+    Returns:
+        Throughput, latency percentiles, errors and lateness of the replay
+    """
+
+    origin = min(calls[0]["t"] for calls in sessions.values())
+    latencies: Dict[str, List[float]] = {}
+    errors: Dict[str, int] = {}
+    lateness: List[float] = []
+
+    async def replay(calls: List[Dict[str, Any]], start: float) -> None:
+        session_start = start + ((calls[0]["t"] - origin) / speed if speed else 0.0)
+        for entry in calls:
+            if speed:
+                # -----Keep the recorded pacing, but never overlap calls of one session
+                due = session_start + entry["offset"] / speed
+                wait = due - time.perf_counter()
+                if wait > 0:
+                    await asyncio.sleep(wait)
+                else:
+                    lateness.append(-wait)
+
+            started = time.perf_counter()
+            result = await mcp_client.call_tool(entry["tool"], entry["arguments"], raise_on_error=False)
+            latencies.setdefault(entry["tool"], []).append(time.perf_counter() - started)
+            if result.is_error:
+                errors[entry["tool"]] = errors.get(entry["tool"], 0) + 1
+
+    start = time.perf_counter()
+    await asyncio.gather(*[
+        replay(calls, start)
+        for _ in range(concurrency)
+        for calls in sessions.values()
+    ])
+    elapsed = time.perf_counter() - start
+
+    every = [latency for values in latencies.values() for latency in values]
+    return {
+        "concurrency": concurrency,
+        "speed": speed,
+        "sessions": len(sessions) * concurrency,
+        "elapsed_s": round(elapsed, 4),
+        "throughput_rps": round(len(every) / elapsed, 2) if elapsed else 0.0,
+        "errors": sum(errors.values()),
+        "behind_schedule_ms": round(percentile(sorted(lateness), 95) * 1000, 3),
+        **_summarize(every),
+        "tools": {
+            tool: {**_summarize(values), "errors": errors.get(tool, 0)}
+            for tool, values in sorted(latencies.items())
+        },
+    }
+
+
+async def run_replay(
+    path: str,
+    speed: float = 1.0,
+    levels: Optional[List[int]] = None,
+    backend: str = "stub",
+    latency: float = 0.0,
+    allow_writes: bool = False,
+) -> List[Dict[str, Any]]:
+
+    """
+    Replay the recording at `path` once per concurrency level.
+
+    Against the live backend, calls of WRITE_TOOLS are left out unless
+    `allow_writes` is set, so a replay doesn't create orders, reviews or
+    customers for real.
+    """
+
+    sessions = load_recording(path)
+    if backend == "live" and not allow_writes:
+        recorded = sum(len(calls) for calls in sessions.values())
+        sessions = without_writes(sessions)
+        skipped = recorded - sum(len(calls) for calls in sessions.values())
+        if skipped:
+            print(f"Skipping {skipped} write calls against the live backend (--allow-writes replays them)", file=sys.stderr)
+    if not sessions:
+        raise ValueError(f"No tool calls to replay in {path}")
+
+    # -----Never append the replayed calls to a recording
+    settings.recording_enabled = False
+
+    if backend == "stub":
+        await client.use_transport(stub_transport(create_stub_app(latency=latency)))
+
+    results = []
+    async with Client(mcp) as mcp_client:
+        for concurrency in levels or [1]:
+            result = await replay_sessions(mcp_client, sessions, speed=speed, concurrency=concurrency)
+            results.append(result)
+            print(
+                f"concurrency {concurrency:>4}  {result['throughput_rps']:>9.1f} calls/s  "
+                f"p50 {result['p50_ms']:>8.2f}  p95 {result['p95_ms']:>8.2f}  p99 {result['p99_ms']:>8.2f} ms  "
+                f"errors {result['errors']}  behind {result['behind_schedule_ms']:.1f} ms",
+                file=sys.stderr,
+            )
+    return results
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Replay recorded MCP sessions against the in-process server")
+    parser.add_argument("recording", help="JSON lines file written with RECORDING_ENABLED=true")
+    parser.add_argument("--speed", type=float, default=1.0, help="Replay N times faster (0 = no pauses)")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1],
+                        help="Copies of the recording replayed at once (several values sweep)")
+    parser.add_argument("--backend", choices=("stub", "live"), default="stub",
+                        help="Stub backend in-process, or the real one at BACKEND_URL")
+    parser.add_argument("--latency", type=float, default=0.0, help="Stub backend latency in seconds")
+    parser.add_argument("--allow-writes", action="store_true",
+                        help="Also replay tools that change data when using the live backend")
+    parser.add_argument("--output", help="Write the JSON results to this file")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.ERROR, stream=sys.stderr)
+    results = asyncio.run(run_replay(
+        args.recording,
+        speed=args.speed,
+        levels=args.concurrency,
+        backend=args.backend,
+        latency=args.latency,
+        allow_writes=args.allow_writes,
+    ))
+
+    text = json.dumps(results, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+    else:
+        print(text)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
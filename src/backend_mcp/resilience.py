@@ -0,0 +1,322 @@
+"""Retry policy, retry budget, circuit breakers and latency tracking for backend calls"""
+
+import random
+import time
+from collections import deque
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Any, Callable, Deque, Dict, Optional, Tuple
+
+import httpx
+
+from .metrics import percentile
+
+# -----Methods that are safe to repeat without being explicitly marked
+IDEMPOTENT_METHODS = frozenset({"GET", "HEAD", "OPTIONS"})
+
+# -----Statuses that signal a transient backend problem
+RETRYABLE_STATUS_CODES = frozenset({429, 502, 503, 504})
+
+
+class RetryBudget:
+
+    """
+    Process-wide cap on retries (or other extra attempts such as hedges),
+    relative to the number of requests.
+
+    Over a sliding window of `window` seconds, retries are allowed while
+    they stay under `ratio` of the requests sent plus a small floor of
+    `min_per_second`. When the backend is overloaded and most requests
+    fail, this keeps retries from multiplying the load into a retry storm.
+    """
+
+    def __init__(
+        self,
+        ratio: float = 0.2,
+        min_per_second: float = 1.0,
+        window: float = 10.0,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.ratio = ratio
+        self.min_per_second = min_per_second
+        self.window = window
+        self._clock = clock
+        self._requests: Deque[float] = deque()
+        self._retries: Deque[float] = deque()
+
+        self.denied = 0
+
+    def _trim(self, now: float) -> None:
+        horizon = now - self.window
+        for events in (self._requests, self._retries):
+            while events and events[0] < horizon:
+                events.popleft()
+
+    def record_request(self) -> None:
+        now = self._clock()
+        self._trim(now)
+        self._requests.append(now)
+
+    def try_acquire(self) -> bool:
+
+        """Take one retry from the budget, returning False when it is spent"""
+
+        now = self._clock()
+        self._trim(now)
+        allowance = self.min_per_second * self.window + self.ratio * len(self._requests)
+        if len(self._retries) >= allowance:
+            self.denied += 1
+            return False
+        self._retries.append(now)
+        return True
+
+    def stats(self) -> Dict[str, float]:
+        self._trim(self._clock())
+        return {
+            "requests_in_window": len(self._requests),
+            "retries_in_window": len(self._retries),
+            "denied": self.denied,
+        }
+
+
+def is_retryable_error(error: Exception) -> bool:
+
+    """Transport failures and transient statuses are worth another attempt"""
+
+    if isinstance(error, httpx.HTTPStatusError):
+        return error.response.status_code in RETRYABLE_STATUS_CODES
+    return isinstance(error, httpx.TransportError)
+
+
+def backoff_delay(
+    attempt: int,
+    base: float,
+    cap: float,
+    rng: Callable[[float, float], float] = random.uniform,
+) -> float:
+
+    """Exponential backoff with full jitter for the given (0-based) retry attempt"""
+
+    return rng(0, min(cap, base * (2 ** attempt)))
+
+
+def parse_retry_after(response: Optional[httpx.Response]) -> Optional[float]:
+
+    """Seconds requested by a Retry-After header (delta-seconds or HTTP date)"""
+
+    if response is None:
+        return None
+    value = response.headers.get("Retry-After")
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if retry_at.tzinfo is None:
+        retry_at = retry_at.replace(tzinfo=timezone.utc)
+    return max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds())
+
+
+# -----Route groups that get their own circuit breaker (first matching prefix wins)
+ROUTE_GROUPS: Tuple[Tuple[str, str], ...] = (
+    ("/orders/stats", "stats"),
+    ("/menu-items", "menu"),
+    ("/orders", "orders"),
+    ("/auth", "auth"),
+    ("/health", "health"),
+)
+
+
+def route_group(path: str) -> str:
+
+    """Name of the route group a backend path belongs to"""
+
+    for prefix, group in ROUTE_GROUPS:
+        if path.startswith(prefix):
+            return group
+    return "default"
+
+
+class CircuitOpenError(Exception):
+
+    """Raised without calling the backend while a route group's circuit is open"""
+
+    def __init__(self, group: str, retry_after: float):
+        self.group = group
+        self.retry_after = retry_after
+        super().__init__(
+            f"Backend '{group}' endpoints are temporarily unavailable (circuit open), "
+            f"retry in {retry_after:.1f}s"
+        )
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "error": "circuit_open",
+            "route_group": self.group,
+            "retry_after": round(self.retry_after, 1),
+        }
+
+
+class CircuitBreaker:
+
+    """
+    Consecutive-failure circuit breaker for one route group.
+
+    closed    -> requests flow; `failure_threshold` consecutive failures
+                 (errors, 5xx/429 or responses slower than `latency_threshold`)
+                 open the circuit
+    open      -> requests fail fast with CircuitOpenError for `recovery_timeout`
+    half_open -> one probe request is let through; success closes the
+                 circuit, failure opens it again
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(
+        self,
+        name: str,
+        failure_threshold: int = 5,
+        recovery_timeout: float = 30.0,
+        latency_threshold: Optional[float] = None,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.recovery_timeout = recovery_timeout
+        self.latency_threshold = latency_threshold
+        self._clock = clock
+
+        self.state = self.CLOSED
+        self.consecutive_failures = 0
+        self.opened_at = 0.0
+        self.times_opened = 0
+        self.rejected = 0
+        self._probe_in_flight = False
+
+    def before_request(self) -> None:
+
+        """Raise CircuitOpenError unless a request may be sent now"""
+
+        if self.state == self.OPEN:
+            remaining = self.opened_at + self.recovery_timeout - self._clock()
+            if remaining > 0:
+                self.rejected += 1
+                raise CircuitOpenError(self.name, remaining)
+            self.state = self.HALF_OPEN
+
+        if self.state == self.HALF_OPEN:
+            if self._probe_in_flight:
+                self.rejected += 1
+                raise CircuitOpenError(self.name, 0.0)
+            self._probe_in_flight = True
+
+    def record_success(self, latency: float) -> None:
+        if self.latency_threshold is not None and latency > self.latency_threshold:
+            self.record_failure()
+            return
+        self._probe_in_flight = False
+        self.consecutive_failures = 0
+        self.state = self.CLOSED
+
+    def record_failure(self) -> None:
+        self._probe_in_flight = False
+        self.consecutive_failures += 1
+        if self.state == self.HALF_OPEN or self.consecutive_failures >= self.failure_threshold:
+            if self.state != self.OPEN:
+                self.times_opened += 1
+            self.state = self.OPEN
+            self.opened_at = self._clock()
+
+    def release(self) -> None:
+
+        """Free the half-open probe slot when a request ended without an outcome"""
+
+        self._probe_in_flight = False
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "state": self.state,
+            "consecutive_failures": self.consecutive_failures,
+            "times_opened": self.times_opened,
+            "rejected": self.rejected,
+        }
+
+
+class CircuitBreakers:
+
+    """One CircuitBreaker per route group, created on first use"""
+
+    def __init__(
+        self,
+        failure_threshold: int = 5,
+        recovery_timeout: float = 30.0,
+        latency_thresholds: Optional[Dict[str, float]] = None,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.failure_threshold = failure_threshold
+        self.recovery_timeout = recovery_timeout
+        self.latency_thresholds = latency_thresholds or {}
+        self._clock = clock
+        self._breakers: Dict[str, CircuitBreaker] = {}
+
+    def for_path(self, path: str) -> CircuitBreaker:
+        group = route_group(path)
+        breaker = self._breakers.get(group)
+        if breaker is None:
+            breaker = CircuitBreaker(
+                group,
+                failure_threshold=self.failure_threshold,
+                recovery_timeout=self.recovery_timeout,
+                latency_threshold=self.latency_thresholds.get(group),
+                clock=self._clock,
+            )
+            self._breakers[group] = breaker
+        return breaker
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        return {group: breaker.snapshot() for group, breaker in sorted(self._breakers.items())}
+
+
+class LatencyWindow:
+
+    """Recent response latencies of one route group, for percentile estimates"""
+
+    def __init__(self, size: int = 200):
+        self._samples: Deque[float] = deque(maxlen=size)
+
+    def record(self, latency: float) -> None:
+        self._samples.append(latency)
+
+    def __len__(self) -> int:
+        return len(self._samples)
+
+    def percentile(self, p: float) -> Optional[float]:
+
+        """Nearest-rank percentile of the recorded latencies (None when empty)"""
+
+        if not self._samples:
+            return None
+        return percentile(sorted(self._samples), p)
+
+
+class LatencyTracker:
+
+    """One LatencyWindow per route group"""
+
+    def __init__(self, size: int = 200):
+        self.size = size
+        self._windows: Dict[str, LatencyWindow] = {}
+
+    def for_path(self, path: str) -> LatencyWindow:
+        group = route_group(path)
+        window = self._windows.get(group)
+        if window is None:
+            window = self._windows[group] = LatencyWindow(self.size)
+        return window
@@ -3,4 +3,4 @@
 
 from .menu_resources import *
 
-__all__ = ["get_menu_resource"]
\ No newline at end of file
+__all__ = ["get_menu_resource", "get_menu_changes"]
\ No newline at end of file
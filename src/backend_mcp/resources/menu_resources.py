@@ -1,8 +1,14 @@
-
 """Menu-related MCP resources"""
 
-from typing import Dict, Any
+from collections import OrderedDict
+from typing import Dict, Any, List, Tuple
 from ..client import client
+from ..config import settings
+from ..menu_snapshot import menu_snapshot
+
+# -----Rendered Markdown per category, reused while the backend client returns the same items
+_RENDERED_MAX_ENTRIES = 32
+_rendered: "OrderedDict[str, Tuple[List[Dict[str, Any]], str]]" = OrderedDict()
 
 
 async def get_menu_resource(category: str = "all") -> str:
@@ -21,27 +27,69 @@ async def get_menu_resource(category: str = "all") -> str:
     """
 
     params = {} if category == "all" else {"category": category}
-    response = await client.get("/menu-items/", params=params)
-    items = response.json()
+    items = await client.get_json("/menu-items/", params=params, ttl=settings.menu_cache_ttl)
+    if not params:
+        await menu_snapshot.refresh(items)
 
-    menu_text = f"# Restaurant Menu ({category.title()})\n\n" # -----menu items as readable text
+    # -----Cached and revalidated (304) responses are the very same list object,
+    # -----so the text only needs rendering again when the menu data was refetched
+    cached = _rendered.get(category)
+    if cached is not None and cached[0] is items:
+        _rendered.move_to_end(category)
+        return cached[1]
 
-    current_category = None
-    for item in items:
-        item_category = item.get('category', 'Unknown')
+    menu_text = render_menu(category, items)
+    _rendered[category] = (items, menu_text)
+    _rendered.move_to_end(category)
+    while len(_rendered) > _RENDERED_MAX_ENTRIES:
+        _rendered.popitem(last=False)
+    return menu_text
+
+
+async def get_menu_changes(since_version: int = 0) -> Dict[str, Any]:
+
+    """
+    Get what changed on the menu after a snapshot version.
+
+    Clients keep the returned `version` and pass it back next time, so only
+    price changes, availability flips, new and removed items are sent
+    instead of the whole menu.
+
+    Args:
+        since_version: Last menu version the client has seen (0 = everything)
 
-        # -----Add category header
-        if item_category != current_category:
-            current_category = item_category
-            menu_text += f"\n## {item_category.replace('_', ' ').title()}\n\n"
+    Returns:
+        Current version plus the changed items, or the full item list with
+        `full: true` when `since_version` is no longer in the history
+    """
+
+    items = await client.get_json("/menu-items/", ttl=settings.menu_cache_ttl)
+    await menu_snapshot.refresh(items)
+    return menu_snapshot.changes_since(since_version)
 
-        # -----Add item details
+
+def render_menu(category: str, items: List[Dict[str, Any]]) -> str:
+
+    """
+    Render menu items as Markdown, one section per menu category.
+
+    Items are grouped by category in order of first appearance, so each
+    header is written once even if the backend returns items unsorted.
+    """
+
+    sections: Dict[str, List[str]] = {}
+    for item in items:
         name = item.get('name', 'Unknown')
         price = item.get('price', 0)
         desc = item.get('description', 'No description')
         available = "Item is available" if item.get('is_available') else "Item is not available"
 
-        menu_text += f"**{name}** - ${price:.2f} [{available}]\n"
-        menu_text += f"  {desc}\n\n"
+        sections.setdefault(item.get('category', 'Unknown'), []).append(
+            f"**{name}** - ${price:.2f} [{available}]\n  {desc}\n\n"
+        )
 
-    return menu_text
+    parts = [f"# Restaurant Menu ({category.title()})\n\n"] # -----menu items as readable text
+    for item_category, entries in sections.items():
+        parts.append(f"\n## {item_category.replace('_', ' ').title()}\n\n")
+        parts.extend(entries)
+    return "".join(parts)
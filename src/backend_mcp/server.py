@@ -5,16 +5,172 @@ Provides MCP tools, resources, and prompts
 Interact with the restaurant backend API
 """
 
+import asyncio
+import logging
+import socket
+import weakref
+from contextlib import asynccontextmanager
+from typing import Iterable, Set
 from fastmcp import FastMCP
+from fastmcp.tools.tool import ToolResult
+from mcp.server.session import ServerSession
+from mcp.types import TextContent
+from pydantic import AnyUrl
 from .config import settings
+from .client import client
+from .metrics import client_collector, create_metrics_server, registry
+from .logging_config import configure_logging
+from .menu_snapshot import menu_snapshot
+from .middleware import (
+    CircuitOpenMiddleware,
+    DeadlineMiddleware,
+    MetricsMiddleware,
+    ProfilingMiddleware,
+    RecordingMiddleware,
+    RequestContextMiddleware,
+    ResponseShapingMiddleware,
+    TracingMiddleware,
+)
+from .recording import recorder
+from .tracing import create_exporter, tracer
+from . import codec
 from . import tools
 from . import resources
 from . import prompts
 
+logger = logging.getLogger(__name__)
+
+
+@asynccontextmanager
+async def lifespan(server: FastMCP):
+
+    # -----Open the backend connection pool for the lifetime of the server
+    await client.start()
+    tracer.exporter = create_exporter(settings.tracing_exporter)
+    if settings.recording_enabled:
+        recorder.open(settings.recording_file)
+
+    # -----Optional Prometheus endpoint, served on the same event loop
+    metrics_server = None
+    metrics_task = None
+    if settings.metrics_enabled:
+        metrics_server, metrics_task = start_metrics_server(settings.metrics_host, settings.metrics_port)
+    try:
+        yield {}
+    finally:
+        if metrics_task is not None:
+            await stop_metrics_server(metrics_server, metrics_task)
+        tracer.shutdown()
+        recorder.close()
+        await client.aclose()
+
+
+def start_metrics_server(host: str, port: int):
+
+    """
+    Start the metrics endpoint as a task, or return (None, None) if it can't listen.
+
+    The socket is bound here rather than by uvicorn, which calls sys.exit()
+    when the port is taken and would take the MCP server down with it (a
+    second stdio client started with METRICS_ENABLED=true, for instance).
+    """
+
+    try:
+        sock = socket.create_server((host, port))
+    except OSError as e:
+        logger.warning(f"Metrics endpoint disabled, cannot listen on {host}:{port}: {e}")
+        return None, None
+
+    metrics_server = create_metrics_server(host, port)
+
+    async def serve():
+        try:
+            await metrics_server.serve(sockets=[sock])
+        except (Exception, SystemExit) as e:
+            logger.warning(f"Metrics endpoint stopped: {e!r}")
+        finally:
+            sock.close()
+
+    logger.info(f"Metrics available at http://{host}:{port}/metrics")
+    return metrics_server, asyncio.create_task(serve())
+
+
+async def stop_metrics_server(metrics_server, metrics_task: asyncio.Task):
+    if metrics_task.done():
+        if not metrics_task.cancelled() and metrics_task.exception() is not None:
+            logger.warning(f"Metrics endpoint had failed: {metrics_task.exception()!r}")
+        return
+    metrics_server.should_exit = True
+    await metrics_task
+
+
+# -----Backend client state is read at scrape time
+registry.add_collector(client_collector(client))
+
+
+# -----Menu resources each session subscribed to (resources/subscribe); closed sessions drop out
+menu_subscriptions: "weakref.WeakKeyDictionary[ServerSession, Set[str]]" = weakref.WeakKeyDictionary()
+
+
+async def notify_menu_updated(uris: Iterable[str]):
+
+    """
+    Send notifications/resources/updated for changed menu resources.
+
+    Only sessions subscribed to a changed resource are notified. Sessions
+    are notified concurrently, each within MENU_NOTIFY_TIMEOUT, so a slow
+    or stuck client doesn't hold up the request that found the change.
+    """
+
+    uris = list(uris)
+    targets = {session: [uri for uri in uris if uri in subscribed] for session, subscribed in list(menu_subscriptions.items())}
+
+    async def notify(session: ServerSession, changed: list):
+        try:
+            async with asyncio.timeout(settings.menu_notify_timeout):
+                for uri in changed:
+                    await session.send_resource_updated(AnyUrl(uri))
+        except Exception as e:
+            logger.debug(f"Dropping menu subscriptions of an unresponsive session: {e!r}")
+            menu_subscriptions.pop(session, None)
+
+    await asyncio.gather(*(notify(session, changed) for session, changed in targets.items() if changed))
+
+
+menu_snapshot.add_listener(notify_menu_updated)
+
+
+def encoded(result):
+
+    """
+    Encode a list result once with the fast codec.
+
+    FastMCP serializes list results to text and then walks them again
+    looking for structured content it only keeps for dicts; returning the
+    finished ToolResult skips that second pass over large order lists.
+    """
+
+    if isinstance(result, list):
+        return ToolResult(content=[TextContent(type="text", text=codec.dumps(result))])
+    return result
+
+
 # -----Initialize MCP server
 mcp = FastMCP(
     name="Restaurant Backend API",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan,
+    tool_serializer=codec.dumps,
+    middleware=[
+        RequestContextMiddleware(),
+        MetricsMiddleware(),
+        ProfilingMiddleware(),
+        RecordingMiddleware(),
+        TracingMiddleware(),
+        ResponseShapingMiddleware(),
+        DeadlineMiddleware(),
+        CircuitOpenMiddleware(),
+    ]
 )
 
 
@@ -24,9 +180,10 @@ mcp = FastMCP(
 @mcp.tool()
 async def get_menu_items(
         category: str = None,
-        is_available: bool = None):
+        is_available: bool = None,
+        fields: str | list[str] = None):
 
-    return await tools.get_menu_items(category, is_available)
+    return encoded(await tools.get_menu_items(category, is_available, fields))
 
 @mcp.tool()
 async def get_menu_item_details(item_id: int):
@@ -83,14 +240,22 @@ async def get_order_details(order_id: int):
     return await tools.get_order_details(order_id)
 
 @mcp.tool()
-async def get_customer_orders(customer_id: int):
+async def get_customer_orders(
+        customer_id: int,
+        fields: str | list[str] = None,
+        page_size: int = None,
+        cursor: str = None):
 
-    return await tools.get_customer_orders(customer_id)
+    return encoded(await tools.get_customer_orders(customer_id, fields, page_size, cursor))
 
 @mcp.tool()
-async def get_orders_by_status(status: str):
+async def get_orders_by_status(
+        status: str,
+        fields: str | list[str] = None,
+        page_size: int = None,
+        cursor: str = None):
 
-    return await tools.get_orders_by_status(status)
+    return encoded(await tools.get_orders_by_status(status, fields, page_size, cursor))
 
 @mcp.tool()
 async def update_order_status(
@@ -104,7 +269,22 @@ async def update_order_status(
 @mcp.tool()
 async def get_order_journey(order_id: int):
 
-    return await tools.get_order_journey(order_id)
+    return encoded(await tools.get_order_journey(order_id))
+
+@mcp.tool()
+async def get_order_snapshot(order_id: int):
+
+    return await tools.get_order_snapshot(order_id)
+
+@mcp.tool()
+async def get_orders_details_batch(order_ids: list[int]):
+
+    return await tools.get_orders_details_batch(order_ids)
+
+@mcp.tool()
+async def get_orders_journey_batch(order_ids: list[int]):
+
+    return await tools.get_orders_journey_batch(order_ids)
 
 @mcp.tool()
 async def get_filtered_orders(
@@ -116,10 +296,28 @@ async def get_filtered_orders(
         min_amount: float = None,
         max_amount: float = None,
         skip: int = 0,
-        limit: int = 100):
+        limit: int = 100,
+        page_size: int = None,
+        cursor: str = None):
+
+    return encoded(await tools.get_filtered_orders(
+        status, order_type, customer_id, start_date, end_date, min_amount, max_amount, skip, limit,
+        page_size, cursor
+    ))
 
-    return await tools.get_filtered_orders(
-        status, order_type, customer_id, start_date, end_date, min_amount, max_amount, skip, limit
+@mcp.tool()
+async def get_orders_summary(
+        status: str = None,
+        order_type: str = None,
+        customer_id: int = None,
+        start_date: str = None,
+        end_date: str = None,
+        min_amount: float = None,
+        max_amount: float = None,
+        max_orders: int = None):
+
+    return await tools.get_orders_summary(
+        status, order_type, customer_id, start_date, end_date, min_amount, max_amount, max_orders
     )
 
 
@@ -179,6 +377,11 @@ async def get_order_reviews(order_id: int):
 
     return await tools.get_order_reviews(order_id)
 
+@mcp.tool()
+async def get_orders_reviews_batch(order_ids: list[int]):
+
+    return await tools.get_orders_reviews_batch(order_ids)
+
 @mcp.tool()
 async def create_review(
         customer_id: int,
@@ -226,6 +429,24 @@ async def check_backend_health():
     return await tools.check_backend_health()
 
 
+# -----(paging_tool)
+@mcp.tool()
+async def get_more_results(cursor: str):
+
+    return await tools.get_more_results(cursor)
+
+
+# -----(debug_tool)
+if settings.profiling_enabled:
+    @mcp.tool()
+    async def start_profiling(
+            seconds: float = None,
+            tool_calls: int = None,
+            format: str = "speedscope"):
+
+        return await tools.start_profiling(seconds, tool_calls, format)
+
+
 # -----Resources Registration
 
 @mcp.resource("menu://all")
@@ -238,6 +459,39 @@ async def menu_category_resource(category: str):
 
     return await resources.get_menu_resource(category)
 
+@mcp.resource("menu://changes/{since_version}", mime_type="application/json")
+async def menu_changes_resource(since_version: int):
+
+    return await resources.get_menu_changes(since_version)
+
+
+# -----(resources/subscribe, resources/unsubscribe)
+_get_capabilities = mcp._mcp_server.get_capabilities
+
+
+def get_capabilities(*args, **kwargs):
+
+    """The lowlevel server always advertises resources.subscribe=false; this server supports it"""
+
+    capabilities = _get_capabilities(*args, **kwargs)
+    if capabilities.resources is not None:
+        capabilities.resources.subscribe = True
+    return capabilities
+
+
+mcp._mcp_server.get_capabilities = get_capabilities
+
+
+@mcp._mcp_server.subscribe_resource()
+async def subscribe_resource(uri: AnyUrl):
+
+    menu_subscriptions.setdefault(mcp._mcp_server.request_context.session, set()).add(str(uri))
+
+@mcp._mcp_server.unsubscribe_resource()
+async def unsubscribe_resource(uri: AnyUrl):
+
+    menu_subscriptions.get(mcp._mcp_server.request_context.session, set()).discard(str(uri))
+
 
 # -----Prompts Registration
 
@@ -262,21 +516,19 @@ async def order_assistance_prompt():
 # -----Main Entry Point
 
 def main():
-    import logging
 
-    # -----Logging configuration
-    logging.basicConfig(
-        level=getattr(logging, settings.log_level),
-        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-    )
+    # -----Logging configuration (stderr or LOG_FILE; stdout is the MCP stdio transport)
+    listener = configure_logging()
 
-    logger = logging.getLogger(__name__)
     logger.info(f"Starting Restaurant Backend MCP Server")
     logger.info(f"Backend URL: {settings.backend_url}")
     logger.info(f"Environment: {settings.environment}")
 
     # -----Run MCP server
-    mcp.run()
+    try:
+        mcp.run()
+    finally:
+        listener.stop()
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -0,0 +1,68 @@
+"""Keep large list results inside a token budget: a page, a continuation cursor and a summary"""
+
+from collections import Counter, defaultdict
+from typing import Any, Dict, List
+
+from .config import settings
+from .cursors import pager
+
+Record = Dict[str, Any]
+
+# -----Keys whose values are counted in the summary of a truncated list
+_GROUP_KEYS = ("status", "order_type", "category")
+
+
+def estimate_tokens(text: str) -> int:
+
+    """Rough token count of a JSON payload (characters / chars-per-token)"""
+
+    return int(len(text) / settings.response_chars_per_token) + 1
+
+
+def summarize(records: List[Record]) -> Dict[str, Any]:
+
+    """
+    Aggregate a whole list so the model sees its shape without every record.
+
+    Returns:
+        Record count, counts per status / order type / category when present,
+        and order amount totals (overall and per status) when present
+    """
+
+    summary: Dict[str, Any] = {"count": len(records)}
+    for key in _GROUP_KEYS:
+        groups = Counter(str(record[key]) for record in records if isinstance(record, dict) and key in record)
+        if groups:
+            summary[f"by_{key}"] = dict(groups)
+
+    totals: Dict[str, float] = defaultdict(float)
+    for record in records:
+        if isinstance(record, dict) and "final_amount" in record:
+            totals[str(record.get("status", "all"))] += float(record["final_amount"] or 0)
+    if totals:
+        summary["total_amount"] = round(sum(totals.values()), 2)
+        summary["amount_by_status"] = {status: round(total, 2) for status, total in totals.items()}
+    return summary
+
+
+async def shape(tool: str, records: List[Record], text_length: int) -> Dict[str, Any]:
+
+    """
+    Cut `records` (whose JSON is `text_length` characters) down to the budget.
+
+    The rest of the list is kept behind a cursor of the shared pager, so
+    get_more_results continues it like any other paged result.
+
+    Returns:
+        The first page, a cursor for the rest and a summary of the whole list
+    """
+
+    budget_chars = settings.response_budget_tokens * settings.response_chars_per_token
+    per_record = text_length / max(len(records), 1)
+    page_size = max(1, int(budget_chars * 0.9 / per_record))  # -----Leave room for the summary
+
+    async def fetch(offset: int, limit: int) -> List[Record]:
+        return records[offset:offset + limit]
+
+    extra = {"tool": tool, "total": len(records), "summary": summarize(records), "truncated": True}
+    return await pager.start(tool, fetch, page_size, total=len(records), extra=extra)
@@ -0,0 +1,78 @@
+"""Single-flight coalescing of concurrent identical calls"""
+
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Hashable
+
+from . import deadline
+
+
+class SingleFlight:
+
+    """
+    Share one in-flight call between concurrent callers with the same key.
+
+    The first caller for a key starts the call; callers arriving while it is
+    still running await the same future instead of starting their own. Once
+    the call finishes the key is forgotten, so later callers start afresh.
+
+    The shared call runs without a deadline; each caller only waits for it
+    as long as its own deadline allows.
+    """
+
+    def __init__(self):
+        self._calls: Dict[Hashable, asyncio.Future] = {}
+        self.executed = 0
+        self.coalesced = 0
+
+    def in_flight(self, key: Hashable) -> bool:
+        return key in self._calls
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[Any]]) -> Any:
+
+        """
+        Run `fn` once for all concurrent callers of `key`.
+
+        Args:
+            key: Identity of the call
+            fn: Coroutine factory performing the call
+
+        Returns:
+            The (shared) result of `fn`
+        """
+
+        deadline.check("shared call")
+        task = self._calls.get(key)
+        if task is not None:
+            self.coalesced += 1
+            return await deadline.bounded(asyncio.shield(task), "shared call")
+
+        self.executed += 1
+        # -----Started outside the leader's deadline: it is shared by callers with other deadlines
+        task = asyncio.get_running_loop().create_task(fn(), context=deadline.unbounded_context())
+        self._calls[key] = task
+
+        def _done(done: asyncio.Future) -> None:
+            if self._calls.get(key) is done:
+                del self._calls[key]
+            # -----Mark the exception retrieved even if every caller was cancelled
+            if not done.cancelled():
+                done.exception()
+
+        task.add_done_callback(_done)
+
+        # -----Shielded so one caller's cancellation or deadline doesn't cancel the others
+        return await deadline.bounded(asyncio.shield(task), "shared call")
+
+    def forget(self, predicate: Callable[[Hashable], bool]) -> None:
+
+        """Detach in-flight calls matching `predicate` so new callers start a fresh call"""
+
+        for key in [k for k in self._calls if predicate(k)]:
+            del self._calls[key]
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "in_flight": len(self._calls),
+            "executed": self.executed,
+            "coalesced": self.coalesced,
+        }
@@ -0,0 +1,326 @@
+"""
+In-process fake of the restaurant FastAPI backend.
+
+Serves every endpoint the tools call, from deterministic generated data,
+with configurable latency and payload size. Used by the benchmarks and by
+offline tests through httpx.ASGITransport (no sockets involved).
+"""
+
+import asyncio
+import random
+from collections import Counter
+from datetime import date, timedelta
+from typing import Any, Dict, List, Optional
+
+import httpx
+from fastapi import Body, FastAPI, HTTPException
+
+CATEGORIES = ("appetizer", "main_course", "dessert", "beverage", "side")
+STATUSES = ("pending", "confirmed", "preparing", "ready", "out_for_delivery", "delivered", "cancelled")
+ORDER_TYPES = ("dine_in", "takeaway", "delivery")
+
+
+class StubData:
+
+    """Generated menu, orders, journeys and reviews"""
+
+    def __init__(
+        self,
+        menu_items: int = 60,
+        orders: int = 1000,
+        customers: int = 50,
+        items_per_order: int = 3,
+        description_size: int = 64,
+        history_days: int = 300,
+        seed: int = 0,
+    ):
+        rng = random.Random(seed)
+        filler = "x" * description_size
+        # -----Orders are spread over the last `history_days` days, so "today" always has some
+        today = date.today()
+
+        self.menu_items: List[Dict[str, Any]] = [
+            {
+                "id": i,
+                "name": f"Item {i}",
+                "price": round(rng.uniform(2, 40), 2),
+                "category": CATEGORIES[i % len(CATEGORIES)],
+                "description": filler,
+                "is_available": i % 7 != 0,
+                "image_url": None,
+                "preparation_time": 5 + i % 30,
+            }
+            for i in range(1, menu_items + 1)
+        ]
+
+        self.orders: List[Dict[str, Any]] = []
+        self.journeys: Dict[int, List[Dict[str, Any]]] = {}
+        self.reviews: Dict[int, List[Dict[str, Any]]] = {}
+        for i in range(1, orders + 1):
+            items = [
+                {
+                    "menu_item_id": rng.randint(1, menu_items),
+                    "quantity": rng.randint(1, 3),
+                    "special_instructions": None,
+                }
+                for _ in range(items_per_order)
+            ]
+            total = round(rng.uniform(10, 200), 2)
+            status = STATUSES[rng.randrange(len(STATUSES))]
+            day = today - timedelta(days=i % history_days)
+            self.orders.append({
+                "id": i,
+                "customer_id": rng.randint(1, customers),
+                "order_type": ORDER_TYPES[i % len(ORDER_TYPES)],
+                "status": status,
+                "items": items,
+                "total_amount": total,
+                "final_amount": total,
+                "special_instructions": filler,
+                "created_at": f"{day}T12:00:00",
+            })
+            self.journeys[i] = [
+                {"id": i * 10 + step, "order_id": i, "status": s, "timestamp": f"{day}T12:{step:02d}:00", "notes": None}
+                for step, s in enumerate(STATUSES[:STATUSES.index(status) + 1])
+            ]
+            if i % 4 == 0:
+                self.reviews[i] = [{"id": i, "order_id": i, "rating": 1 + i % 5, "comment": filler}]
+
+        self.customers: Dict[int, Dict[str, Any]] = {
+            i: {
+                "id": i,
+                "first_name": "Customer",
+                "last_name": str(i),
+                "email": f"customer{i}@example.com",
+                "phone": None,
+                "address": None,
+            }
+            for i in range(1, customers + 1)
+        }
+
+
+def create_stub_app(
+    latency: float = 0.0,
+    jitter: float = 0.0,
+    seed: int = 0,
+    **data_options: Any,
+) -> FastAPI:
+
+    """
+    Build the stub backend app.
+
+    Args:
+        latency: Seconds every response is delayed by
+        jitter: Extra random delay of up to this many seconds
+        seed: Seed of the generated data and the jitter
+        **data_options: Sizes passed to StubData (menu_items, orders, customers,
+            items_per_order, description_size, history_days)
+
+    Returns:
+        FastAPI app; app.state.data holds the generated data
+    """
+
+    data = StubData(seed=seed, **data_options)
+    rng = random.Random(seed)
+    app = FastAPI(title="Restaurant Backend (stub)")
+    app.state.data = data
+
+    @app.middleware("http")
+    async def delay(request, call_next):
+        wait = latency + (rng.uniform(0, jitter) if jitter else 0.0)
+        if wait > 0:
+            await asyncio.sleep(wait)
+        return await call_next(request)
+
+    def find(items: List[Dict[str, Any]], item_id: int, what: str) -> Dict[str, Any]:
+        if 1 <= item_id <= len(items):
+            return items[item_id - 1]
+        raise HTTPException(status_code=404, detail=f"{what} not found")
+
+    # -----System
+    @app.get("/health")
+    async def health():
+        return {"status": "ok"}
+
+    # -----Menu
+    @app.get("/menu-items/")
+    async def menu_items(category: Optional[str] = None, is_available: Optional[bool] = None):
+        return [
+            item for item in data.menu_items
+            if (category is None or item["category"] == category)
+            and (is_available is None or item["is_available"] == is_available)
+        ]
+
+    @app.get("/menu-items/{item_id}")
+    async def menu_item(item_id: int):
+        return find(data.menu_items, item_id, "Menu item")
+
+    @app.post("/menu-items/")
+    async def create_menu_item(payload: Dict[str, Any] = Body(...)):
+        return {"id": len(data.menu_items) + 1, **payload}
+
+    @app.put("/menu-items/{item_id}")
+    async def update_menu_item(item_id: int, payload: Dict[str, Any] = Body(...)):
+        return {**find(data.menu_items, item_id, "Menu item"), **payload}
+
+    # -----Orders (fixed paths first, they would otherwise match /orders/{order_id})
+    @app.get("/orders/filter")
+    async def filter_orders(
+        status: Optional[str] = None,
+        order_type: Optional[str] = None,
+        customer_id: Optional[int] = None,
+        start_date: Optional[str] = None,
+        end_date: Optional[str] = None,
+        min_amount: Optional[float] = None,
+        max_amount: Optional[float] = None,
+        skip: int = 0,
+        limit: int = 100,
+    ):
+        matches = [
+            order for order in data.orders
+            if (status is None or order["status"] == status)
+            and (order_type is None or order["order_type"] == order_type)
+            and (customer_id is None or order["customer_id"] == customer_id)
+            and (start_date is None or order["created_at"][:10] >= start_date)
+            and (end_date is None or order["created_at"][:10] <= end_date)
+            and (min_amount is None or order["final_amount"] >= min_amount)
+            and (max_amount is None or order["final_amount"] <= max_amount)
+        ]
+        return matches[skip:skip + limit]
+
+    @app.get("/orders/stats/dashboard")
+    async def dashboard():
+        today = date.today().isoformat()
+        todays = [order for order in data.orders if order["created_at"][:10] == today]
+        pending = [order for order in data.orders if order["status"] == "pending"]
+        completed = [order for order in data.orders if order["status"] == "delivered"]
+        revenue = sum(order["final_amount"] for order in todays)
+        return {
+            "todays_orders_count": len(todays),
+            "todays_revenue": round(revenue, 2),
+            "pending_orders_count": len(pending),
+            "completed_today_count": sum(1 for order in todays if order["status"] == "delivered"),
+            "average_order_value": round(revenue / len(todays), 2) if todays else 0.0,
+            "pending_orders_total": round(sum(order["final_amount"] for order in pending), 2),
+            "completed_orders_total": round(sum(order["final_amount"] for order in completed), 2),
+        }
+
+    @app.get("/orders/stats/popular-items")
+    async def popular_items(limit: int = 10, days: int = 1):
+        today = date.today()
+        since = (today - timedelta(days=max(days, 1) - 1)).isoformat()
+        quantities: Counter = Counter()
+        orders: Counter = Counter()
+        for order in data.orders:
+            if since <= order["created_at"][:10] <= today.isoformat():
+                ordered: Counter = Counter()
+                for item in order["items"]:
+                    ordered[item["menu_item_id"]] += item["quantity"]
+                quantities.update(ordered)
+                orders.update(ordered.keys())
+
+        ranked = sorted(orders, key=lambda item_id: (-quantities[item_id], -orders[item_id], item_id))
+        return [
+            {
+                "rank": rank,
+                "menu_item_id": item_id,
+                "menu_item_name": data.menu_items[item_id - 1]["name"],
+                "order_count": orders[item_id],
+                "total_quantity": quantities[item_id],
+            }
+            for rank, item_id in enumerate(ranked[:limit], 1)
+        ]
+
+    @app.get("/orders/stats/revenue")
+    async def revenue(start_date: str, end_date: str, group_by: str = "day"):
+        width = {"day": 10, "month": 7, "year": 4}.get(group_by, 10)
+        totals: Dict[str, float] = {}
+        for order in data.orders:
+            day = order["created_at"][:10]
+            if start_date <= day <= end_date:
+                totals[day[:width]] = totals.get(day[:width], 0.0) + order["final_amount"]
+        return [{"period": period, "revenue": round(total, 2)} for period, total in sorted(totals.items())]
+
+    @app.get("/orders/customer/{customer_id}")
+    async def customer_orders(customer_id: int):
+        return [order for order in data.orders if order["customer_id"] == customer_id]
+
+    @app.get("/orders/status/{status}")
+    async def orders_by_status(status: str):
+        return [order for order in data.orders if order["status"] == status]
+
+    @app.post("/orders/")
+    async def create_order(payload: Dict[str, Any] = Body(...)):
+        return {"id": len(data.orders) + 1, "status": "pending", **payload}
+
+    @app.get("/orders/{order_id}")
+    async def order(order_id: int):
+        return find(data.orders, order_id, "Order")
+
+    @app.get("/orders/{order_id}/journey")
+    async def journey(order_id: int):
+        find(data.orders, order_id, "Order")
+        return data.journeys[order_id]
+
+    @app.post("/orders/{order_id}/journey")
+    async def add_journey_step(order_id: int, payload: Dict[str, Any] = Body(...)):
+        find(data.orders, order_id, "Order")
+        return {"id": order_id * 10 + len(data.journeys[order_id]), **payload}
+
+    # -----Reviews
+    @app.get("/reviews/{order_id}")
+    async def reviews(order_id: int):
+        return data.reviews.get(order_id, [])
+
+    @app.post("/reviews/")
+    async def create_review(payload: Dict[str, Any] = Body(...)):
+        return {"id": 1, **payload}
+
+    # -----Promos
+    @app.post("/promos/apply")
+    async def apply_promo(payload: Dict[str, Any] = Body(...)):
+        code = str(payload.get("promo_code") or "")
+        amount = float(payload.get("order_amount") or 0)
+        if not code.upper().startswith("PROMO"):
+            return {"valid": False, "discount_amount": 0.0, "final_amount": amount, "message": "Invalid promo code"}
+        discount = round(amount * 0.1, 2)
+        return {"valid": True, "discount_amount": discount, "final_amount": round(amount - discount, 2),
+                "message": f"Promo code {code} applied"}
+
+    @app.get("/promos/{promo_id}")
+    async def promo(promo_id: int):
+        return {"id": promo_id, "code": f"PROMO{promo_id}", "discount_percent": 10}
+
+    # -----Customers and auth
+    @app.post("/customers/")
+    async def register_customer(payload: Dict[str, Any] = Body(...)):
+        return {"id": len(data.customers) + 1, **payload}
+
+    @app.get("/customers/{customer_id}")
+    async def customer(customer_id: int):
+        if customer_id not in data.customers:
+            raise HTTPException(status_code=404, detail="Customer not found")
+        return data.customers[customer_id]
+
+    @app.put("/customers/{customer_id}")
+    async def update_customer(customer_id: int, payload: Dict[str, Any] = Body(...)):
+        if customer_id not in data.customers:
+            raise HTTPException(status_code=404, detail="Customer not found")
+        return {**data.customers[customer_id], **payload}
+
+    @app.post("/auth/login")
+    async def login(payload: Dict[str, Any] = Body(...)):
+        return {"access_token": "stub-token", "token_type": "bearer"}
+
+    @app.post("/auth/staff/login")
+    async def staff_login(payload: Dict[str, Any] = Body(...)):
+        return {"access_token": "stub-staff-token", "token_type": "bearer", "user_type": payload.get("user_type")}
+
+    return app
+
+
+def stub_transport(app: Optional[FastAPI] = None, **options: Any) -> httpx.ASGITransport:
+
+    """httpx transport that answers requests from the stub app in-process"""
+
+    return httpx.ASGITransport(app=app or create_stub_app(**options))
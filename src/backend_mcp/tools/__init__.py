@@ -9,6 +9,8 @@ from .reviews_tool import *
 from .analytics_tool import *
 from .staff_tool import *
 from .health_tool import *
+from .paging_tool import *
+from .debug_tool import *
 
 __all__ = [
     # -----Menu tools
@@ -24,7 +26,11 @@ __all__ = [
     "get_orders_by_status",
     "update_order_status",
     "get_order_journey",
+    "get_order_snapshot",
     "get_filtered_orders",
+    "get_orders_summary",
+    "get_orders_details_batch",
+    "get_orders_journey_batch",
 
     # -----Customer tools
     "register_customer",
@@ -38,6 +44,7 @@ __all__ = [
 
     # -----Review tools
     "get_order_reviews",
+    "get_orders_reviews_batch",
     "create_review",
 
     # -----Analytics tools
@@ -50,4 +57,10 @@ __all__ = [
 
     # -----Health tools
     "check_backend_health",
+
+    # -----Paging tools
+    "get_more_results",
+
+    # -----Debug tools
+    "start_profiling",
 ]
\ No newline at end of file
@@ -1,25 +1,36 @@
-
 """Analytics and statistics MCP tools"""
 
 from typing import List, Dict, Any
 from ..client import client
+from ..config import settings
+from ..analytics import order_analytics
+from .menu_tool import get_menu_items
+from .orders_tool import iter_filtered_orders
 
 
 async def get_dashboard_stats() -> Dict[str, Any]:
 
     """Get overall dashboard statistics"""
 
-    response = await client.get("/orders/stats/dashboard")
-    return response.json()
+    if settings.analytics_mode == "local":
+        await order_analytics.ensure_fresh(iter_filtered_orders)
+        return order_analytics.dashboard()
+
+    return await client.get_json("/orders/stats/dashboard")
 
 
 async def get_popular_items(limit: int = 10, days: int = 1) -> List[Dict[str, Any]]:
 
     """Get popular menu items based on order frequency"""
 
+    if settings.analytics_mode == "local":
+        await order_analytics.ensure_fresh(iter_filtered_orders)
+        menu = await get_menu_items(fields=["id", "name"])
+        names = {item["id"]: item["name"] for item in menu}
+        return order_analytics.popular_items(limit, days, names)
+
     params = {"limit": limit, "days": days}
-    response = await client.get("/orders/stats/popular-items", params=params)
-    return response.json()
+    return await client.get_json("/orders/stats/popular-items", params=params)
 
 
 async def get_revenue_stats(
@@ -30,10 +41,13 @@ async def get_revenue_stats(
 
     """Get revenue statistics for a date range"""
 
+    if settings.analytics_mode == "local":
+        await order_analytics.ensure_fresh(iter_filtered_orders)
+        return order_analytics.revenue(start_date, end_date, group_by)
+
     params = {
         "start_date": start_date,
         "end_date": end_date,
         "group_by": group_by
     }
-    response = await client.get("/orders/stats/revenue", params=params)
-    return response.json()
\ No newline at end of file
+    return await client.get_json("/orders/stats/revenue", params=params)
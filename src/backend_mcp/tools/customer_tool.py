@@ -39,7 +39,7 @@ async def register_customer(
     }
 
     response = await client.post("/customers/", json=payload)
-    return response.json()
+    return client.decode(response)
 
 
 async def get_customer_profile(customer_id: int) -> Dict[str, Any]:
@@ -54,8 +54,7 @@ async def get_customer_profile(customer_id: int) -> Dict[str, Any]:
         Customer profile details
     """
 
-    response = await client.get(f"/customers/{customer_id}")
-    return response.json()
+    return await client.get_json(f"/customers/{customer_id}")
 
 
 async def update_customer_profile(
@@ -91,7 +90,7 @@ async def update_customer_profile(
     }.items() if v is not None}
 
     response = await client.put(f"/customers/{customer_id}", json=payload)
-    return response.json()
+    return client.decode(response)
 
 
 async def customer_login(email: str, password: str) -> Dict[str, Any]:
@@ -112,5 +111,5 @@ async def customer_login(email: str, password: str) -> Dict[str, Any]:
         "password": password
     }
 
-    response = await client.post("/auth/login", json=payload)
-    return response.json()
\ No newline at end of file
+    response = await client.post("/auth/login", json=payload, idempotent=True)
+    return client.decode(response)
\ No newline at end of file
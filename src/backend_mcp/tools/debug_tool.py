@@ -0,0 +1,37 @@
+"""Debug MCP tools (registered only when PROFILING_ENABLED is set)"""
+
+from typing import Dict, Any, Optional
+from .. import profiling
+
+
+async def start_profiling(
+        seconds: Optional[float] = None,
+        tool_calls: Optional[int] = None,
+        format: str = "speedscope") -> Dict[str, Any]:
+
+    """
+    Start sampling the whole server in the background and write a profile to disk.
+
+    Time is attributed to the tool functions in backend_mcp.tools and to the
+    backend client (client._request), both on-CPU ([running]) and while
+    awaiting ([awaiting]). Open the file in https://www.speedscope.app or
+    feed the collapsed format to flamegraph.pl.
+
+    Args:
+        seconds: Stop after this many seconds (default 10 when tool_calls is not set)
+        tool_calls: Stop after this many tool calls have finished
+        format: "speedscope" (JSON) or "collapsed" (folded stacks)
+
+    Returns:
+        Where the profile will be written and when the capture stops
+    """
+
+    session = profiling.start_profile(seconds=seconds, tool_calls=tool_calls, format=format)
+    return {
+        "status": "started",
+        "output": session.output,
+        "seconds": session.seconds,
+        "tool_calls": session.tool_calls,
+        "interval": session.interval,
+        "format": session.format,
+    }
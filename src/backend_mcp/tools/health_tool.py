@@ -1,13 +1,17 @@
-
 """Health check MCP tools"""
 
 from typing import Dict, Any
+from ..batch import describe_error
 from ..client import client
 
 
 async def check_backend_health() -> Dict[str, Any]:
 
-    """Check if the backend API is healthy and responding"""
+    """Check if the backend API is healthy and responding, with per route group circuit states"""
 
-    response = await client.get("/health")
-    return {"status": "healthy", "response": response.json()}
\ No newline at end of file
+    try:
+        response = await client.get_json("/health")
+    except Exception as e:
+        # -----An unreachable backend is a health result, not a tool error
+        return {"status": "unhealthy", **describe_error(e), "circuits": client.breakers.snapshot()}
+    return {"status": "healthy", "response": response, "circuits": client.breakers.snapshot()}
\ No newline at end of file
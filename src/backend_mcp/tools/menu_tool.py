@@ -3,11 +3,15 @@
 
 from typing import Optional, List, Dict, Any
 from ..client import client
+from ..config import settings
+from ..menu_snapshot import menu_snapshot
+from ..projection import Fields, project
 
 
 async def get_menu_items(
         category: Optional[str] = None,
-        is_available: Optional[bool] = None
+        is_available: Optional[bool] = None,
+        fields: Fields = None
 ) -> List[Dict[str, Any]]:
 
     """
@@ -16,6 +20,7 @@ async def get_menu_items(
     Args:
         category: Filter by category (appetizer, main_course, dessert, beverage, side)
         is_available: Filter by availability status
+        fields: Only return these item fields ("summary" for a compact list view)
 
     Returns:
         List of menu items with details including name, price, description, category
@@ -27,8 +32,10 @@ async def get_menu_items(
     if is_available is not None:
         params["is_available"] = is_available
 
-    response = await client.get("/menu-items/", params=params)
-    return response.json()
+    items = await client.get_json("/menu-items/", params=params, ttl=settings.menu_cache_ttl)
+    if not params:
+        await menu_snapshot.refresh(items)
+    return project(items, fields, "menu")
 
 
 async def get_menu_item_details(item_id: int) -> Dict[str, Any]:
@@ -43,8 +50,7 @@ async def get_menu_item_details(item_id: int) -> Dict[str, Any]:
         Detailed menu item information including price, description, preparation time
     """
 
-    response = await client.get(f"/menu-items/{item_id}")
-    return response.json()
+    return await client.get_json(f"/menu-items/{item_id}", ttl=settings.menu_item_cache_ttl, hedge=True)
 
 
 async def create_menu_item(
@@ -84,7 +90,10 @@ async def create_menu_item(
     }
 
     response = await client.post("/menu-items/", json=payload)
-    return response.json()
+    client.invalidate("/menu-items/")
+    item = client.decode(response)
+    await menu_snapshot.apply(item)
+    return item
 
 
 async def update_menu_item(
@@ -126,4 +135,7 @@ async def update_menu_item(
     }.items() if v is not None}
 
     response = await client.put(f"/menu-items/{item_id}", json=payload)
-    return response.json()
\ No newline at end of file
+    client.invalidate("/menu-items/")
+    item = client.decode(response)
+    await menu_snapshot.apply(item)
+    return item
\ No newline at end of file
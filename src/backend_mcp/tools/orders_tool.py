@@ -1,8 +1,24 @@
 
 """Order-related MCP tools"""
 
-from typing import Optional, List, Dict, Any
+import asyncio
+import logging
+from collections import deque
+from typing import Optional, List, Dict, Any, AsyncIterator, Callable, FrozenSet, Iterable, Union
+import httpx
+from ..analytics import order_analytics
 from ..client import client
+from ..config import settings
+from ..cursors import pager
+from ..batch import fan_out, describe_error
+from ..deadline import DeadlineExceeded
+from ..projection import Fields, project
+from ..resilience import CircuitOpenError
+from ..singleflight import SingleFlight
+from .menu_tool import get_menu_item_details
+from .reviews_tool import get_order_reviews
+
+logger = logging.getLogger(__name__)
 
 
 async def create_order(
@@ -39,7 +55,10 @@ async def create_order(
     }
 
     response = await client.post("/orders/", json=payload)
-    return response.json()
+    order = client.decode(response)
+    if settings.analytics_mode == "local" and isinstance(order, dict):
+        order_analytics.upsert(order)
+    return order
 
 
 async def get_order_details(order_id: int) -> Dict[str, Any]:
@@ -54,40 +73,89 @@ async def get_order_details(order_id: int) -> Dict[str, Any]:
         Complete order details
     """
 
-    response = await client.get(f"/orders/{order_id}")
-    return response.json()
+    return await client.get_json(f"/orders/{order_id}", hedge=True)
 
 
-async def get_customer_orders(customer_id: int) -> List[Dict[str, Any]]:
+async def get_customer_orders(
+        customer_id: int,
+        fields: Fields = None,
+        page_size: Optional[int] = None,
+        cursor: Optional[str] = None
+) -> Union[List[Dict[str, Any]], Dict[str, Any]]:
 
     """
     Get all orders for a specific customer.
 
     Args:
         customer_id: The customer ID
+        fields: Only return these order fields ("summary" for a compact list view)
+        page_size: Return one page of this many orders plus a next_cursor
+        cursor: next_cursor of the previous page (the other arguments are then ignored)
 
     Returns:
-        List of all orders placed by the customer
+        List of all orders placed by the customer, or a page of them when paginating
     """
 
-    response = await client.get(f"/orders/customer/{customer_id}")
-    return response.json()
+    if cursor:
+        return await pager.resume(cursor, "get_customer_orders")
+
+    if page_size:
+        return await pager.start(
+            "get_customer_orders", _sliced(f"/orders/customer/{customer_id}", fields), page_size
+        )
 
+    orders = await client.get_json(f"/orders/customer/{customer_id}")
+    return project(orders, fields, "orders")
 
-async def get_orders_by_status(status: str) -> List[Dict[str, Any]]:
+
+async def get_orders_by_status(
+        status: str,
+        fields: Fields = None,
+        page_size: Optional[int] = None,
+        cursor: Optional[str] = None
+) -> Union[List[Dict[str, Any]], Dict[str, Any]]:
 
     """
     Get all orders with a specific status.
 
     Args:
         status: Order status (pending, confirmed, preparing, ready, out_for_delivery, delivered, cancelled)
+        fields: Only return these order fields ("summary" for a compact list view)
+        page_size: Return one page of this many orders plus a next_cursor
+        cursor: next_cursor of the previous page (the other arguments are then ignored)
 
     Returns:
-        List of orders with the specified status
+        List of orders with the specified status, or a page of them when paginating
     """
 
-    response = await client.get(f"/orders/status/{status}")
-    return response.json()
+    if cursor:
+        return await pager.resume(cursor, "get_orders_by_status")
+
+    if page_size:
+        return await pager.start("get_orders_by_status", _sliced(f"/orders/status/{status}", fields), page_size)
+
+    orders = await client.get_json(f"/orders/status/{status}")
+    return project(orders, fields, "orders")
+
+
+def _sliced(path: str, fields: Fields):
+
+    """
+    Page fetcher for endpoints without server-side pagination.
+
+    The full list is fetched once, on the first page, and kept behind the
+    cursor; later pages are slices of it.
+    """
+
+    orders = None
+
+    async def fetch(offset: int, limit: int) -> List[Dict[str, Any]]:
+        nonlocal orders
+        if orders is None:
+            orders = await client.get_json(path)
+        return project(orders[offset:offset + limit], fields, "orders")
+
+    return fetch
 
 
 async def update_order_status(
@@ -118,7 +186,11 @@ async def update_order_status(
     }
 
     response = await client.post(f"/orders/{order_id}/journey", json=payload)
-    return response.json()
+    step = client.decode(response)
+    # -----Incremental refreshes skip orders older than the lookback window, so apply the change here
+    if settings.analytics_mode == "local":
+        order_analytics.set_status(order_id, status)
+    return step
 
 
 async def get_order_journey(order_id: int) -> List[Dict[str, Any]]:
@@ -133,8 +205,85 @@ async def get_order_journey(order_id: int) -> List[Dict[str, Any]]:
         List of all status changes with timestamps and staff information
     """
 
-    response = await client.get(f"/orders/{order_id}/journey")
-    return response.json()
+    return await client.get_json(f"/orders/{order_id}/journey")
+
+
+async def get_orders_details_batch(order_ids: List[int]) -> Dict[str, Any]:
+
+    """
+    Get details for several orders at once.
+
+    Args:
+        order_ids: IDs of the orders (duplicates are fetched once)
+
+    Returns:
+        Per-order results and per-order errors; one failing order doesn't fail the batch
+    """
+
+    return await fan_out(order_ids, get_order_details, key_name="order_id")
+
+
+async def get_orders_journey_batch(order_ids: List[int]) -> Dict[str, Any]:
+
+    """
+    Get the status journey for several orders at once.
+
+    Args:
+        order_ids: IDs of the orders (duplicates are fetched once)
+
+    Returns:
+        Per-order journeys and per-order errors; one failing order doesn't fail the batch
+    """
+
+    return await fan_out(order_ids, get_order_journey, key_name="order_id")
+
+
+async def get_order_snapshot(order_id: int) -> Dict[str, Any]:
+
+    """
+    Get everything needed to track an order in one call.
+
+    Order details, journey and reviews are fetched concurrently; the menu
+    items referenced by the order are fetched (once each) as soon as the
+    details arrive, while the journey and reviews are still in flight.
+
+    Args:
+        order_id: The ID of the order
+
+    Returns:
+        Merged document with order, journey, reviews, menu items and any partial errors
+    """
+
+    journey_task = asyncio.ensure_future(get_order_journey(order_id))
+    reviews_task = asyncio.ensure_future(get_order_reviews(order_id))
+
+    try:
+        order = await get_order_details(order_id)
+
+        menu_item_ids = [
+            item["menu_item_id"] for item in order.get("items") or []
+            if item.get("menu_item_id") is not None
+        ]
+        menu = await fan_out(menu_item_ids, get_menu_item_details, key_name="menu_item_id")
+        journey, reviews = await asyncio.gather(journey_task, reviews_task, return_exceptions=True)
+    except BaseException:
+        journey_task.cancel()
+        reviews_task.cancel()
+        raise
+
+    errors = [{"part": "menu_item", **error} for error in menu["errors"]]
+    for part, outcome in (("journey", journey), ("reviews", reviews)):
+        if isinstance(outcome, Exception):
+            errors.append({"part": part, **describe_error(outcome)})
+
+    return {
+        "order": order,
+        "current_status": order.get("status"),
+        "journey": None if isinstance(journey, Exception) else journey,
+        "reviews": None if isinstance(reviews, Exception) else reviews,
+        "menu_items": [result["data"] for result in menu["results"]],
+        "errors": errors,
+    }
 
 
 async def get_filtered_orders(
@@ -146,8 +295,10 @@ async def get_filtered_orders(
         min_amount: Optional[float] = None,
         max_amount: Optional[float] = None,
         skip: int = 0,
-        limit: int = 100
-) -> List[Dict[str, Any]]:
+        limit: int = 100,
+        page_size: Optional[int] = None,
+        cursor: Optional[str] = None
+) -> Union[List[Dict[str, Any]], Dict[str, Any]]:
 
     """
     Get orders with advanced filtering options.
@@ -162,44 +313,383 @@ async def get_filtered_orders(
         max_amount: Filter orders with amount <= this value
         skip: Number of records to skip (pagination)
         limit: Maximum number of records to return
+        page_size: Return one page of this many orders (from `skip`) plus a next_cursor
+        cursor: next_cursor of the previous page (the other arguments are then ignored)
 
     Returns:
-        List of filtered orders
+        List of filtered orders, or a page of them when paginating
     """
 
-    params = {}
+    if cursor:
+        return await pager.resume(cursor, "get_filtered_orders")
 
-    if status is not None:
-        params["status"] = status
-    if order_type is not None:
-        params["order_type"] = order_type
-    if customer_id is not None:
-        params["customer_id"] = customer_id
-    if start_date is not None:
-        params["start_date"] = start_date
-    if end_date is not None:
-        params["end_date"] = end_date
-    if min_amount is not None:
-        params["min_amount"] = min_amount
-    if max_amount is not None:
-        params["max_amount"] = max_amount
+    filters = _filter_params(
+        status, order_type, customer_id, start_date, end_date, min_amount, max_amount
+    )
 
-    params["skip"] = skip
-    params["limit"] = limit
+    if page_size:
+        async def fetch(offset: int, count: int) -> List[Dict[str, Any]]:
+            return await _filter_orders(filters, offset, count)
+
+        return await pager.start("get_filtered_orders", fetch, page_size, offset=skip)
 
     try:
-        response = await client.get("/orders/filter", params=params)
-        return response.json()
+        return await _filter_orders(filters, skip, limit)
+    except DeadlineExceeded:
+        raise
     except Exception as e:
-        print(f"Warning: Failed to filter orders with params {params}: {e}")
-        if status is not None:
-            params_without_status = {k: v for k, v in params.items() if k != "status"}
+        logger.warning(
+            f"Failed to filter orders with filters {filters}: {e}",
+            extra={"event": "orders.filter_failed", "filters": filters},
+        )
+        return []
+
+
+async def _filter_orders(filters: Dict[str, Any], skip: int, limit: int) -> List[Dict[str, Any]]:
+
+    """
+    Up to `limit` orders matching `filters`, after skipping `skip` matches.
+
+    Filters the backend supports are sent as query params; the others are
+    applied client-side while streaming. Backend errors are raised.
+    """
+
+    supported = await get_supported_filters()
+
+    # -----Every filter is handled by the backend: one request, one page
+    if all(name in supported for name in filters):
+        params = {**filters, "skip": skip, "limit": limit}
+        return await client.get_json("/orders/filter", params=params)
+
+    # -----Otherwise stream and filter client-side, paging over the matches
+    results = []
+    if limit <= 0:
+        return results
+    matched = 0
+    orders = iter_filtered_orders(**filters, page_size=max(limit, settings.orders_page_size))
+    try:
+        async for order in orders:
+            if matched >= skip:
+                results.append(order)
+            matched += 1
+            if len(results) >= limit:
+                break
+    finally:
+        await orders.aclose()
+    return results
+
+
+def _filter_params(
+        status: Optional[str] = None,
+        order_type: Optional[str] = None,
+        customer_id: Optional[int] = None,
+        start_date: Optional[str] = None,
+        end_date: Optional[str] = None,
+        min_amount: Optional[float] = None,
+        max_amount: Optional[float] = None
+) -> Dict[str, Any]:
+
+    """Build /orders/filter query params, leaving out unset filters"""
+
+    params = {
+        "status": status,
+        "order_type": order_type,
+        "customer_id": customer_id,
+        "start_date": start_date,
+        "end_date": end_date,
+        "min_amount": min_amount,
+        "max_amount": max_amount
+    }
+    return {k: v for k, v in params.items() if v is not None}
+
+
+def _order_date(order: Dict[str, Any]) -> str:
+    return str(order.get("created_at") or "")[:10]
+
+
+def _order_amount(order: Dict[str, Any]) -> float:
+    return float(order.get("final_amount") or 0)
+
+
+# -----Client-side equivalents of the /orders/filter query params
+_FILTER_MATCHERS: Dict[str, Callable[[Dict[str, Any], Any], bool]] = {
+    "status": lambda order, value: order.get("status") == value,
+    "order_type": lambda order, value: order.get("order_type") == value,
+    "customer_id": lambda order, value: order.get("customer_id") == value,
+    "start_date": lambda order, value: _order_date(order) >= value,
+    "end_date": lambda order, value: _order_date(order) <= value,
+    "min_amount": lambda order, value: _order_amount(order) >= value,
+    "max_amount": lambda order, value: _order_amount(order) <= value,
+}
+
+# -----Harmless values used to probe each filter when no OpenAPI schema is available
+_PROBE_VALUES: Dict[str, Any] = {
+    "status": "pending",
+    "order_type": "dine_in",
+    "customer_id": 1,
+    "start_date": "2000-01-01",
+    "end_date": "2000-01-01",
+    "min_amount": 0,
+    "max_amount": 0,
+}
+
+# -----Statuses with which /orders/filter rejects a query parameter it doesn't know
+_UNSUPPORTED_STATUSES = (400, 422)
+
+_supported_filters: Optional[FrozenSet[str]] = None
+_probe_flight = SingleFlight()
+
+
+async def get_supported_filters() -> FrozenSet[str]:
+
+    """
+    Return the /orders/filter query params the backend supports.
+
+    The backend is probed once and the answer is kept for the lifetime of
+    the process. The FastAPI OpenAPI schema is used when available, otherwise
+    each filter is tried on its own with limit=1. If the backend can't be
+    reached every filter is assumed supported and the probe is retried later.
+    """
+
+    global _supported_filters
+    if _supported_filters is None:
+        supported = await _probe_flight.do("/orders/filter", _probe_filters)
+        if supported is None:
+            return frozenset(_FILTER_MATCHERS)
+        _supported_filters = supported
+    return _supported_filters
+
+
+def reset_supported_filters() -> None:
+
+    """Forget the probed filter capabilities, e.g. after pointing the client at another backend"""
+
+    global _supported_filters
+    _supported_filters = None
+
+
+async def _probe_filters() -> Optional[FrozenSet[str]]:
+    try:
+        schema = await client.get_json("/openapi.json")
+        operation = schema["paths"]["/orders/filter"]["get"]
+        names = {p["name"] for p in operation.get("parameters", []) if p.get("in") == "query"}
+        supported = frozenset(name for name in _FILTER_MATCHERS if name in names)
+        source = "openapi"
+    except (httpx.HTTPStatusError, KeyError, TypeError, ValueError):
+        async def probe(name: str) -> Optional[bool]:
             try:
-                response = await client.get("/orders/filter", params=params_without_status)
-                results = response.json()
-                if status and results:
-                    results = [order for order in results if order.get('status') == status]
-                return results
-            except Exception as e2:
-                print(f"Warning: Retry also failed: {e2}")
-        return []
\ No newline at end of file
+                await client.get_json(
+                    "/orders/filter", params={name: _PROBE_VALUES[name], "skip": 0, "limit": 1}
+                )
+                return True
+            except httpx.HTTPStatusError as e:
+                # -----Only a rejected parameter means "unsupported"; other failures are retried later
+                if e.response.status_code in _UNSUPPORTED_STATUSES:
+                    return False
+                return None
+            except (httpx.HTTPError, CircuitOpenError, DeadlineExceeded):
+                return None
+
+        names = list(_FILTER_MATCHERS)
+        answers = await asyncio.gather(*[probe(name) for name in names])
+        if None in answers:
+            return None
+        supported = frozenset(name for name, ok in zip(names, answers) if ok)
+        source = "probe"
+    except (httpx.HTTPError, CircuitOpenError, DeadlineExceeded):
+        return None
+
+    unsupported = sorted(set(_FILTER_MATCHERS) - supported)
+    logger.info(f"Order filter capabilities ({source}): unsupported={unsupported}")
+    return supported
+
+
+async def iter_filtered_orders(
+        status: Optional[str] = None,
+        order_type: Optional[str] = None,
+        customer_id: Optional[int] = None,
+        start_date: Optional[str] = None,
+        end_date: Optional[str] = None,
+        min_amount: Optional[float] = None,
+        max_amount: Optional[float] = None,
+        page_size: Optional[int] = None,
+        prefetch: Optional[int] = None
+) -> AsyncIterator[Dict[str, Any]]:
+
+    """
+    Stream filtered orders one at a time, walking /orders/filter page by page.
+
+    While one page is being consumed the next `prefetch` pages are already
+    being fetched, so the caller rarely waits on the backend. Filters the
+    backend doesn't support (see get_supported_filters) are applied to each
+    page as it streams by.
+
+    Args:
+        status: Filter by order status
+        order_type: Filter by order type (dine_in, takeaway, delivery)
+        customer_id: Filter by customer ID
+        start_date: Filter orders after this date (YYYY-MM-DD)
+        end_date: Filter orders before this date (YYYY-MM-DD)
+        min_amount: Filter orders with amount >= this value
+        max_amount: Filter orders with amount <= this value
+        page_size: Orders requested per page
+        prefetch: Pages fetched ahead of the one being consumed
+
+    Yields:
+        Orders matching the filters
+    """
+
+    filters = _filter_params(
+        status, order_type, customer_id, start_date, end_date, min_amount, max_amount
+    )
+
+    # -----Filters the backend can't apply are matched here, page by page
+    supported = await get_supported_filters()
+    params = {k: v for k, v in filters.items() if k in supported}
+    local = [(_FILTER_MATCHERS[k], v) for k, v in filters.items() if k not in supported]
+
+    page_size = page_size or settings.orders_page_size
+    prefetch = settings.orders_prefetch_pages if prefetch is None else prefetch
+
+    async def fetch_page(skip: int) -> List[Dict[str, Any]]:
+        return await client.get_json(
+            "/orders/filter", params={**params, "skip": skip, "limit": page_size}
+        )
+
+    pending = deque()
+    next_skip = 0
+    first_id = None
+
+    def schedule() -> None:
+        nonlocal next_skip
+        pending.append(asyncio.ensure_future(fetch_page(next_skip)))
+        next_skip += page_size
+
+    schedule()
+    try:
+        while pending:
+            skip = next_skip - len(pending) * page_size
+            page = await pending.popleft()
+            last_page = len(page) < page_size
+
+            # -----A backend ignoring skip or limit would otherwise be paged forever
+            if page and first_id is not None and page[0].get("id") == first_id:
+                logger.warning(f"/orders/filter returned the same page again at skip={skip}, stopping")
+                page, last_page = [], True
+            elif len(page) > page_size:
+                logger.warning(f"/orders/filter returned {len(page)} orders for limit={page_size}, stopping")
+                last_page = True
+            first_id = page[0].get("id") if page else None
+
+            if last_page:
+                _discard(pending)
+                pending.clear()
+            else:
+                # -----Fetch ahead while this page is being consumed
+                while len(pending) < prefetch:
+                    schedule()
+
+            for order in page:
+                if all(matches(order, value) for matches, value in local):
+                    yield order
+
+            if not last_page and not pending:
+                schedule()
+    finally:
+        _discard(pending)
+
+
+def _discard(tasks: Iterable[asyncio.Future]) -> None:
+
+    """Cancel prefetched pages that won't be read and retrieve any error they end with"""
+
+    for task in tasks:
+        task.cancel()
+        # -----Otherwise a page failing as it is cancelled logs "Task exception was never retrieved"
+        task.add_done_callback(lambda t: t.cancelled() or t.exception())
+
+
+async def get_orders_summary(
+        status: Optional[str] = None,
+        order_type: Optional[str] = None,
+        customer_id: Optional[int] = None,
+        start_date: Optional[str] = None,
+        end_date: Optional[str] = None,
+        min_amount: Optional[float] = None,
+        max_amount: Optional[float] = None,
+        max_orders: Optional[int] = None
+) -> Dict[str, Any]:
+
+    """
+    Summarize every order matching the filters instead of returning raw rows.
+
+    Args:
+        status: Filter by order status
+        order_type: Filter by order type (dine_in, takeaway, delivery)
+        customer_id: Filter by customer ID
+        start_date: Filter orders after this date (YYYY-MM-DD)
+        end_date: Filter orders before this date (YYYY-MM-DD)
+        min_amount: Filter orders with amount >= this value
+        max_amount: Filter orders with amount <= this value
+        max_orders: Stop after this many orders (defaults to the server limit)
+
+    Returns:
+        Order count, revenue totals and breakdowns by status, order type and day
+    """
+
+    max_orders = max_orders or settings.orders_summary_max_orders
+
+    count = 0
+    truncated = False
+    revenue = 0.0
+    min_order = None
+    max_order = None
+    by_status: Dict[str, Dict[str, Any]] = {}
+    by_order_type: Dict[str, Dict[str, Any]] = {}
+    by_day: Dict[str, Dict[str, Any]] = {}
+
+    def add(groups: Dict[str, Dict[str, Any]], key: Any, amount: float) -> None:
+        group = groups.setdefault(str(key), {"count": 0, "revenue": 0.0})
+        group["count"] += 1
+        group["revenue"] += amount
+
+    orders = iter_filtered_orders(
+        status, order_type, customer_id, start_date, end_date, min_amount, max_amount
+    )
+    try:
+        async for order in orders:
+            # -----Only a match beyond the limit means orders were left out
+            if count >= max_orders:
+                truncated = True
+                break
+
+            amount = float(order.get("final_amount") or 0)
+            count += 1
+            revenue += amount
+            min_order = amount if min_order is None else min(min_order, amount)
+            max_order = amount if max_order is None else max(max_order, amount)
+
+            add(by_status, order.get("status"), amount)
+            add(by_order_type, order.get("order_type"), amount)
+            add(by_day, str(order.get("created_at") or "unknown")[:10], amount)
+    finally:
+        await orders.aclose()
+
+    return {
+        "order_count": count,
+        "total_revenue": round(revenue, 2),
+        "average_order_value": round(revenue / count, 2) if count else 0.0,
+        "min_order_value": min_order,
+        "max_order_value": max_order,
+        "truncated": truncated,
+        "by_status": _rounded(by_status),
+        "by_order_type": _rounded(by_order_type),
+        "by_day": _rounded(dict(sorted(by_day.items()))),
+    }
+
+
+def _rounded(groups: Dict[str, Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+    return {
+        key: {"count": group["count"], "revenue": round(group["revenue"], 2)}
+        for key, group in groups.items()
+    }
@@ -0,0 +1,20 @@
+"""Continuation of paged results: list tools called with page_size and lists cut to the response budget"""
+
+from typing import Dict, Any
+from ..cursors import pager
+
+
+async def get_more_results(cursor: str) -> Dict[str, Any]:
+
+    """
+    Get the next page of any paged result.
+
+    Args:
+        cursor: The next_cursor of the previous page, from any tool
+
+    Returns:
+        The next page of items and the cursor after it (null on the last page);
+        results cut to the response budget also carry the summary of the whole list
+    """
+
+    return await pager.resume(cursor)
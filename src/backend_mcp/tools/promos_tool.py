@@ -10,13 +10,14 @@ async def apply_promo_code(promo_code: str, order_amount: float) -> Dict[str, An
     """Validate and apply a promo code to calculate discount"""
 
     payload = {"promo_code": promo_code, "order_amount": order_amount}
-    response = await client.post("/promos/apply", json=payload)
-    return response.json()
+
+    # -----Only validates and calculates, so it is safe to retry
+    response = await client.post("/promos/apply", json=payload, idempotent=True)
+    return client.decode(response)
 
 
 async def get_promo_details(promo_id: int) -> Dict[str, Any]:
 
     """Get details about a specific promo code"""
 
-    response = await client.get(f"/promos/{promo_id}")
-    return response.json()
\ No newline at end of file
+    return await client.get_json(f"/promos/{promo_id}")
\ No newline at end of file
@@ -1,16 +1,23 @@
 
 """Review-related MCP tools"""
 
-from typing import Optional, Dict, Any
+from typing import Optional, List, Dict, Any
 from ..client import client
+from ..batch import fan_out
 
 
 async def get_order_reviews(order_id: int) -> Dict[str, Any]:
 
     """Get reviews for a specific order"""
 
-    response = await client.get(f"/reviews/{order_id}")
-    return response.json()
+    return await client.get_json(f"/reviews/{order_id}")
+
+
+async def get_orders_reviews_batch(order_ids: List[int]) -> Dict[str, Any]:
+
+    """Get reviews for several orders at once, with per-order errors"""
+
+    return await fan_out(order_ids, get_order_reviews, key_name="order_id")
 
 
 async def create_review(
@@ -31,4 +38,4 @@ async def create_review(
         "menu_item_id": menu_item_id
     }
     response = await client.post("/reviews/", json=payload)
-    return response.json()
+    return client.decode(response)
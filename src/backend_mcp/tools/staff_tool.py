@@ -14,5 +14,5 @@ async def staff_login(email: str, password: str, user_type: str = "staff") -> Di
         "password": password,
         "user_type": user_type
     }
-    response = await client.post("/auth/staff/login", json=payload)
-    return response.json()
\ No newline at end of file
+    response = await client.post("/auth/staff/login", json=payload, idempotent=True)
+    return client.decode(response)
\ No newline at end of file
@@ -0,0 +1,181 @@
+"""Lightweight tracing: spans for tool calls and backend requests, W3C traceparent propagation"""
+
+import logging
+import secrets
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Dict, Iterator, List, Optional
+
+from .config import settings
+from .linewriter import JsonLinesWriter
+
+logger = logging.getLogger(__name__)
+
+# -----Span the current task is running in (copied into spawned tasks)
+_current_span: ContextVar[Optional["Span"]] = ContextVar("backend_mcp_span", default=None)
+
+
+class Span:
+
+    """One timed operation, in the OpenTelemetry span data model"""
+
+    def __init__(
+        self,
+        name: str,
+        trace_id: str,
+        parent_id: Optional[str] = None,
+        attributes: Optional[Dict[str, Any]] = None,
+    ):
+        self.name = name
+        self.trace_id = trace_id
+        self.span_id = secrets.token_hex(8)
+        self.parent_id = parent_id
+        self.attributes: Dict[str, Any] = dict(attributes or {})
+        self.status = "OK"
+        self.status_message: Optional[str] = None
+        self.start_ns = time.time_ns()
+        self.end_ns: Optional[int] = None
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        self.attributes[key] = value
+
+    def record_error(self, error: BaseException) -> None:
+        self.status = "ERROR"
+        self.status_message = str(error) or type(error).__name__
+        self.attributes["error.type"] = type(error).__name__
+
+    @property
+    def duration_ms(self) -> Optional[float]:
+        if self.end_ns is None:
+            return None
+        return (self.end_ns - self.start_ns) / 1e6
+
+    def traceparent(self) -> str:
+
+        """W3C Trace Context header value naming this span as the parent"""
+
+        return f"00-{self.trace_id}-{self.span_id}-01"
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "name": self.name,
+            "trace_id": self.trace_id,
+            "span_id": self.span_id,
+            "parent_span_id": self.parent_id,
+            "start_time_unix_nano": self.start_ns,
+            "end_time_unix_nano": self.end_ns,
+            "duration_ms": self.duration_ms,
+            "attributes": self.attributes,
+            "status": {"code": self.status, "message": self.status_message},
+        }
+
+
+class InMemoryExporter:
+
+    """Keeps finished spans in a list (for tests and debugging)"""
+
+    def __init__(self):
+        self.spans: List[Span] = []
+
+    def export(self, span: Span) -> None:
+        self.spans.append(span)
+
+    def clear(self) -> None:
+        self.spans.clear()
+
+    def close(self) -> None:
+        pass
+
+
+class FileExporter:
+
+    """Appends finished spans to a file, one JSON object per line, from a background thread"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._writer = JsonLinesWriter(path)
+
+    def export(self, span: Span) -> None:
+        self._writer.write(span.to_dict())
+
+    def close(self) -> None:
+        self._writer.close()
+
+
+class Tracer:
+
+    """
+    Creates spans and hands finished ones to the exporter.
+
+    With no exporter configured tracing is off: start_span yields None
+    and nothing is recorded or propagated.
+    """
+
+    def __init__(self, exporter=None):
+        self.exporter = exporter
+
+    @property
+    def enabled(self) -> bool:
+        return self.exporter is not None
+
+    @contextmanager
+    def start_span(self, name: str, **attributes: Any) -> Iterator[Optional[Span]]:
+
+        """
+        Run the enclosed code in a new span, a child of the current one.
+
+        Args:
+            name: Span name
+            **attributes: Initial span attributes
+
+        Yields:
+            The span, or None when tracing is disabled
+        """
+
+        if self.exporter is None:
+            yield None
+            return
+
+        parent = _current_span.get()
+        trace_id = parent.trace_id if parent is not None else secrets.token_hex(16)
+        span = Span(name, trace_id, parent.span_id if parent is not None else None, attributes)
+
+        token = _current_span.set(span)
+        try:
+            yield span
+        except BaseException as e:
+            span.record_error(e)
+            raise
+        finally:
+            span.end_ns = time.time_ns()
+            _current_span.reset(token)
+            try:
+                self.exporter.export(span)
+            except Exception:
+                logger.exception("Failed to export span")
+
+    def shutdown(self) -> None:
+        if self.exporter is not None:
+            self.exporter.close()
+
+
+def current_span() -> Optional[Span]:
+    return _current_span.get()
+
+
+def create_exporter(name: str):
+
+    """Build the exporter selected by TRACING_EXPORTER ('none', 'memory' or 'file')"""
+
+    if name == "memory":
+        return InMemoryExporter()
+    if name == "file":
+        return FileExporter(settings.tracing_file)
+    if name not in ("", "none"):
+        logger.warning(f"Unknown tracing exporter '{name}', tracing disabled")
+    return None
+
+
+# -----Global tracer, configured at server startup
+tracer = Tracer()
@@ -0,0 +1,35 @@
+"""Shared test fixtures"""
+
+import httpx
+import pytest
+
+from backend_mcp.client import BackendClient
+
+
+@pytest.fixture
+async def mock_backend(monkeypatch):
+    """
+    Build BackendClients whose requests are answered in-process by a handler.
+
+    mock_backend(handler) returns the client; mock_backend(handler, orders_tool, ...)
+    also installs it as the `client` of those modules. The handler may also be
+    a ready-made transport, e.g. stub_transport(app). Every client is closed
+    after the test.
+    """
+
+    clients = []
+
+    def make(handler, *modules, **options) -> BackendClient:
+        if isinstance(handler, httpx.AsyncBaseTransport):
+            transport = handler
+        else:
+            transport = httpx.MockTransport(handler)
+        client = BackendClient(base_url="http://backend.test", transport=transport, **options)
+        for module in modules:
+            monkeypatch.setattr(module, "client", client)
+        clients.append(client)
+        return client
+
+    yield make
+    for client in clients:
+        await client.aclose()
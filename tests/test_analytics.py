@@ -0,0 +1,233 @@
+"""Tests for the local analytics engine (offline, checked against the stub backend's own stats)"""
+
+from datetime import date, timedelta
+
+import pytest
+
+from backend_mcp.analytics import OrderAnalytics
+from backend_mcp.config import settings
+from backend_mcp.stub_backend import create_stub_app, stub_transport
+from backend_mcp.tools import analytics_tool, menu_tool, orders_tool
+
+# -----Fields of the real backend's /orders/stats/* responses (see tests/test_server.py)
+DASHBOARD_FIELDS = {
+    "todays_orders_count", "todays_revenue", "pending_orders_count", "completed_today_count",
+    "average_order_value", "pending_orders_total", "completed_orders_total",
+}
+POPULAR_ITEM_FIELDS = {"rank", "menu_item_id", "menu_item_name", "order_count", "total_quantity"}
+
+
+def order(order_id, status="pending", amount=10.0, day="2026-03-02", items=((1, 1),)):
+    return {
+        "id": order_id,
+        "status": status,
+        "final_amount": amount,
+        "created_at": f"{day}T12:00:00",
+        "items": [{"menu_item_id": item, "quantity": quantity} for item, quantity in items],
+    }
+
+
+def source_of(orders, calls=None):
+    """An iter_filtered_orders stand-in serving `orders` (honouring start_date)"""
+
+    async def source(start_date=None):
+        if calls is not None:
+            calls.append(start_date)
+        for entry in list(orders):
+            if start_date is None or entry["created_at"][:10] >= start_date:
+                yield entry
+
+    return source
+
+
+@pytest.fixture
+def stub(mock_backend, monkeypatch):
+    """Stub backend for the analytics and order tools, with a fresh local engine"""
+
+    app = create_stub_app(orders=120, menu_items=10, history_days=30)
+    mock_backend(stub_transport(app), analytics_tool, menu_tool, orders_tool)
+    monkeypatch.setattr(orders_tool, "_supported_filters", None)
+    engine = OrderAnalytics()
+    for module in (analytics_tool, orders_tool):
+        monkeypatch.setattr(module, "order_analytics", engine)
+    return app.state.data
+
+
+async def both(monkeypatch, tool, *args):
+    """Call an analytics tool in backend mode, then in local mode"""
+
+    monkeypatch.setattr(settings, "analytics_mode", "backend")
+    remote = await tool(*args)
+    monkeypatch.setattr(settings, "analytics_mode", "local")
+    local = await tool(*args)
+    return remote, local
+
+
+# -----Aggregate Tests
+class TestOrderAnalytics:
+
+    def test_upsert_replaces_previous_contribution(self):
+        engine = OrderAnalytics()
+        engine.upsert(order(1, "pending", 10.0, items=((1, 2),)))
+        engine.upsert(order(2, "pending", 5.0, day="2026-03-09"))
+        engine.upsert(order(1, "delivered", 12.0, items=((1, 2), (3, 1))))
+
+        assert engine.dashboard(today=date(2026, 3, 2)) == {
+            "todays_orders_count": 1,
+            "todays_revenue": 12.0,
+            "pending_orders_count": 1,
+            "completed_today_count": 1,
+            "average_order_value": 12.0,
+            "pending_orders_total": 5.0,
+            "completed_orders_total": 12.0,
+        }
+        assert engine.revenue("2026-03-01", "2026-03-31", "day") == [
+            {"period": "2026-03-02", "revenue": 12.0},
+            {"period": "2026-03-09", "revenue": 5.0},
+        ]
+        assert engine.upsert(order(2, "pending", 5.0, day="2026-03-09")) is False
+
+    def test_set_status_moves_a_known_order(self):
+        engine = OrderAnalytics()
+        engine.upsert(order(1, "pending", 10.0))
+
+        assert engine.set_status(1, "delivered") is True
+        assert engine.set_status(1, "delivered") is False
+        assert engine.set_status(2, "delivered") is False
+        stats = engine.dashboard(today=date(2026, 3, 2))
+        assert stats["pending_orders_count"] == 0
+        assert stats["completed_today_count"] == 1
+        assert stats["completed_orders_total"] == 10.0
+
+    def test_dashboard_has_the_backend_fields(self):
+        # -----Same keys as GET /orders/stats/dashboard, also on a day without orders
+        stats = OrderAnalytics().dashboard()
+
+        assert set(stats) == DASHBOARD_FIELDS
+        assert stats["todays_orders_count"] == 0 and stats["average_order_value"] == 0.0
+
+    def test_revenue_groups_by_week_month_and_year(self):
+        engine = OrderAnalytics()
+        for order_id, day in enumerate(["2026-03-02", "2026-03-08", "2026-03-09", "2026-04-01"]):
+            engine.upsert(order(order_id, amount=1.5, day=day))
+
+        assert engine.revenue("2026-01-01", "2026-12-31", "week") == [
+            {"period": "2026-W10", "revenue": 3.0},
+            {"period": "2026-W11", "revenue": 1.5},
+            {"period": "2026-W14", "revenue": 1.5},
+        ]
+        assert engine.revenue("2026-03-05", "2026-12-31", "month") == [
+            {"period": "2026-03", "revenue": 3.0},
+            {"period": "2026-04", "revenue": 1.5},
+        ]
+        assert engine.revenue("2026-01-01", "2026-12-31", "year") == [{"period": "2026", "revenue": 6.0}]
+
+    def test_popular_items_use_a_sliding_window(self):
+        engine = OrderAnalytics()
+        engine.upsert(order(1, day="2026-03-01", items=((7, 5),)))
+        engine.upsert(order(2, day="2026-03-10", items=((8, 2), (9, 1))))
+        engine.upsert(order(3, day="2026-03-10", items=((9, 1), (9, 1))))
+        names = {7: "Soup", 8: "Cake", 9: "Tea"}
+
+        today = date(2026, 3, 10)
+        assert engine.popular_items(10, 1, names, today=today) == [
+            {"rank": 1, "menu_item_id": 9, "menu_item_name": "Tea", "order_count": 2, "total_quantity": 3},
+            {"rank": 2, "menu_item_id": 8, "menu_item_name": "Cake", "order_count": 1, "total_quantity": 2},
+        ]
+        assert engine.popular_items(1, 30, names, today=today) == [
+            {"rank": 1, "menu_item_id": 7, "menu_item_name": "Soup", "order_count": 1, "total_quantity": 5},
+        ]
+
+    @pytest.mark.asyncio
+    async def test_incremental_refresh_pulls_recent_orders_only(self, monkeypatch):
+        monkeypatch.setattr(settings, "analytics_lookback_days", 7)
+        today = date.today().isoformat()
+        orders = [order(1, day="2020-01-01"), order(2, day=today)]
+        calls = []
+        engine = OrderAnalytics()
+
+        assert await engine.refresh(source_of(orders, calls)) == 2
+        orders[1] = order(2, "delivered", day=today)
+        assert await engine.refresh(source_of(orders, calls)) == 1
+
+        assert calls[0] is None and calls[1] > "2020-01-01"
+        assert engine.dashboard()["pending_orders_count"] == 1
+        assert engine.dashboard()["completed_today_count"] == 1
+
+    @pytest.mark.asyncio
+    async def test_full_refresh_drops_deleted_orders(self):
+        orders = [order(1), order(2, amount=4.0)]
+        engine = OrderAnalytics()
+        await engine.refresh(source_of(orders))
+        del orders[0]
+
+        await engine.refresh(source_of(orders), full=True)
+
+        assert engine.dashboard()["pending_orders_total"] == 4.0
+        assert engine.revenue("2026-03-02", "2026-03-02") == [{"period": "2026-03-02", "revenue": 4.0}]
+
+
+# -----Local Mode Tests
+class TestLocalAnalyticsMode:
+
+    @pytest.mark.asyncio
+    async def test_dashboard_has_the_backend_fields(self, stub, monkeypatch):
+        monkeypatch.setattr(settings, "analytics_mode", "local")
+
+        assert set(await analytics_tool.get_dashboard_stats()) == DASHBOARD_FIELDS
+
+    @pytest.mark.asyncio
+    async def test_popular_items_have_the_backend_fields(self, stub, monkeypatch):
+        monkeypatch.setattr(settings, "analytics_mode", "local")
+
+        items = await analytics_tool.get_popular_items(limit=5, days=365)
+
+        assert [item["rank"] for item in items] == [1, 2, 3, 4, 5]
+        assert all(set(item) == POPULAR_ITEM_FIELDS for item in items)
+        assert all(item["menu_item_name"] == f"Item {item['menu_item_id']}" for item in items)
+
+    @pytest.mark.asyncio
+    async def test_dashboard_matches_backend(self, stub, monkeypatch):
+        remote, local = await both(monkeypatch, analytics_tool.get_dashboard_stats)
+
+        assert remote["todays_orders_count"] > 0
+        assert local == remote
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("limit, days", [(5, 1), (10, 7), (15, 30)])
+    async def test_popular_items_match_backend(self, stub, monkeypatch, limit, days):
+        remote, local = await both(monkeypatch, analytics_tool.get_popular_items, limit, days)
+
+        assert remote
+        assert local == remote
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("group_by", ["day", "month", "year"])
+    async def test_revenue_matches_backend(self, stub, monkeypatch, group_by):
+        start, end = (date.today() - timedelta(days=20)).isoformat(), date.today().isoformat()
+        remote, local = await both(monkeypatch, analytics_tool.get_revenue_stats, start, end, group_by)
+
+        assert remote
+        assert local == remote
+
+    @pytest.mark.asyncio
+    async def test_answers_from_memory_until_stale(self, stub, monkeypatch):
+        monkeypatch.setattr(settings, "analytics_mode", "local")
+        before = await analytics_tool.get_dashboard_stats()
+        stub.orders.append({**stub.orders[0], "id": 999, "status": "pending"})
+
+        assert await analytics_tool.get_dashboard_stats() == before
+
+    @pytest.mark.asyncio
+    async def test_status_change_of_an_old_order_is_applied_right_away(self, stub, monkeypatch):
+        # -----Older than the lookback window, so an incremental refresh would never re-pull it
+        monkeypatch.setattr(settings, "analytics_mode", "local")
+        cutoff = (date.today() - timedelta(days=settings.analytics_lookback_days + 1)).isoformat()
+        old = next(o for o in stub.orders if o["status"] == "pending" and o["created_at"][:10] < cutoff)
+        before = await analytics_tool.get_dashboard_stats()
+
+        await orders_tool.update_order_status(old["id"], "cancelled")
+
+        after = await analytics_tool.get_dashboard_stats()
+        assert after["pending_orders_count"] == before["pending_orders_count"] - 1
+        assert after["pending_orders_total"] == round(before["pending_orders_total"] - old["final_amount"], 2)
@@ -0,0 +1,106 @@
+"""Tests for the response cache and the cached menu endpoints"""
+
+import asyncio
+
+import httpx
+import pytest
+
+from backend_mcp.cache import ResponseCache
+from backend_mcp.tools import menu_tool
+
+
+class FakeClock:
+    """Manually advanced clock for TTL tests"""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def counting_fetch(value, counter: list):
+    async def fetch():
+        counter.append(1)
+        await asyncio.sleep(0)
+        return value
+    return fetch
+
+
+# -----ResponseCache Tests
+class TestResponseCache:
+
+    @pytest.mark.asyncio
+    async def test_ttl_expiry(self):
+        # -----Entries are served until their TTL elapses
+        clock = FakeClock()
+        cache = ResponseCache(clock=clock)
+        calls = []
+
+        await cache.get_or_fetch("/menu-items/", None, 10, counting_fetch([1], calls))
+        await cache.get_or_fetch("/menu-items/", None, 10, counting_fetch([1], calls))
+        assert len(calls) == 1
+
+        clock.now = 11
+        await cache.get_or_fetch("/menu-items/", None, 10, counting_fetch([1], calls))
+        assert len(calls) == 2
+
+    def test_params_are_normalized(self):
+        # -----Param order and None values don't change the key
+        assert ResponseCache.make_key("/menu-items/", {"category": "side", "is_available": True}) == \
+            ResponseCache.make_key("/menu-items/", {"is_available": True, "category": "side", "x": None})
+
+    @pytest.mark.asyncio
+    async def test_lru_eviction(self):
+        # -----Least recently used entry is evicted first
+        cache = ResponseCache(max_entries=2)
+        calls = []
+
+        await cache.get_or_fetch("/a", None, 60, counting_fetch("a", calls))
+        await cache.get_or_fetch("/b", None, 60, counting_fetch("b", calls))
+        await cache.get_or_fetch("/a", None, 60, counting_fetch("a", calls))
+        await cache.get_or_fetch("/c", None, 60, counting_fetch("c", calls))
+
+        assert cache.evictions == 1
+        await cache.get_or_fetch("/a", None, 60, counting_fetch("a", calls))
+        assert len(calls) == 3
+
+    @pytest.mark.asyncio
+    async def test_concurrent_misses_are_coalesced(self):
+        # -----Concurrent misses for one key share a single fetch
+        cache = ResponseCache()
+        calls = []
+
+        results = await asyncio.gather(*[
+            cache.get_or_fetch("/menu-items/", None, 60, counting_fetch([1, 2], calls))
+            for _ in range(5)
+        ])
+
+        assert len(calls) == 1
+        assert all(result == [1, 2] for result in results)
+        assert cache.coalesced == 4
+
+
+# -----Menu Tool Cache Tests
+class TestMenuCaching:
+
+    @pytest.mark.asyncio
+    async def test_menu_write_invalidates_cache(self, mock_backend):
+        # -----update_menu_item drops cached menu listings
+        calls = []
+
+        def handler(request: httpx.Request) -> httpx.Response:
+            calls.append((request.method, request.url.path))
+            if request.method == "PUT":
+                return httpx.Response(200, json={"id": 1, "price": 9.5})
+            return httpx.Response(200, json=[{"id": 1, "price": 8.0}])
+
+        mock_backend(handler, menu_tool)
+
+        await menu_tool.get_menu_items()
+        await menu_tool.get_menu_items()
+        assert calls.count(("GET", "/menu-items/")) == 1
+
+        await menu_tool.update_menu_item(1, price=9.5)
+        await menu_tool.get_menu_items()
+        assert calls.count(("GET", "/menu-items/")) == 2
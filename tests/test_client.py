@@ -0,0 +1,626 @@
+"""Tests for the backend client (offline, against a mocked transport)"""
+
+import asyncio
+import http.server
+import threading
+import time
+
+import httpx
+import pytest
+
+from backend_mcp.client import BackendClient
+from backend_mcp.config import settings
+from backend_mcp.deadline import DeadlineExceeded, deadline_scope, remaining
+from backend_mcp.resilience import CircuitBreaker, CircuitOpenError, LatencyWindow, RetryBudget
+from backend_mcp.tools import health_tool
+
+
+@pytest.fixture
+async def slow_backend():
+    """A real HTTP server on localhost answering every request after 0.3s"""
+
+    state = {"requests": 0}
+    body = b'{"todays_orders_count": 3}'
+
+    async def handle(reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            while await reader.readuntil(b"\r\n\r\n"):
+                state["requests"] += 1
+                await asyncio.sleep(0.3)
+                writer.write(
+                    b"HTTP/1.1 200 OK\r\nContent-Type: application/json\r\n"
+                    b"Content-Length: %d\r\n\r\n%s" % (len(body), body)
+                )
+                await writer.drain()
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+    server = await asyncio.start_server(handle, "127.0.0.1", 0)
+    port = server.sockets[0].getsockname()[1]
+    state["url"] = f"http://127.0.0.1:{port}"
+    yield state
+    server.close()
+
+
+@pytest.fixture
+def thread_backend():
+    """A real keep-alive HTTP server on its own thread (outlives any event loop), counting closed connections"""
+
+    state = {"closed": 0}
+
+    class Handler(http.server.BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def do_GET(self):
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", "2")
+            self.end_headers()
+            self.wfile.write(b"{}")
+
+        def finish(self):
+            super().finish()
+            state["closed"] += 1
+
+        def log_message(self, *args):
+            pass
+
+    server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    state["url"] = f"http://127.0.0.1:{server.server_address[1]}"
+    yield state
+    server.shutdown()
+    server.server_close()
+
+
+def wait_for(predicate, timeout: float = 2.0) -> bool:
+    """Poll `predicate` from synchronous code"""
+    end = time.monotonic() + timeout
+    while not predicate() and time.monotonic() < end:
+        time.sleep(0.01)
+    return predicate()
+
+
+# -----Connection Pool Tests
+class TestConnectionPool:
+
+    def test_pool_of_a_closed_loop_is_released(self, thread_backend):
+        # -----Each asyncio.run() is a new loop; the first loop's pooled socket must not leak
+        client = BackendClient(base_url=thread_backend["url"])
+        asyncio.run(client.get_json("/menu-items/1"))
+        assert thread_backend["closed"] == 0
+
+        asyncio.run(client.get_json("/menu-items/2"))
+
+        assert wait_for(lambda: thread_backend["closed"] >= 1)
+        asyncio.run(client.aclose())
+
+    def test_pool_of_an_open_loop_is_closed_on_it(self, thread_backend):
+        client = BackendClient(base_url=thread_backend["url"])
+        first = asyncio.new_event_loop()
+        try:
+            first.run_until_complete(client.get_json("/menu-items/1"))
+            asyncio.run(client.get_json("/menu-items/2"))
+
+            # -----The close was scheduled on the first loop and runs when it does
+            first.run_until_complete(asyncio.sleep(0.05))
+            assert wait_for(lambda: thread_backend["closed"] >= 1)
+        finally:
+            first.close()
+        asyncio.run(client.aclose())
+
+    @pytest.mark.asyncio
+    async def test_pool_is_reused_between_requests(self, mock_backend):
+        # -----Every request should go through the same pooled AsyncClient
+        client = mock_backend(lambda request: httpx.Response(200, json={"ok": True}))
+
+        await client.start()
+        pooled = client._http
+
+        await client.get("/health")
+        await client.get("/menu-items/")
+
+        assert client._http is pooled
+
+    @pytest.mark.asyncio
+    async def test_aclose_releases_pool(self, mock_backend):
+        # -----Closing the client should close the pool; next call re-opens it
+        client = mock_backend(lambda request: httpx.Response(200, json={"ok": True}))
+
+        await client.get("/health")
+        pooled = client._http
+        await client.aclose()
+
+        assert pooled.is_closed
+        assert client._http is None
+
+        response = await client.get("/health")
+        assert response.json() == {"ok": True}
+
+    @pytest.mark.asyncio
+    async def test_errors_are_raised(self, mock_backend):
+        # -----Non-2xx responses still raise
+        client = mock_backend(lambda request: httpx.Response(404, json={"detail": "Not found"}))
+
+        with pytest.raises(httpx.HTTPStatusError):
+            await client.get("/orders/999999")
+
+
+# -----Single-flight Tests
+class TestSingleFlight:
+
+    @pytest.mark.asyncio
+    async def test_concurrent_identical_gets_are_coalesced(self, mock_backend):
+        # -----Five concurrent identical GETs should hit the backend once
+        calls = []
+
+        async def handler(request: httpx.Request) -> httpx.Response:
+            calls.append(str(request.url))
+            await asyncio.sleep(0.05)
+            return httpx.Response(200, json={"todays_orders_count": 3})
+
+        client = mock_backend(handler)
+        results = await asyncio.gather(*[
+            client.get_json("/orders/stats/dashboard") for _ in range(5)
+        ])
+
+        assert len(calls) == 1
+        assert all(result == {"todays_orders_count": 3} for result in results)
+        assert client.stats()["singleflight"]["coalesced"] == 4
+
+    @pytest.mark.asyncio
+    async def test_different_params_are_not_coalesced(self, mock_backend):
+        # -----Different query params are different requests
+        calls = []
+
+        async def handler(request: httpx.Request) -> httpx.Response:
+            calls.append(str(request.url))
+            await asyncio.sleep(0.01)
+            return httpx.Response(200, json=[])
+
+        client = mock_backend(handler)
+        await asyncio.gather(
+            client.get_json("/orders/filter", params={"status": "pending"}),
+            client.get_json("/orders/filter", params={"status": "ready"}),
+        )
+
+        assert len(calls) == 2
+
+    @pytest.mark.asyncio
+    async def test_errors_are_shared(self, mock_backend):
+        # -----A failed request fails every coalesced caller
+        async def handler(request: httpx.Request) -> httpx.Response:
+            await asyncio.sleep(0.01)
+            return httpx.Response(500, json={"detail": "boom"})
+
+        client = mock_backend(handler)
+        results = await asyncio.gather(
+            *[client.get_json("/orders/stats/dashboard") for _ in range(3)],
+            return_exceptions=True,
+        )
+
+        assert all(isinstance(result, httpx.HTTPStatusError) for result in results)
+
+
+    @pytest.mark.asyncio
+    async def test_leader_deadline_does_not_bound_followers(self, slow_backend):
+        # -----Over a real socket: the leader gives up at its deadline, the follower still gets the answer
+        client = BackendClient(base_url=slow_backend["url"])
+
+        async def leader():
+            with deadline_scope(0.05):
+                return await client.get_json("/orders/stats/dashboard")
+
+        async def follower():
+            await asyncio.sleep(0.01)
+            return await client.get_json("/orders/stats/dashboard")
+
+        results = await asyncio.gather(leader(), follower(), return_exceptions=True)
+
+        assert isinstance(results[0], DeadlineExceeded)
+        assert results[1] == {"todays_orders_count": 3}
+        assert slow_backend["requests"] == 1
+        await client.aclose()
+
+    @pytest.mark.asyncio
+    async def test_follower_deadline_is_its_own(self, slow_backend):
+        # -----A follower with a tighter deadline stops waiting without cancelling the leader
+        client = BackendClient(base_url=slow_backend["url"])
+
+        async def follower():
+            await asyncio.sleep(0.01)
+            with deadline_scope(0.05):
+                return await client.get_json("/orders/stats/dashboard")
+
+        results = await asyncio.gather(
+            client.get_json("/orders/stats/dashboard"), follower(), return_exceptions=True
+        )
+
+        assert results[0] == {"todays_orders_count": 3}
+        assert isinstance(results[1], DeadlineExceeded)
+        await client.aclose()
+
+
+# -----Conditional Request Tests
+class TestConditionalRequests:
+
+    @pytest.mark.asyncio
+    async def test_etag_revalidation_serves_cached_body(self, mock_backend):
+        # -----Second GET sends If-None-Match and reuses the body on 304
+        seen = []
+
+        def handler(request: httpx.Request) -> httpx.Response:
+            seen.append(request.headers.get("If-None-Match"))
+            if request.headers.get("If-None-Match") == '"v1"':
+                return httpx.Response(304)
+            return httpx.Response(200, json={"id": 7, "code": "SAVE10"}, headers={"ETag": '"v1"'})
+
+        client = mock_backend(handler)
+        first = await client.get_json("/promos/7")
+        second = await client.get_json("/promos/7")
+
+        assert seen == [None, '"v1"']
+        assert first == second == {"id": 7, "code": "SAVE10"}
+        assert client.stats()["conditional"]["not_modified"] == 1
+
+    @pytest.mark.asyncio
+    async def test_last_modified_revalidation(self, mock_backend):
+        # -----Last-Modified is echoed back as If-Modified-Since
+        stamp = "Wed, 14 Oct 2026 10:00:00 GMT"
+        seen = []
+
+        def handler(request: httpx.Request) -> httpx.Response:
+            seen.append(request.headers.get("If-Modified-Since"))
+            return httpx.Response(200, json={"id": 3, "version": len(seen)}, headers={"Last-Modified": stamp})
+
+        client = mock_backend(handler)
+        await client.get_json("/customers/3")
+        refreshed = await client.get_json("/customers/3")
+
+        assert seen == [None, stamp]
+        assert refreshed == {"id": 3, "version": 2}
+
+    @pytest.mark.asyncio
+    async def test_validator_store_is_bounded_by_bytes(self, mock_backend):
+        # -----Oldest bodies are evicted once the byte budget is spent; oversized ones are never kept
+        def handler(request: httpx.Request) -> httpx.Response:
+            size = int(request.url.path.rsplit("/", 1)[-1])
+            return httpx.Response(200, json={"data": "x" * size}, headers={"ETag": f'"{size}"'})
+
+        client = mock_backend(handler)
+        client.validators.max_bytes = 250
+        for size in (100, 101, 102, 1000):
+            await client.get_json(f"/promos/{size}")
+
+        conditional = client.stats()["conditional"]
+        assert conditional["entries"] == 2
+        assert 0 < conditional["bytes"] <= 250
+        assert conditional["evictions"] == 1
+
+    @pytest.mark.asyncio
+    async def test_unsolicited_304_is_an_error(self, mock_backend):
+        # -----A 304 for a non-conditional request is not treated as success
+        client = mock_backend(lambda request: httpx.Response(304))
+
+        with pytest.raises(httpx.HTTPStatusError):
+            await client.get_json("/customers/3")
+
+
+# -----Retry Tests
+class TestRetries:
+
+    @pytest.fixture(autouse=True)
+    def fast_backoff(self, monkeypatch):
+        """Record backoff sleeps instead of waiting"""
+        delays = []
+
+        async def fake_sleep(delay):
+            delays.append(delay)
+
+        monkeypatch.setattr(asyncio, "sleep", fake_sleep)
+        return delays
+
+    @pytest.mark.asyncio
+    async def test_get_is_retried_until_success(self, fast_backoff, mock_backend):
+        # -----Two 503s then a 200: three attempts, two backoffs
+        statuses = [503, 503, 200]
+
+        def handler(request: httpx.Request) -> httpx.Response:
+            return httpx.Response(statuses.pop(0), json={"ok": True})
+
+        client = mock_backend(handler)
+        assert await client.get_json("/orders/stats/dashboard") == {"ok": True}
+        assert len(fast_backoff) == 2
+        assert client.stats()["retries"]["attempted"] == 2
+
+    @pytest.mark.asyncio
+    async def test_post_is_not_retried_by_default(self, fast_backoff, mock_backend):
+        # -----create_order style POSTs are never repeated
+        calls = []
+
+        def handler(request: httpx.Request) -> httpx.Response:
+            calls.append(request.method)
+            return httpx.Response(503)
+
+        client = mock_backend(handler)
+        with pytest.raises(httpx.HTTPStatusError):
+            await client.post("/orders/", json={"customer_id": 1})
+        assert calls == ["POST"]
+
+        with pytest.raises(httpx.HTTPStatusError):
+            await client.post("/promos/apply", json={}, idempotent=True)
+        assert len(calls) == 4
+
+    @pytest.mark.asyncio
+    async def test_client_errors_are_not_retried(self, fast_backoff, mock_backend):
+        # -----A 404 is final
+        calls = []
+
+        def handler(request: httpx.Request) -> httpx.Response:
+            calls.append(1)
+            return httpx.Response(404)
+
+        client = mock_backend(handler)
+        with pytest.raises(httpx.HTTPStatusError):
+            await client.get("/orders/999999")
+        assert len(calls) == 1
+
+    @pytest.mark.asyncio
+    async def test_retry_after_is_honored(self, fast_backoff, mock_backend):
+        # -----Retry-After overrides a shorter jittered backoff
+        statuses = [429, 200]
+
+        def handler(request: httpx.Request) -> httpx.Response:
+            return httpx.Response(statuses.pop(0), headers={"Retry-After": "1.5"}, json=[])
+
+        client = mock_backend(handler)
+        await client.get("/menu-items/")
+        assert fast_backoff == [1.5]
+
+    @pytest.mark.asyncio
+    async def test_long_retry_after_gives_up(self, fast_backoff, mock_backend):
+        # -----Retry-After beyond RETRY_AFTER_MAX fails immediately
+        client = mock_backend(lambda request: httpx.Response(503, headers={"Retry-After": "3600"}))
+
+        with pytest.raises(httpx.HTTPStatusError):
+            await client.get("/menu-items/")
+        assert fast_backoff == []
+
+    def test_retry_budget_caps_retries(self):
+        # -----Only the floor plus a fraction of requests may be retried
+        budget = RetryBudget(ratio=0.1, min_per_second=0.0, window=10.0, clock=lambda: 0.0)
+        for _ in range(50):
+            budget.record_request()
+
+        granted = sum(budget.try_acquire() for _ in range(20))
+        assert granted == 5
+        assert budget.denied == 15
+
+
+# -----Circuit Breaker Tests
+class TestCircuitBreaker:
+
+    @pytest.fixture(autouse=True)
+    def single_attempt(self, monkeypatch):
+        """Disable retries so each call is one backend attempt"""
+        monkeypatch.setattr(settings, "retry_max_attempts", 1)
+
+    @pytest.mark.asyncio
+    async def test_opens_after_consecutive_failures(self, mock_backend):
+        # -----Failures on /orders/stats open only the stats circuit
+        calls = []
+
+        def handler(request: httpx.Request) -> httpx.Response:
+            calls.append(request.url.path)
+            if request.url.path.startswith("/orders/stats"):
+                return httpx.Response(503)
+            return httpx.Response(200, json=[])
+
+        client = mock_backend(handler)
+        for _ in range(settings.circuit_failure_threshold):
+            with pytest.raises(httpx.HTTPStatusError):
+                await client.get("/orders/stats/revenue")
+
+        with pytest.raises(CircuitOpenError) as error:
+            await client.get("/orders/stats/revenue")
+        assert error.value.to_dict()["route_group"] == "stats"
+        assert len(calls) == settings.circuit_failure_threshold
+
+        # -----Other route groups are unaffected
+        await client.get("/menu-items/")
+        assert client.stats()["circuits"]["stats"]["state"] == "open"
+        assert client.stats()["circuits"]["menu"]["state"] == "closed"
+
+    @pytest.mark.asyncio
+    async def test_health_check_reports_unhealthy_backend(self, monkeypatch, mock_backend):
+        # -----A failing /health is reported with the circuit states instead of raised
+        client = mock_backend(lambda request: httpx.Response(503, json={"detail": "down"}))
+        monkeypatch.setattr(health_tool, "client", client)
+
+        result = await health_tool.check_backend_health()
+
+        assert result["status"] == "unhealthy"
+        assert result["status_code"] == 503 and result["error"] == "down"
+        assert result["circuits"]["health"]["consecutive_failures"] == 1
+
+    def test_half_open_probe(self):
+        # -----After the recovery timeout one probe decides the state
+        clock = [0.0]
+        breaker = CircuitBreaker("stats", failure_threshold=2, recovery_timeout=10, clock=lambda: clock[0])
+
+        breaker.record_failure()
+        breaker.record_failure()
+        assert breaker.state == "open"
+
+        clock[0] = 11
+        breaker.before_request()
+        assert breaker.state == "half_open"
+        with pytest.raises(CircuitOpenError):
+            breaker.before_request()
+
+        breaker.record_failure()
+        assert breaker.state == "open"
+
+        clock[0] = 22
+        breaker.before_request()
+        breaker.record_success(0.1)
+        assert breaker.state == "closed"
+
+    def test_slow_responses_count_as_failures(self):
+        # -----Latency above the threshold trips the breaker
+        breaker = CircuitBreaker("stats", failure_threshold=2, latency_threshold=1.0)
+
+        breaker.record_success(5.0)
+        breaker.record_success(5.0)
+        assert breaker.state == "open"
+
+
+# -----Timeout and Deadline Tests
+class TestTimeouts:
+
+    def test_route_group_timeouts(self, mock_backend):
+        # -----/health gets its own tight timeouts, other routes the defaults
+        client = mock_backend(lambda request: httpx.Response(200))
+
+        health, _ = client._timeout_for("/health")
+        revenue, capped = client._timeout_for("/orders/stats/revenue")
+
+        assert health.read == 5.0 and health.connect == 2.0
+        assert revenue.read == settings.backend_timeout
+        assert capped is False
+
+    def test_deadline_caps_timeouts(self, mock_backend):
+        # -----Inside a tool deadline, timeouts never exceed what is left
+        client = mock_backend(lambda request: httpx.Response(200))
+
+        with deadline_scope(1.0):
+            timeout, capped = client._timeout_for("/orders/stats/revenue")
+
+        assert capped is True
+        assert timeout.read <= 1.0 and timeout.connect <= 1.0
+
+    def test_nested_deadline_only_tightens(self):
+        # -----An inner scope can't extend the outer deadline
+        with deadline_scope(1.0):
+            with deadline_scope(100.0):
+                assert remaining() <= 1.0
+        assert remaining() is None
+
+    @pytest.mark.asyncio
+    async def test_expired_deadline_skips_backend(self, mock_backend):
+        # -----No request is sent once the budget is spent
+        calls = []
+
+        def handler(request: httpx.Request) -> httpx.Response:
+            calls.append(1)
+            return httpx.Response(200, json={})
+
+        client = mock_backend(handler)
+        with deadline_scope(0):
+            with pytest.raises(DeadlineExceeded):
+                await client.get_json("/orders/1")
+
+        assert calls == []
+        assert "orders" not in client.stats()["circuits"]
+
+
+# -----Hedged Request Tests
+class TestHedging:
+
+    @staticmethod
+    def prime(client: BackendClient, path: str, latency: float = 0.01):
+        """Fill the route's latency window with fast samples"""
+        for _ in range(settings.hedge_min_samples):
+            client.latencies.for_path(path).record(latency)
+
+    @pytest.mark.asyncio
+    async def test_slow_request_is_hedged(self, mock_backend):
+        # -----First request stalls, the hedge answers and wins
+        calls = []
+
+        async def handler(request: httpx.Request) -> httpx.Response:
+            calls.append(1)
+            if len(calls) == 1:
+                await asyncio.sleep(1)
+            return httpx.Response(200, json={"id": 1, "attempt": len(calls)})
+
+        client = mock_backend(handler)
+        self.prime(client, "/orders/1")
+
+        order = await client.get_json("/orders/1", hedge=True)
+
+        assert order == {"id": 1, "attempt": 2}
+        assert client.stats()["hedging"]["sent"] == 1
+        assert client.stats()["hedging"]["won"] == 1
+
+    @pytest.mark.asyncio
+    async def test_fast_request_is_not_hedged(self, mock_backend):
+        # -----Responses within the percentile never trigger a hedge
+        client = mock_backend(lambda request: httpx.Response(200, json={"id": 1}))
+        self.prime(client, "/orders/1", latency=0.5)
+
+        await client.get_json("/orders/1", hedge=True)
+
+        assert client.stats()["hedging"]["sent"] == 0
+
+    @pytest.mark.asyncio
+    async def test_hedge_rate_is_capped(self, monkeypatch, mock_backend):
+        # -----With a zero hedge rate slow requests just wait
+        monkeypatch.setattr(settings, "hedge_min_delay", 0.01)
+
+        async def handler(request: httpx.Request) -> httpx.Response:
+            await asyncio.sleep(0.05)
+            return httpx.Response(200, json={})
+
+        client = mock_backend(handler)
+        client.hedge_budget.ratio = 0.0
+        self.prime(client, "/menu-items/3")
+
+        await client.get_json("/menu-items/3", hedge=True)
+
+        assert client.stats()["hedging"] == {"sent": 0, "won": 0, "denied": 1}
+
+    @pytest.mark.asyncio
+    async def test_empty_window_is_not_hedged(self, monkeypatch, mock_backend):
+        # -----HEDGE_MIN_SAMPLES=0 with no samples yet: no percentile, so just send
+        monkeypatch.setattr(settings, "hedge_min_samples", 0)
+        client = mock_backend(lambda request: httpx.Response(200, json={"id": 1}))
+
+        assert await client.get_json("/orders/1", hedge=True) == {"id": 1}
+        assert client.stats()["hedging"]["sent"] == 0
+
+    @pytest.mark.asyncio
+    async def test_cancelled_caller_cancels_the_request(self, mock_backend):
+        # -----The caller gives up before the hedge delay: the backend request is cancelled too
+        cancelled = asyncio.Event()
+
+        async def handler(request: httpx.Request) -> httpx.Response:
+            try:
+                await asyncio.sleep(10)
+            except asyncio.CancelledError:
+                cancelled.set()
+                raise
+            return httpx.Response(200, json={})
+
+        client = mock_backend(handler)
+        self.prime(client, "/orders/1", latency=5)
+        # -----Below single-flight, which keeps a shared call running for its other waiters
+        call = asyncio.ensure_future(client._send_hedged("GET", "/orders/1"))
+        await asyncio.sleep(0.05)
+        call.cancel()
+
+        async with asyncio.timeout(1):
+            await cancelled.wait()
+        assert client.stats()["hedging"]["sent"] == 0
+
+    def test_latency_percentile(self):
+        # -----Nearest-rank percentile over the recent window
+        window = LatencyWindow(size=100)
+        for latency in range(1, 101):
+            window.record(latency / 100)
+
+        assert window.percentile(95) == 0.95
+        assert window.percentile(50) == 0.5
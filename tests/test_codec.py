@@ -0,0 +1,87 @@
+"""Tests for the JSON codec (stdlib fallback always available, fast codecs when installed)"""
+
+import datetime
+import json
+
+import httpx
+import pytest
+from fastmcp import Client
+
+from backend_mcp import codec, server
+from backend_mcp.tools import orders_tool
+
+ORDERS = [{"id": i, "status": "pending", "note": "crème brûlée", "final_amount": 10.5 * i} for i in range(5)]
+
+
+# -----Codec Selection Tests
+class TestSelectCodec:
+
+    def test_auto_picks_an_installed_codec(self):
+        name, loads, dumps = codec.select_codec("auto")
+
+        assert name in ("orjson", "msgspec", "json")
+        assert loads(dumps(ORDERS).encode()) == ORDERS
+
+    def test_missing_codec_falls_back_to_json(self, monkeypatch):
+        def missing():
+            raise ImportError("not installed")
+
+        monkeypatch.setitem(codec._CODECS, "orjson", missing)
+
+        assert codec.select_codec("orjson")[0] == "json"
+
+    def test_unknown_codec_falls_back_to_json(self):
+        assert codec.select_codec("yaml")[0] == "json"
+
+
+# -----Encoding Tests
+class TestEncoding:
+
+    @pytest.mark.parametrize("name", ["orjson", "msgspec", "json"])
+    def test_output_matches_compact_json(self, name):
+        selected, loads, dumps = codec.select_codec(name)
+        if selected != name:
+            pytest.skip(f"{name} is not installed")
+
+        value = {"orders": ORDERS, 7: datetime.date(2024, 1, 2), "empty": []}
+        text = dumps(value)
+
+        assert " " not in text.replace("crème brûlée", "")
+        assert json.loads(text) == {"orders": ORDERS, "7": "2024-01-02", "empty": []}
+        assert loads(b'{"a": [1, 2.5, null]}') == {"a": [1, 2.5, None]}
+
+    @pytest.mark.parametrize("name", ["orjson", "msgspec", "json"])
+    def test_invalid_body_raises_value_error(self, name):
+        selected, loads, _ = codec.select_codec(name)
+        if selected != name:
+            pytest.skip(f"{name} is not installed")
+
+        with pytest.raises(ValueError):
+            loads(b"<html>")
+
+
+# -----Tool Result Tests
+class TestToolResults:
+
+    @pytest.mark.asyncio
+    async def test_list_results_are_encoded_once(self, monkeypatch, mock_backend):
+        def handler(request: httpx.Request) -> httpx.Response:
+            return httpx.Response(200, json=ORDERS)
+
+        mock_backend(handler, orders_tool)
+        walks = []
+        monkeypatch.setattr(
+            "fastmcp.tools.tool.pydantic_core.to_jsonable_python",
+            lambda value, **kwargs: walks.append(value) or value,
+        )
+
+        async with Client(server.mcp) as mcp_client:
+            result = await mcp_client.call_tool("get_orders_by_status", {"status": "pending"})
+
+        assert json.loads(result.content[0].text) == ORDERS
+        assert walks == []
+
+    def test_dict_results_keep_structured_content(self):
+        result = {"id": 1}
+
+        assert server.encoded(result) is result
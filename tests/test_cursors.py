@@ -0,0 +1,173 @@
+"""Tests for signed cursor pagination of the list tools (offline, against a mocked backend)"""
+
+import asyncio
+
+import httpx
+import pytest
+
+from backend_mcp import deadline
+from backend_mcp.cursors import CursorPager
+from backend_mcp.tools import orders_tool, paging_tool
+
+ORDERS = [{"id": i, "status": "pending", "customer_id": 1, "final_amount": 10.0} for i in range(1, 26)]
+FILTERS = ["status", "order_type", "customer_id", "start_date", "end_date", "min_amount", "max_amount"]
+
+
+@pytest.fixture
+def backend(mock_backend, monkeypatch):
+    """Serve /orders/filter (paged) and /orders/status/{status} (everything), recording requests"""
+
+    state = {"requests": [], "failing_skips": set()}
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        path = request.url.path
+        if path == "/openapi.json":
+            parameters = [{"name": name, "in": "query"} for name in FILTERS]
+            return httpx.Response(200, json={"paths": {"/orders/filter": {"get": {"parameters": parameters}}}})
+
+        state["requests"].append((path, dict(request.url.params)))
+        if path == "/orders/filter":
+            skip = int(request.url.params.get("skip", 0))
+            if skip in state["failing_skips"]:
+                return httpx.Response(500, json={"detail": "Internal Server Error"})
+            limit = int(request.url.params.get("limit", 100))
+            return httpx.Response(200, json=ORDERS[skip:skip + limit])
+        return httpx.Response(200, json=ORDERS)
+
+    mock_backend(handler, orders_tool)
+    pager = CursorPager(secret="test-secret", max_entries=8, ttl=60)
+    monkeypatch.setattr(orders_tool, "pager", pager)
+    monkeypatch.setattr(paging_tool, "pager", pager)
+    monkeypatch.setattr(orders_tool, "_supported_filters", None)
+    state["pager"] = pager
+    return state
+
+
+async def walk(tool, first_page):
+    """Follow next_cursor to the end, returning every item and the number of pages"""
+
+    page, items, pages = first_page, list(first_page["items"]), 1
+    while page["next_cursor"]:
+        page = await tool(cursor=page["next_cursor"])
+        items.extend(page["items"])
+        pages += 1
+    return items, pages
+
+
+async def get_filtered_orders(cursor):
+    return await orders_tool.get_filtered_orders(cursor=cursor)
+
+
+async def get_orders_by_status(cursor):
+    return await orders_tool.get_orders_by_status("ignored", cursor=cursor)
+
+
+# -----Cursor Token Tests
+class TestCursorTokens:
+
+    def test_round_trip(self):
+        pager = CursorPager(secret="s")
+        cursor = pager.encode("abc", "get_filtered_orders", 40)
+
+        assert pager.decode(cursor, "get_filtered_orders") == ("abc", 40)
+
+    def test_tampered_cursor_is_rejected(self):
+        pager = CursorPager(secret="s")
+        _, signature = pager.encode("abc", "tool", 40).split(".")
+        forged = CursorPager(secret="other").encode("abc", "tool", 0).split(".")[0]
+
+        with pytest.raises(ValueError, match="signature"):
+            pager.decode(f"{forged}.{signature}", "tool")
+        with pytest.raises(ValueError, match="Malformed"):
+            pager.decode("not-a-cursor", "tool")
+
+    def test_cursor_is_bound_to_its_tool(self):
+        pager = CursorPager(secret="s")
+
+        with pytest.raises(ValueError, match="belongs to"):
+            pager.decode(pager.encode("abc", "get_orders_by_status", 0), "get_filtered_orders")
+
+    def test_any_tool_is_accepted_without_one(self):
+        pager = CursorPager(secret="s")
+
+        assert pager.decode(pager.encode("abc", "get_orders_by_status", 7)) == ("abc", 7)
+
+
+# -----Paginated Tool Tests
+class TestCursorPagination:
+
+    @pytest.mark.asyncio
+    async def test_filtered_orders_pages_through_backend(self, backend):
+        first = await orders_tool.get_filtered_orders(status="pending", page_size=10)
+        items, pages = await walk(get_filtered_orders, first)
+
+        assert items == ORDERS
+        assert pages == 3
+        filters = [params for path, params in backend["requests"] if path == "/orders/filter"]
+        assert all(params["status"] == "pending" for params in filters)
+        assert [params["skip"] for params in filters] == ["0", "10", "20"]
+        assert len(backend["pager"]) == 0
+
+    @pytest.mark.asyncio
+    async def test_next_page_is_prefetched(self, backend):
+        await orders_tool.get_filtered_orders(page_size=10)
+        await asyncio.sleep(0.05)
+
+        # -----Page 2 was fetched before anyone asked for it
+        assert [params["skip"] for _, params in backend["requests"]] == ["0", "10"]
+
+    @pytest.mark.asyncio
+    async def test_unpaginated_endpoint_is_fetched_once(self, backend):
+        first = await orders_tool.get_orders_by_status("pending", fields=["id"], page_size=7)
+        items, pages = await walk(get_orders_by_status, first)
+
+        assert items == [{"id": order["id"]} for order in ORDERS]
+        assert pages == 4
+        assert len(backend["requests"]) == 1
+
+    @pytest.mark.asyncio
+    async def test_evicted_listing_expires_its_cursor(self, backend):
+        first = await orders_tool.get_filtered_orders(page_size=10)
+        for _ in range(8):
+            await orders_tool.get_filtered_orders(page_size=10)
+
+        with pytest.raises(ValueError, match="expired"):
+            await orders_tool.get_filtered_orders(cursor=first["next_cursor"])
+
+    @pytest.mark.asyncio
+    async def test_without_page_size_lists_are_unchanged(self, backend):
+        assert await orders_tool.get_filtered_orders(limit=5) == ORDERS[:5]
+
+    @pytest.mark.asyncio
+    async def test_get_more_results_continues_a_tool_cursor(self, backend):
+        first = await orders_tool.get_filtered_orders(page_size=10)
+        items, pages = await walk(lambda cursor: paging_tool.get_more_results(cursor), first)
+
+        assert items == ORDERS
+        assert pages == 3
+
+    @pytest.mark.asyncio
+    async def test_page_fetch_errors_are_raised(self, backend):
+        # -----A failing page is an error, not an empty last page
+        backend["failing_skips"] = {10}
+        first = await orders_tool.get_filtered_orders(page_size=10)
+
+        with pytest.raises(httpx.HTTPStatusError):
+            await orders_tool.get_filtered_orders(cursor=first["next_cursor"])
+
+    @pytest.mark.asyncio
+    async def test_prefetch_ignores_the_callers_deadline(self):
+        pager = CursorPager(secret="s", max_entries=8, ttl=60)
+        seen = []
+
+        async def fetch(offset, limit):
+            seen.append(deadline.remaining())
+            return ORDERS[offset:offset + limit]
+
+        with deadline.deadline_scope(5):
+            await pager.start("tool", fetch, 10)
+        await asyncio.sleep(0.01)
+
+        # -----The first page ran under the call's deadline, the prefetched second page under none
+        assert seen[0] is not None
+        assert seen[1] is None
@@ -0,0 +1,148 @@
+"""Tests for structured logging, sampling and request IDs"""
+
+import json
+import sys
+import logging
+
+import pytest
+from fastmcp import Client, FastMCP
+
+from backend_mcp.config import settings
+from backend_mcp.logging_config import (
+    ContextFilter,
+    JsonFormatter,
+    SamplingFilter,
+    configure_logging,
+    request_scope,
+)
+from backend_mcp.middleware import RequestContextMiddleware
+
+
+class ListHandler(logging.Handler):
+    """Collect records after the context filter has run"""
+
+    def __init__(self):
+        super().__init__()
+        self.records = []
+        self.addFilter(ContextFilter())
+
+    def emit(self, record):
+        self.records.append(record)
+
+
+@pytest.fixture
+def restore_root_logger():
+    """Undo configure_logging() changes to the root logger"""
+    root = logging.getLogger()
+    handlers, level = list(root.handlers), root.level
+    yield
+    root.handlers[:] = handlers
+    root.setLevel(level)
+
+
+def make_record(level=logging.DEBUG, name="backend_mcp.test", **extra) -> logging.LogRecord:
+    record = logging.LogRecord(name, level, __file__, 1, "hello %s", ("world",), None)
+    record.__dict__.update(extra)
+    return record
+
+
+# -----Formatting Tests
+class TestJsonFormatter:
+
+    def test_extra_fields_are_top_level_keys(self):
+        record = make_record(logging.WARNING, event="orders.filter_failed", filters={"status": "x"})
+        entry = json.loads(JsonFormatter().format(record))
+
+        assert entry["message"] == "hello world"
+        assert entry["level"] == "WARNING"
+        assert entry["event"] == "orders.filter_failed"
+        assert entry["filters"] == {"status": "x"}
+
+    def test_exceptions_are_included(self):
+        try:
+            raise ValueError("boom")
+        except ValueError:
+            record = logging.LogRecord("x", logging.ERROR, __file__, 1, "failed", None, sys.exc_info())
+
+        assert "ValueError: boom" in json.loads(JsonFormatter().format(record))["exception"]
+
+
+# -----Sampling Tests
+class TestSampling:
+
+    def test_debug_events_are_sampled(self):
+        sampler = SamplingFilter({"backend.retry": 0.25})
+        kept = [sampler.filter(make_record(event="backend.retry")) for _ in range(8)]
+
+        assert kept == [True, False, False, False, True, False, False, False]
+
+    def test_info_and_unlisted_events_are_never_sampled(self):
+        sampler = SamplingFilter({"backend.retry": 0.0})
+
+        assert sampler.filter(make_record(logging.INFO, event="backend.retry"))
+        assert sampler.filter(make_record(event="other"))
+        assert not sampler.filter(make_record(event="backend.retry"))
+
+
+# -----Request ID Tests
+class TestRequestIds:
+
+    def test_records_carry_the_request_id(self):
+        handler = ListHandler()
+        logger = logging.getLogger("backend_mcp.test.scope")
+        logger.addHandler(handler)
+        try:
+            with request_scope("get_order_details", "abc123"):
+                logger.warning("inside")
+            logger.warning("outside")
+        finally:
+            logger.removeHandler(handler)
+
+        assert (handler.records[0].request_id, handler.records[0].tool) == ("abc123", "get_order_details")
+        assert handler.records[1].request_id is None
+
+    @pytest.mark.asyncio
+    async def test_each_tool_call_gets_its_own_id(self):
+        handler = ListHandler()
+        logger = logging.getLogger("backend_mcp.test.tool")
+        logger.addHandler(handler)
+
+        server = FastMCP(name="test", middleware=[RequestContextMiddleware()])
+
+        @server.tool()
+        async def noisy() -> dict:
+            logger.warning("first")
+            logger.warning("second")
+            return {}
+
+        try:
+            async with Client(server) as mcp_client:
+                await mcp_client.call_tool("noisy")
+                await mcp_client.call_tool("noisy")
+        finally:
+            logger.removeHandler(handler)
+
+        ids = [record.request_id for record in handler.records]
+        assert ids[0] == ids[1] and ids[2] == ids[3]
+        assert ids[0] != ids[2] and None not in ids
+
+
+# -----Configuration Tests
+class TestConfigureLogging:
+
+    def test_logs_go_to_file_as_json(self, tmp_path, monkeypatch, restore_root_logger):
+        path = tmp_path / "server.log"
+        monkeypatch.setattr(settings, "log_file", str(path))
+        monkeypatch.setattr(settings, "log_format", "json")
+        monkeypatch.setattr(settings, "log_level", "INFO")
+
+        listener = configure_logging()
+        with request_scope("check_backend_health", "req-1"):
+            logging.getLogger("backend_mcp.test.file").info("started", extra={"port": 9464})
+        listener.stop()
+
+        entry = json.loads(path.read_text().strip())
+        assert entry["message"] == "started"
+        assert entry["port"] == 9464
+        assert entry["request_id"] == "req-1"
+        assert entry["tool"] == "check_backend_health"
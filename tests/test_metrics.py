@@ -0,0 +1,152 @@
+"""Tests for the Prometheus metrics (offline, against a mocked transport)"""
+
+import asyncio
+import socket
+
+import httpx
+import pytest
+from fastmcp import Client
+from fastmcp.exceptions import ToolError
+
+from backend_mcp import metrics, server
+from backend_mcp.config import settings
+from backend_mcp.metrics import MetricsRegistry, client_collector
+
+
+# -----Exposition Format Tests
+class TestRendering:
+
+    def test_counter_and_gauge(self):
+        registry = MetricsRegistry()
+        calls = registry.counter("calls_total", "Calls", ("tool",))
+        running = registry.gauge("running", "Running")
+
+        calls.inc(tool="a")
+        calls.inc(2, tool="a")
+        running.set(3)
+
+        text = registry.render()
+        assert "# TYPE calls_total counter" in text
+        assert 'calls_total{tool="a"} 3' in text
+        assert "running 3" in text
+
+    def test_gauge_tracks_in_progress(self):
+        running = MetricsRegistry().gauge("running", "Running", ("tool",))
+
+        with pytest.raises(RuntimeError):
+            with running.track_in_progress(tool="a"):
+                assert running.value(tool="a") == 1
+                raise RuntimeError("boom")
+        assert running.value(tool="a") == 0
+
+    def test_metric_without_samples_cannot_be_built(self):
+        class Incomplete(metrics._Metric):
+            pass
+
+        with pytest.raises(TypeError):
+            Incomplete("incomplete", "No samples")
+
+    def test_nearest_rank_percentile(self):
+        ordered = [i / 100 for i in range(1, 101)]
+
+        assert metrics.percentile(ordered, 95) == 0.95
+        assert metrics.percentile(ordered, 100) == 1.0
+        assert metrics.percentile([], 50) == 0.0
+
+    def test_percentile_rounds_the_rank_up(self):
+        # -----Odd sizes: the rank is ceil(p/100 * n), never rounded half to even
+        assert metrics.percentile([1, 2, 3, 4, 5], 50) == 3
+        assert metrics.percentile(list(range(1, 31)), 95) == 29
+        assert metrics.percentile([1, 2, 3], 0) == 1
+
+    def test_histogram_buckets_are_cumulative(self):
+        registry = MetricsRegistry()
+        latency = registry.histogram("latency_seconds", "Latency", buckets=(0.1, 1.0))
+
+        for value in (0.05, 0.5, 5.0):
+            latency.observe(value)
+
+        text = registry.render()
+        assert 'latency_seconds_bucket{le="0.1"} 1' in text
+        assert 'latency_seconds_bucket{le="1"} 2' in text
+        assert 'latency_seconds_bucket{le="+Inf"} 3' in text
+        assert "latency_seconds_count 3" in text
+        assert "latency_seconds_sum 5.55" in text
+
+    def test_label_values_are_escaped(self):
+        registry = MetricsRegistry()
+        registry.counter("c", "C", ("v",)).inc(v='say "hi"\n')
+
+        assert 'c{v="say \\"hi\\"\\n"} 1' in registry.render()
+
+
+# -----Backend Client Instrumentation Tests
+class TestBackendMetrics:
+
+    @pytest.mark.asyncio
+    async def test_responses_are_counted_per_route_group(self, monkeypatch, mock_backend):
+        monkeypatch.setattr(settings, "retry_max_attempts", 1)
+
+        def handler(request):
+            return httpx.Response(404 if request.url.path == "/orders/9" else 200, json={})
+
+        client = mock_backend(handler)
+        before_ok = metrics.backend_responses.value(route_group="menu", method="GET", status=200)
+        before_missing = metrics.backend_responses.value(route_group="orders", method="GET", status=404)
+        before_observed = metrics.backend_duration.count(route_group="menu", method="GET")
+
+        await client.get("/menu-items/")
+        with pytest.raises(httpx.HTTPStatusError):
+            await client.get("/orders/9")
+
+        assert metrics.backend_responses.value(route_group="menu", method="GET", status=200) == before_ok + 1
+        assert metrics.backend_responses.value(route_group="orders", method="GET", status=404) == before_missing + 1
+        assert metrics.backend_duration.count(route_group="menu", method="GET") == before_observed + 1
+        assert metrics.backend_in_flight.value(route_group="menu") == 0
+
+    @pytest.mark.asyncio
+    async def test_collector_exposes_client_state(self, mock_backend):
+        client = mock_backend(lambda request: httpx.Response(200, json=[]))
+        await client.get_json("/menu-items/", ttl=60)
+        await client.get_json("/menu-items/", ttl=60)
+
+        registry = MetricsRegistry()
+        registry.add_collector(client_collector(client))
+        text = registry.render()
+
+        assert "backend_cache_hits_total 1" in text
+        assert "backend_cache_hit_ratio 0.5" in text
+        assert 'backend_circuit_state{route_group="menu"} 0' in text
+        assert 'backend_pool_connections{state="active"}' in text
+
+
+# -----Metrics Endpoint Tests
+class TestMetricsEndpoint:
+
+    @pytest.mark.asyncio
+    async def test_port_in_use_keeps_the_server_running(self, monkeypatch, caplog):
+        # -----Another process already listens on METRICS_PORT: no endpoint, no SystemExit
+        with socket.create_server(("127.0.0.1", 0)) as occupied:
+            port = occupied.getsockname()[1]
+            assert server.start_metrics_server("127.0.0.1", port) == (None, None)
+
+            async with Client(server.mcp) as mcp_client:
+                with pytest.raises(ToolError, match="Malformed cursor"):
+                    await mcp_client.call_tool("get_more_results", {"cursor": "nope"})
+
+        assert "Metrics endpoint disabled" in caplog.text
+
+    @pytest.mark.asyncio
+    async def test_endpoint_serves_metrics_until_stopped(self):
+        metrics_server, task = server.start_metrics_server("127.0.0.1", 0)
+        while not metrics_server.started:
+            await asyncio.sleep(0.01)
+        port = metrics_server.servers[0].sockets[0].getsockname()[1]
+
+        async with httpx.AsyncClient(trust_env=False) as http:
+            response = await http.get(f"http://127.0.0.1:{port}/metrics")
+        await server.stop_metrics_server(metrics_server, task)
+
+        assert response.status_code == 200
+        assert "mcp_tool_calls_total" in response.text
+        assert task.done()
@@ -0,0 +1,119 @@
+"""Tests for the tool middleware (in-process MCP client, no backend needed)"""
+
+import asyncio
+import json
+from types import SimpleNamespace
+
+import pytest
+from fastmcp import Client, FastMCP
+from fastmcp.exceptions import ToolError
+
+from backend_mcp import deadline, metrics
+from backend_mcp.config import settings
+from backend_mcp.middleware import CircuitOpenMiddleware, DeadlineMiddleware, MetricsMiddleware
+from backend_mcp.resilience import CircuitOpenError
+
+
+def make_server(*middleware) -> FastMCP:
+    """Small MCP server with a fast and a slow tool"""
+
+    server = FastMCP(name="test", middleware=list(middleware))
+
+    @server.tool()
+    async def fast_tool() -> dict:
+        return {"remaining": deadline.remaining()}
+
+    @server.tool()
+    async def slow_tool() -> dict:
+        await asyncio.sleep(5)
+        return {}
+
+    @server.tool()
+    async def open_circuit_tool() -> dict:
+        raise CircuitOpenError("orders", 12.34)
+
+    @server.tool()
+    async def failing_tool() -> dict:
+        raise ValueError("boom")
+
+    return server
+
+
+# -----Deadline Middleware Tests
+class TestDeadlineMiddleware:
+
+    @pytest.mark.asyncio
+    async def test_deadline_is_visible_to_tools(self, monkeypatch):
+        # -----Tools (and the backend client) see the remaining budget
+        monkeypatch.setattr(settings, "tool_deadline", 30.0)
+
+        async with Client(make_server(DeadlineMiddleware())) as mcp_client:
+            result = await mcp_client.call_tool("fast_tool")
+
+        assert 0 < result.data["remaining"] <= 30.0
+
+    @pytest.mark.asyncio
+    async def test_slow_tool_is_cut_off(self, monkeypatch):
+        # -----A per-tool override stops the slow tool early
+        monkeypatch.setattr(settings, "tool_deadlines", {"slow_tool": 0.05})
+
+        async with Client(make_server(DeadlineMiddleware())) as mcp_client:
+            with pytest.raises(ToolError, match="deadline"):
+                await mcp_client.call_tool("slow_tool")
+
+    @pytest.mark.asyncio
+    async def test_inner_timeout_is_not_a_deadline(self, monkeypatch):
+        # -----The tool's own wait_for fires well before its 30s deadline
+        monkeypatch.setattr(settings, "tool_deadline", 30.0)
+        context = SimpleNamespace(message=SimpleNamespace(name="inner_timeout"))
+
+        async def call_next(context):
+            return await asyncio.wait_for(asyncio.sleep(1), timeout=0.01)
+
+        with pytest.raises(TimeoutError) as raised:
+            await DeadlineMiddleware().on_call_tool(context, call_next)
+
+        assert not isinstance(raised.value, deadline.DeadlineExceeded)
+
+
+# -----Metrics Middleware Tests
+class TestMetricsMiddleware:
+
+    @pytest.mark.asyncio
+    async def test_tool_calls_are_counted_by_outcome(self, monkeypatch):
+        monkeypatch.setattr(settings, "tool_deadlines", {"slow_tool": 0.05})
+        successes = metrics.tool_calls.value(tool="fast_tool", outcome="success")
+        deadlines = metrics.tool_calls.value(tool="slow_tool", outcome="deadline_exceeded")
+
+        server = make_server(MetricsMiddleware(), DeadlineMiddleware())
+        async with Client(server) as mcp_client:
+            await mcp_client.call_tool("fast_tool")
+            with pytest.raises(ToolError):
+                await mcp_client.call_tool("slow_tool")
+
+        assert metrics.tool_calls.value(tool="fast_tool", outcome="success") == successes + 1
+        assert metrics.tool_calls.value(tool="slow_tool", outcome="deadline_exceeded") == deadlines + 1
+        assert metrics.tool_duration.count(tool="fast_tool") >= 1
+        assert metrics.tools_in_flight.value(tool="slow_tool") == 0
+
+
+# -----Circuit Open Middleware Tests
+class TestCircuitOpenMiddleware:
+
+    @pytest.mark.asyncio
+    async def test_open_circuit_is_reported_as_json(self):
+        async with Client(make_server(CircuitOpenMiddleware())) as mcp_client:
+            with pytest.raises(ToolError) as raised:
+                await mcp_client.call_tool("open_circuit_tool")
+
+        assert json.loads(str(raised.value)) == {
+            "error": "circuit_open",
+            "route_group": "orders",
+            "retry_after": 12.3,
+        }
+
+    @pytest.mark.asyncio
+    async def test_other_errors_pass_through(self):
+        async with Client(make_server(CircuitOpenMiddleware())) as mcp_client:
+            with pytest.raises(ToolError, match="boom"):
+                await mcp_client.call_tool("failing_tool")
@@ -0,0 +1,334 @@
+"""Tests for the order tools (offline, against a mocked backend)"""
+
+import asyncio
+import gc
+
+import httpx
+import pytest
+
+from backend_mcp.batch import fan_out
+from backend_mcp.tools import menu_tool, orders_tool, reviews_tool
+
+
+def make_orders(count: int):
+    """Build `count` fake orders alternating status and type"""
+    return [
+        {
+            "id": i,
+            "customer_id": 1 + i % 3,
+            "status": "pending" if i % 2 else "delivered",
+            "order_type": "delivery" if i % 3 == 0 else "dine_in",
+            "final_amount": 10.0 + i,
+            "created_at": f"2026-10-{1 + i % 5:02d}T12:00:00",
+        }
+        for i in range(1, count + 1)
+    ]
+
+
+FILTERS = ["status", "order_type", "customer_id", "start_date", "end_date", "min_amount", "max_amount"]
+
+
+@pytest.fixture
+def backend(mock_backend, monkeypatch):
+    """Serve /orders/filter from an in-memory order list and record requests"""
+
+    state = {
+        "orders": make_orders(25), "requests": [], "supported": set(FILTERS), "openapi": True, "unavailable": set(),
+        "ignore": set(), "failing_skips": set(),
+    }
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        if request.url.path == "/openapi.json":
+            state["requests"].append({"openapi": True})
+            if not state["openapi"]:
+                return httpx.Response(404, json={"detail": "Not Found"})
+            parameters = [{"name": name, "in": "query"} for name in state["supported"]]
+            return httpx.Response(200, json={"paths": {"/orders/filter": {"get": {"parameters": parameters}}}})
+
+        if request.url.path != "/orders/filter":
+            return order_detail(state, request)
+
+        params = request.url.params
+        state["requests"].append(dict(params))
+        if any(name in params for name in state["unavailable"]):
+            return httpx.Response(503, json={"detail": "Service Unavailable"})
+        if any(name in params and name not in state["supported"] for name in FILTERS):
+            return httpx.Response(422, json={"detail": "Unknown filter"})
+
+        orders = state["orders"]
+        for name in ("status", "order_type"):
+            if name in params:
+                orders = [o for o in orders if o[name] == params[name]]
+        if params.get("skip") in state["failing_skips"]:
+            return httpx.Response(400, json={"detail": "Bad Request"})
+        skip = 0 if "skip" in state["ignore"] else int(params.get("skip", 0))
+        limit = len(orders) if "limit" in state["ignore"] else int(params.get("limit", 100))
+        return httpx.Response(200, json=orders[skip:skip + limit])
+
+    mock_backend(handler, orders_tool)
+    monkeypatch.setattr(orders_tool, "_supported_filters", None)
+    return state
+
+
+def order_detail(state, request: httpx.Request) -> httpx.Response:
+    """Serve /orders/{id} and /orders/{id}/journey, tracking concurrency"""
+
+    state.setdefault("detail_requests", []).append(request.url.path)
+    parts = request.url.path.strip("/").split("/")
+    order = next((o for o in state["orders"] if o["id"] == int(parts[1])), None)
+    if order is None:
+        return httpx.Response(404, json={"detail": "Order not found"})
+    if parts[-1] == "journey":
+        return httpx.Response(200, json=[{"id": 1, "status": order["status"]}])
+    return httpx.Response(200, json=order)
+
+
+def filter_requests(state):
+    """Requests made to /orders/filter (excluding the OpenAPI probe)"""
+    return [r for r in state["requests"] if "openapi" not in r]
+
+
+# -----Streaming Order Tests
+class TestOrderStreaming:
+
+    @pytest.mark.asyncio
+    async def test_iterator_walks_every_page(self, backend):
+        # -----25 orders at 10 per page = 3 pages
+        orders = [o async for o in orders_tool.iter_filtered_orders(page_size=10)]
+
+        assert [o["id"] for o in orders] == list(range(1, 26))
+        assert [r["skip"] for r in filter_requests(backend)] == ["0", "10", "20"]
+
+    @pytest.mark.asyncio
+    async def test_next_page_is_prefetched(self, backend):
+        # -----Page 2 is requested before page 1 has been consumed
+        orders = orders_tool.iter_filtered_orders(page_size=10, prefetch=1)
+
+        await orders.__anext__()
+        await asyncio.sleep(0.01)
+        requested = [r["skip"] for r in filter_requests(backend)]
+        await orders.aclose()
+
+        assert requested == ["0", "10"]
+
+    @pytest.mark.asyncio
+    async def test_backend_ignoring_skip_stops_after_a_repeated_page(self, backend):
+        backend["ignore"].add("skip")
+
+        orders = [o async for o in orders_tool.iter_filtered_orders(page_size=10, prefetch=2)]
+
+        assert [o["id"] for o in orders] == list(range(1, 11))
+
+    @pytest.mark.asyncio
+    async def test_backend_ignoring_limit_stops_after_the_first_page(self, backend):
+        backend["ignore"].update({"skip", "limit"})
+
+        orders = [o async for o in orders_tool.iter_filtered_orders(page_size=10, prefetch=2)]
+
+        assert [o["id"] for o in orders] == list(range(1, 26))
+
+    @pytest.mark.asyncio
+    async def test_discarded_page_error_is_retrieved(self):
+        # -----A prefetched page that fails while being cancelled must not log "never retrieved"
+        async def failing_page():
+            try:
+                await asyncio.sleep(5)
+            except asyncio.CancelledError:
+                raise httpx.ReadError("connection lost")
+
+        loop = asyncio.get_running_loop()
+        unretrieved = []
+        loop.set_exception_handler(lambda _, context: unretrieved.append(context))
+        task = asyncio.ensure_future(failing_page())
+        await asyncio.sleep(0)
+
+        orders_tool._discard([task])
+        await asyncio.sleep(0.01)
+        del task
+        gc.collect()
+        loop.set_exception_handler(None)
+
+        assert unretrieved == []
+
+    @pytest.mark.asyncio
+    async def test_filters_are_forwarded(self, backend):
+        # -----Filters are sent on every page request
+        orders = [o async for o in orders_tool.iter_filtered_orders(status="pending", page_size=5)]
+
+        assert all(o["status"] == "pending" for o in orders)
+        assert all(r["status"] == "pending" for r in filter_requests(backend))
+
+    @pytest.mark.asyncio
+    async def test_orders_summary(self, backend):
+        # -----Summary aggregates instead of returning raw rows
+        summary = await orders_tool.get_orders_summary()
+
+        assert summary["order_count"] == 25
+        assert summary["total_revenue"] == sum(10.0 + i for i in range(1, 26))
+        assert summary["by_status"]["pending"]["count"] == 13
+        assert summary["by_status"]["delivered"]["count"] == 12
+        assert sum(day["count"] for day in summary["by_day"].values()) == 25
+        assert summary["truncated"] is False
+
+    @pytest.mark.asyncio
+    async def test_orders_summary_respects_max_orders(self, backend):
+        # -----Scanning stops once max_orders is reached
+        summary = await orders_tool.get_orders_summary(max_orders=7)
+
+        assert summary["order_count"] == 7
+        assert summary["truncated"] is True
+
+    @pytest.mark.asyncio
+    async def test_orders_summary_exactly_max_orders_is_not_truncated(self, backend):
+        # -----All 25 matches fit, so nothing was left out
+        summary = await orders_tool.get_orders_summary(max_orders=25)
+
+        assert summary["order_count"] == 25
+        assert summary["truncated"] is False
+
+
+# -----Filter Capability Tests
+class TestFilterCapabilities:
+
+    @pytest.mark.asyncio
+    async def test_supported_filters_go_to_backend(self, backend):
+        # -----With every filter supported a single page request is made
+        orders = await orders_tool.get_filtered_orders(status="pending", limit=5)
+
+        assert len(orders) == 5
+        assert filter_requests(backend) == [{"status": "pending", "skip": "0", "limit": "5"}]
+
+    @pytest.mark.asyncio
+    async def test_unsupported_filter_is_applied_client_side(self, backend):
+        # -----order_type is missing from the schema: filtered locally, never sent
+        backend["supported"] = {"status", "customer_id"}
+
+        orders = await orders_tool.get_filtered_orders(order_type="delivery", skip=1, limit=3)
+
+        expected = [o for o in make_orders(25) if o["order_type"] == "delivery"][1:4]
+        assert orders == expected
+        assert all("order_type" not in r for r in filter_requests(backend))
+
+    @pytest.mark.asyncio
+    async def test_probe_runs_once(self, backend):
+        # -----The capability probe is cached for the process lifetime
+        await orders_tool.get_filtered_orders(status="pending")
+        await orders_tool.get_filtered_orders(status="delivered")
+
+        assert sum(1 for r in backend["requests"] if "openapi" in r) == 1
+
+    @pytest.mark.asyncio
+    async def test_probe_without_openapi(self, backend):
+        # -----Without a schema each filter is probed and rejected ones recorded
+        backend["openapi"] = False
+        backend["supported"] = {"status", "order_type", "start_date", "end_date"}
+
+        supported = await orders_tool.get_supported_filters()
+
+        assert supported == frozenset(backend["supported"])
+
+    @pytest.mark.asyncio
+    async def test_transient_probe_failure_is_not_cached(self, backend):
+        # -----A 503 while probing says nothing about support: retried on the next call
+        backend["openapi"] = False
+        backend["supported"] = {"status"}
+        backend["unavailable"] = {"order_type"}
+
+        assert await orders_tool.get_supported_filters() == frozenset(FILTERS)
+        assert orders_tool._supported_filters is None
+
+        backend["unavailable"] = set()
+        assert await orders_tool.get_supported_filters() == frozenset({"status"})
+
+    @pytest.mark.asyncio
+    async def test_unreachable_backend_is_not_cached(self, monkeypatch, mock_backend):
+        # -----A failed probe assumes full support and is retried next time
+        def handler(request: httpx.Request) -> httpx.Response:
+            raise httpx.ConnectError("backend down", request=request)
+
+        mock_backend(handler, orders_tool)
+        monkeypatch.setattr(orders_tool, "_supported_filters", None)
+
+        supported = await orders_tool.get_supported_filters()
+
+        assert supported == frozenset(FILTERS)
+        assert orders_tool._supported_filters is None
+        assert await orders_tool.get_filtered_orders(status="pending") == []
+
+
+# -----Batch Tool Tests
+class TestBatchTools:
+
+    @pytest.mark.asyncio
+    async def test_batch_dedupes_and_reports_partial_errors(self, backend):
+        # -----Duplicates are fetched once, missing orders are reported per item
+        batch = await orders_tool.get_orders_details_batch([3, 3, 999, 5])
+
+        assert batch["requested"] == 3
+        assert [r["order_id"] for r in batch["results"]] == [3, 5]
+        assert batch["results"][0]["data"]["id"] == 3
+        assert batch["errors"] == [{"order_id": 999, "status_code": 404, "error": "Order not found"}]
+        assert sorted(backend["detail_requests"]) == ["/orders/3", "/orders/5", "/orders/999"]
+
+    @pytest.mark.asyncio
+    async def test_journey_batch(self, backend):
+        # -----Journeys are returned per order
+        batch = await orders_tool.get_orders_journey_batch([1, 2])
+
+        assert batch["succeeded"] == 2
+        assert batch["results"][1]["data"] == [{"id": 1, "status": "delivered"}]
+
+    @pytest.mark.asyncio
+    async def test_fan_out_is_bounded(self):
+        # -----No more than `concurrency` fetches run at once
+        running = 0
+        peak = 0
+
+        async def fetch(key):
+            nonlocal running, peak
+            running += 1
+            peak = max(peak, running)
+            await asyncio.sleep(0.01)
+            running -= 1
+            return key
+
+        batch = await fan_out(range(20), fetch, concurrency=4)
+
+        assert batch["succeeded"] == 20
+        assert peak == 4
+
+
+# -----Order Snapshot Tests
+class TestOrderSnapshot:
+
+    @pytest.mark.asyncio
+    async def test_snapshot_merges_parts_in_parallel(self, mock_backend):
+        # -----Details, journey and reviews start together; menu items are fetched once each
+        started = []
+
+        async def handler(request: httpx.Request) -> httpx.Response:
+            path = request.url.path
+            started.append(path)
+            await asyncio.sleep(0.02)
+            if path == "/orders/7":
+                items = [{"menu_item_id": 1}, {"menu_item_id": 2}, {"menu_item_id": 1}]
+                return httpx.Response(200, json={"id": 7, "status": "preparing", "items": items})
+            if path == "/orders/7/journey":
+                return httpx.Response(200, json=[{"status": "pending"}, {"status": "preparing"}])
+            if path == "/reviews/7":
+                return httpx.Response(404, json={"detail": "No reviews"})
+            if path.startswith("/menu-items/"):
+                return httpx.Response(200, json={"id": int(path.rsplit("/", 1)[1])})
+            return httpx.Response(404)
+
+        mock_backend(handler, orders_tool, menu_tool, reviews_tool)
+
+        snapshot = await orders_tool.get_order_snapshot(7)
+
+        assert set(started[:3]) == {"/orders/7", "/orders/7/journey", "/reviews/7"}
+        assert sorted(started[3:]) == ["/menu-items/1", "/menu-items/2"]
+        assert snapshot["current_status"] == "preparing"
+        assert len(snapshot["journey"]) == 2
+        assert snapshot["reviews"] is None
+        assert [item["id"] for item in snapshot["menu_items"]] == [1, 2]
+        assert snapshot["errors"] == [{"part": "reviews", "status_code": 404, "error": "No reviews"}]
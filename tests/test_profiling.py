@@ -0,0 +1,126 @@
+"""Tests for the on-demand sampling profiler (offline)"""
+
+import asyncio
+import json
+import os
+import time
+
+import httpx
+import pytest
+from fastmcp import Client, FastMCP
+
+from backend_mcp import profiling
+from backend_mcp.profiling import AWAITING, RUNNING, ProfileSession
+
+
+async def slow_handler(request):
+    """Backend that takes 50 ms per request"""
+    await asyncio.sleep(0.05)
+    return httpx.Response(200, json={"ok": True})
+
+
+def burn_cpu(seconds: float) -> None:
+    end = time.perf_counter() + seconds
+    while time.perf_counter() < end:
+        sum(range(1000))
+
+
+# -----Profile Session Tests
+class TestProfileSession:
+
+    @pytest.mark.asyncio
+    async def test_awaits_are_attributed_to_client_request(self, tmp_path, mock_backend):
+        client = mock_backend(slow_handler)
+        session = ProfileSession(seconds=0.3, interval=0.005, output=str(tmp_path / "p.txt"), format="collapsed")
+
+        async def workload():
+            for _ in range(5):
+                await client.get("/orders/1")
+
+        profile = asyncio.create_task(session.run())
+        await workload()
+        path = await profile
+
+        stacks = [line.rsplit(" ", 1)[0].split(";") for line in open(path).read().splitlines()]
+        awaiting = [stack for stack in stacks if stack[0] == AWAITING]
+        assert any("backend_mcp.client:BackendClient._request" in stack for stack in awaiting)
+
+    @pytest.mark.asyncio
+    async def test_cpu_time_is_sampled_on_the_loop_thread(self, tmp_path):
+        session = ProfileSession(seconds=0.2, interval=0.005, output=str(tmp_path / "p.txt"), format="collapsed")
+
+        profile = asyncio.create_task(session.run())
+        await asyncio.sleep(0.01)
+        burn_cpu(0.1)
+        await profile
+
+        running = [stack for stack in session.samples if stack[0] == RUNNING]
+        assert any(label.endswith(":burn_cpu") for stack in running for label in stack)
+
+    @pytest.mark.asyncio
+    async def test_stops_after_tool_calls(self, tmp_path):
+        session = ProfileSession(tool_calls=2, interval=0.005, output=str(tmp_path / "p.json"))
+
+        profile = asyncio.create_task(session.run())
+        await asyncio.sleep(0.02)
+        session.tool_call_finished()
+        session.tool_call_finished()
+        await asyncio.wait_for(profile, 1.0)
+
+        document = json.loads((tmp_path / "p.json").read_text())
+        speedscope = document["profiles"][0]
+        assert speedscope["type"] == "sampled"
+        assert len(speedscope["samples"]) == len(speedscope["weights"])
+
+    def test_unknown_format_is_rejected(self):
+        with pytest.raises(ValueError):
+            ProfileSession(format="pprof")
+
+
+# -----Debug Tool Tests
+class TestStartProfiling:
+
+    @pytest.mark.asyncio
+    async def test_only_one_profile_at_a_time(self, tmp_path, monkeypatch):
+        from backend_mcp.config import settings
+        from backend_mcp.tools.debug_tool import start_profiling
+
+        monkeypatch.setattr(settings, "profiling_dir", str(tmp_path))
+        result = await start_profiling(tool_calls=1)
+        session = profiling.active_session()
+        assert result["status"] == "started"
+
+        with pytest.raises(RuntimeError):
+            await start_profiling(seconds=1)
+
+        session.tool_call_finished()
+        await session.task
+        assert profiling.active_session() is None
+        assert (tmp_path / os.path.basename(result["output"])).exists()
+
+    @pytest.mark.asyncio
+    async def test_arming_call_is_not_counted(self, tmp_path, monkeypatch):
+        # -----With tool_calls=1 the call after start_profiling is the one captured
+        from backend_mcp.config import settings
+        from backend_mcp.middleware import ProfilingMiddleware
+        from backend_mcp.tools.debug_tool import start_profiling
+
+        monkeypatch.setattr(settings, "profiling_dir", str(tmp_path))
+        server = FastMCP(name="test", middleware=[ProfilingMiddleware()])
+        server.tool()(start_profiling)
+
+        @server.tool()
+        async def slow_tool() -> dict:
+            await asyncio.sleep(0.05)
+            return {}
+
+        async with Client(server) as mcp_client:
+            await mcp_client.call_tool("start_profiling", {"tool_calls": 1})
+            session = profiling.active_session()
+            assert session is not None and session.calls_seen == 0
+
+            await mcp_client.call_tool("slow_tool")
+            await asyncio.wait_for(session.task, 5)
+
+        assert session.calls_seen == 1
+        assert profiling.active_session() is None
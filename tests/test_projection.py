@@ -0,0 +1,84 @@
+"""Tests for field projection on list tools (offline, against a mocked backend)"""
+
+import json
+
+import httpx
+import pytest
+from fastmcp import Client
+
+from backend_mcp import server
+from backend_mcp.projection import PRESETS, compile_projector, project, resolve_fields
+from backend_mcp.tools import menu_tool, orders_tool
+
+ORDERS = [
+    {"id": 1, "customer_id": 4, "status": "pending", "order_type": "delivery", "final_amount": 12.5,
+     "created_at": "2024-01-02T12:00:00", "items": [{"menu_item_id": 3, "quantity": 2}], "special_instructions": "x"},
+    {"id": 2, "customer_id": 4, "status": "pending", "order_type": "takeaway", "final_amount": 8,
+     "created_at": "2024-01-03T12:00:00", "items": [], "special_instructions": None},
+]
+
+
+@pytest.fixture
+def backend(mock_backend):
+    """Serve ORDERS for every orders route"""
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        return httpx.Response(200, json=ORDERS)
+
+    return mock_backend(handler, orders_tool, menu_tool)
+
+
+# -----Field Resolution Tests
+class TestResolveFields:
+
+    def test_no_fields_keeps_everything(self):
+        assert resolve_fields(None, "orders") is None
+        assert resolve_fields([], "orders") is None
+        assert project(ORDERS, None, "orders") is ORDERS
+
+    def test_comma_separated_string(self):
+        assert resolve_fields("id, status,,id", "orders") == ("id", "status")
+
+    def test_presets_expand_and_combine(self):
+        keys = resolve_fields(["summary", "items"], "orders")
+
+        assert keys == PRESETS["orders"]["summary"] + ("items",)
+
+    def test_projector_is_compiled_once_per_field_set(self):
+        assert compile_projector(("id", "status")) is compile_projector(("id", "status"))
+
+
+# -----Projection Tests
+class TestProject:
+
+    def test_missing_keys_are_left_out(self):
+        assert project(ORDERS, ["id", "rating"], "orders") == [{"id": 1}, {"id": 2}]
+
+    def test_records_are_not_modified(self):
+        before = json.dumps(ORDERS)
+        project(ORDERS, "summary", "orders")
+
+        assert json.dumps(ORDERS) == before
+
+    @pytest.mark.asyncio
+    async def test_order_tools_project(self, backend):
+        by_status = await orders_tool.get_orders_by_status("pending", fields="summary")
+        by_customer = await orders_tool.get_customer_orders(4, fields=["id", "final_amount"])
+
+        assert set(by_status[0]) == set(PRESETS["orders"]["summary"])
+        assert by_customer == [{"id": 1, "final_amount": 12.5}, {"id": 2, "final_amount": 8}]
+
+    @pytest.mark.asyncio
+    async def test_cached_menu_is_not_projected_in_place(self, backend):
+        summary = await menu_tool.get_menu_items(fields="id")
+        full = await menu_tool.get_menu_items()
+
+        assert summary == [{"id": 1}, {"id": 2}]
+        assert full == ORDERS
+
+    @pytest.mark.asyncio
+    async def test_fields_through_mcp(self, backend):
+        async with Client(server.mcp) as mcp_client:
+            result = await mcp_client.call_tool("get_orders_by_status", {"status": "pending", "fields": ["id"]})
+
+        assert json.loads(result.content[0].text) == [{"id": 1}, {"id": 2}]
@@ -0,0 +1,143 @@
+"""Tests for session recording and replay (in-process MCP client, no backend needed)"""
+
+import asyncio
+import json
+import threading
+
+import pytest
+from fastmcp import Client, FastMCP
+
+from backend_mcp import linewriter
+from backend_mcp.middleware import RecordingMiddleware
+from backend_mcp.recording import REDACTED, load_recording, recorder
+from backend_mcp.replay import replay_sessions, run_replay, without_writes
+
+
+def make_server() -> FastMCP:
+    """Small MCP server recording its tool calls"""
+
+    server = FastMCP(name="test", middleware=[RecordingMiddleware()])
+    server.calls = []
+
+    @server.tool()
+    async def browse(category: str) -> list:
+        server.calls.append(("browse", category))
+        return [category]
+
+    @server.tool()
+    async def login(email: str, password: str) -> dict:
+        server.calls.append(("login", password))
+        await asyncio.sleep(0.01)
+        return {"ok": True}
+
+    return server
+
+
+@pytest.fixture
+def recording(tmp_path):
+    """Record into a temporary file for the duration of the test"""
+    path = tmp_path / "sessions.jsonl"
+    recorder.open(str(path))
+    yield path
+    recorder.close()
+
+
+# -----Recording Tests
+class TestRecording:
+
+    @pytest.mark.asyncio
+    async def test_calls_are_recorded_in_order(self, recording):
+        async with Client(make_server()) as mcp_client:
+            await mcp_client.call_tool("browse", {"category": "dessert"})
+            await mcp_client.call_tool("login", {"email": "a@b.c", "password": "hunter2"})
+        recorder.close()
+
+        entries = [json.loads(line) for line in recording.read_text().splitlines()]
+        assert [entry["tool"] for entry in entries] == ["browse", "login"]
+        assert entries[0]["arguments"] == {"category": "dessert"}
+        assert entries[1]["arguments"]["password"] == REDACTED
+        assert entries[1]["duration_ms"] >= 10
+        assert entries[0]["session"] == entries[1]["session"]
+        assert entries[0]["t"] <= entries[1]["t"]
+
+    @pytest.mark.asyncio
+    async def test_calls_are_written_off_the_event_loop(self, recording, monkeypatch):
+        threads = []
+        dumps = linewriter.json.dumps
+
+        def recording_dumps(*args, **kwargs):
+            threads.append(threading.current_thread())
+            return dumps(*args, **kwargs)
+
+        monkeypatch.setattr(linewriter.json, "dumps", recording_dumps)
+        async with Client(make_server()) as mcp_client:
+            await mcp_client.call_tool("browse", {"category": "dessert"})
+        recorder.close()
+
+        assert threads and threading.current_thread() not in threads
+        assert len(recording.read_text().splitlines()) == 1
+
+    @pytest.mark.asyncio
+    async def test_nothing_is_recorded_when_disabled(self, tmp_path):
+        async with Client(make_server()) as mcp_client:
+            await mcp_client.call_tool("browse", {"category": "dessert"})
+
+        assert not recorder.enabled
+        assert list(tmp_path.iterdir()) == []
+
+
+# -----Replay Tests
+class TestReplay:
+
+    @pytest.mark.asyncio
+    async def test_sessions_are_replayed_concurrently(self, recording):
+        async with Client(make_server()) as mcp_client:
+            await mcp_client.call_tool("browse", {"category": "dessert"})
+            await mcp_client.call_tool("login", {"email": "a@b.c", "password": "hunter2"})
+        recorder.close()
+
+        sessions = load_recording(str(recording))
+        assert len(sessions) == 1
+
+        target = make_server()
+        async with Client(target) as mcp_client:
+            result = await replay_sessions(mcp_client, sessions, speed=0, concurrency=3)
+
+        assert result["calls"] == 6
+        assert result["errors"] == 0
+        assert result["tools"]["browse"]["calls"] == 3
+        assert target.calls.count(("login", REDACTED)) == 3
+
+    @pytest.mark.asyncio
+    async def test_pacing_is_compressed_by_speed(self):
+        sessions = {"s": [
+            {"session": "s", "t": 0.0, "offset": 0.0, "tool": "browse", "arguments": {"category": "a"}},
+            {"session": "s", "t": 1.0, "offset": 1.0, "tool": "browse", "arguments": {"category": "b"}},
+        ]}
+
+        async with Client(make_server()) as mcp_client:
+            result = await replay_sessions(mcp_client, sessions, speed=10)
+
+        assert 0.1 <= result["elapsed_s"] < 0.5
+
+    def test_writes_are_left_out(self):
+        sessions = {
+            "a": [
+                {"session": "a", "t": 0.0, "offset": 0.0, "tool": "get_menu_items", "arguments": {}},
+                {"session": "a", "t": 1.0, "offset": 1.0, "tool": "create_order", "arguments": {}},
+            ],
+            "b": [{"session": "b", "t": 0.5, "offset": 0.0, "tool": "create_review", "arguments": {}}],
+        }
+
+        assert without_writes(sessions) == {"a": sessions["a"][:1]}
+
+    @pytest.mark.asyncio
+    async def test_live_replay_skips_writes_by_default(self, tmp_path):
+        # -----A recording of writes only has nothing to replay against the live backend
+        path = tmp_path / "writes.jsonl"
+        path.write_text(json.dumps(
+            {"session": "s", "t": 0.0, "tool": "create_order", "arguments": {}, "duration_ms": 1, "outcome": "ok"}
+        ) + "\n")
+
+        with pytest.raises(ValueError, match="No tool calls to replay"):
+            await run_replay(str(path), backend="live")
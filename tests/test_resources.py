@@ -0,0 +1,237 @@
+"""Tests for the menu resources (offline, against a mocked backend)"""
+
+import asyncio
+
+import httpx
+import pytest
+from fastmcp import Client
+from pydantic import AnyUrl
+
+from backend_mcp import server
+from backend_mcp.menu_snapshot import MenuSnapshot
+from backend_mcp.resources import menu_resources
+
+ITEMS = [
+    {"id": 1, "name": "Soup", "price": 5, "category": "appetizer", "description": "Hot", "is_available": True},
+    {"id": 2, "name": "Cake", "price": 6.5, "category": "dessert", "description": "Sweet", "is_available": False},
+    {"id": 3, "name": "Wings", "price": 8, "category": "appetizer", "description": "Spicy", "is_available": True},
+]
+
+
+@pytest.fixture
+def menu_backend(mock_backend, monkeypatch):
+    """Serve ITEMS (unsorted by category) and count backend calls and renders"""
+
+    state = {"requests": 0, "renders": 0, "items": ITEMS}
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        state["requests"] += 1
+        return httpx.Response(200, json=state["items"])
+
+    render = menu_resources.render_menu
+
+    def counting_render(category, items):
+        state["renders"] += 1
+        return render(category, items)
+
+    mock_backend(handler, menu_resources)
+    monkeypatch.setattr(menu_resources, "render_menu", counting_render)
+    monkeypatch.setattr(menu_resources, "_rendered", type(menu_resources._rendered)())
+    monkeypatch.setattr(menu_resources, "menu_snapshot", MenuSnapshot(history_size=3))
+    return state
+
+
+# -----Menu Resource Tests
+class TestMenuResource:
+
+    def test_unsorted_items_get_one_header_per_category(self):
+        text = menu_resources.render_menu("all", ITEMS)
+
+        assert text.count("## Appetizer") == 1
+        assert text.count("## Dessert") == 1
+        assert text.index("**Soup**") < text.index("**Wings**") < text.index("## Dessert")
+        assert "**Cake** - $6.50 [Item is not available]\n  Sweet\n\n" in text
+
+    @pytest.mark.asyncio
+    async def test_rendered_text_is_reused_while_cached(self, menu_backend):
+        first = await menu_resources.get_menu_resource("all")
+        second = await menu_resources.get_menu_resource("all")
+
+        assert first == second
+        assert menu_backend["requests"] == 1
+        assert menu_backend["renders"] == 1
+
+    @pytest.mark.asyncio
+    async def test_invalidation_rerenders(self, menu_backend):
+        await menu_resources.get_menu_resource("all")
+        menu_resources.client.invalidate("/menu-items/")
+        await menu_resources.get_menu_resource("all")
+
+        assert menu_backend["requests"] == 2
+        assert menu_backend["renders"] == 2
+
+
+# -----Menu Changes Tests
+class TestMenuChanges:
+
+    @staticmethod
+    def change_menu(menu_backend, **updates):
+        """Apply {item_id: {field: value}} to the served items and drop the cached listing"""
+
+        menu_backend["items"] = [
+            {**item, **updates.get(f"item{item['id']}", {})} for item in menu_backend["items"]
+        ]
+        menu_resources.client.invalidate("/menu-items/")
+
+    @pytest.mark.asyncio
+    async def test_first_read_lists_everything_as_added(self, menu_backend):
+        result = await menu_resources.get_menu_changes(0)
+
+        assert result["version"] == 1
+        assert result["full"] is False
+        assert [change["type"] for change in result["changes"]] == ["added"] * 3
+
+    @pytest.mark.asyncio
+    async def test_only_deltas_are_returned(self, menu_backend):
+        version = (await menu_resources.get_menu_changes(0))["version"]
+        self.change_menu(menu_backend, item2={"is_available": True}, item3={"price": 9})
+        menu_backend["items"] = menu_backend["items"][1:]
+        menu_resources.client.invalidate("/menu-items/")
+
+        result = await menu_resources.get_menu_changes(version)
+
+        changes = {change["id"]: change for change in result["changes"]}
+        assert result["version"] == version + 1
+        assert changes[1]["type"] == "removed"
+        assert changes[2]["fields"] == {"is_available": {"old": False, "new": True}}
+        assert changes[3]["fields"] == {"price": {"old": 8, "new": 9}}
+
+    @pytest.mark.asyncio
+    async def test_unchanged_menu_keeps_version(self, menu_backend):
+        version = (await menu_resources.get_menu_changes(0))["version"]
+        menu_resources.client.invalidate("/menu-items/")
+
+        result = await menu_resources.get_menu_changes(version)
+
+        assert result == {"version": version, "since_version": version, "full": False, "changes": []}
+
+    @pytest.mark.asyncio
+    async def test_changes_across_versions_are_merged(self, menu_backend):
+        await menu_resources.get_menu_changes(0)
+        self.change_menu(menu_backend, item1={"price": 6})
+        await menu_resources.get_menu_changes(1)
+        self.change_menu(menu_backend, item1={"price": 5, "name": "Broth"})
+
+        result = await menu_resources.get_menu_changes(1)
+
+        assert result["version"] == 3
+        assert result["changes"][0]["fields"] == {"name": {"old": "Soup", "new": "Broth"}}
+
+    @pytest.mark.asyncio
+    async def test_expired_version_gets_full_resync(self, menu_backend):
+        for price in range(10, 15):
+            self.change_menu(menu_backend, item1={"price": price})
+            await menu_resources.get_menu_changes(0)
+
+        result = await menu_resources.get_menu_changes(0)
+
+        assert result["full"] is True
+        assert len(result["items"]) == 3
+        assert (await menu_resources.get_menu_changes(99))["full"] is True
+
+    @pytest.mark.asyncio
+    async def test_changes_notify_resource_updates(self, menu_backend, monkeypatch):
+        snapshot = MenuSnapshot()
+        snapshot.add_listener(server.notify_menu_updated)
+        monkeypatch.setattr(menu_resources, "menu_snapshot", snapshot)
+        monkeypatch.setattr(server, "menu_subscriptions", type(server.menu_subscriptions)())
+        updated = []
+
+        async def message_handler(message):
+            if getattr(message, "root", None) is not None and message.root.method == "notifications/resources/updated":
+                updated.append(str(message.root.params.uri))
+
+        async with Client(server.mcp, message_handler=message_handler) as mcp_client:
+            await mcp_client.read_resource("menu://changes/0")
+            self.change_menu(menu_backend, item2={"is_available": True})
+            await mcp_client.read_resource("menu://changes/1")
+            # -----Not subscribed: finding the change itself sends nothing
+            assert updated == []
+
+            await mcp_client.session.subscribe_resource(AnyUrl("menu://all"))
+            await mcp_client.session.subscribe_resource(AnyUrl("menu://category/dessert"))
+            self.change_menu(menu_backend, item2={"is_available": False})
+            await mcp_client.read_resource("menu://changes/2")
+            await mcp_client.ping()
+
+        assert updated == ["menu://all", "menu://category/dessert"]
+
+    @pytest.mark.asyncio
+    async def test_subscribe_capability_is_advertised(self):
+        async with Client(server.mcp) as mcp_client:
+            assert mcp_client.initialize_result.capabilities.resources.subscribe is True
+
+    @pytest.mark.asyncio
+    async def test_stuck_session_does_not_hold_up_the_change(self, monkeypatch):
+        # -----One session never takes its notification; the other still gets its own
+        monkeypatch.setattr(server.settings, "menu_notify_timeout", 0.05)
+        monkeypatch.setattr(server, "menu_subscriptions", type(server.menu_subscriptions)())
+        received = []
+
+        class StuckSession:
+            async def send_resource_updated(self, uri):
+                await asyncio.sleep(3600)
+
+        class Session:
+            async def send_resource_updated(self, uri):
+                received.append(str(uri))
+
+        stuck, session = StuckSession(), Session()
+        server.menu_subscriptions[stuck] = {"menu://all"}
+        server.menu_subscriptions[session] = {"menu://all"}
+
+        async with asyncio.timeout(1):
+            await server.notify_menu_updated(["menu://all"])
+
+        assert received == ["menu://all"]
+        assert list(server.menu_subscriptions) == [session]
+
+    @pytest.mark.asyncio
+    async def test_every_subscribed_session_is_notified(self, menu_backend, monkeypatch):
+        # -----Two sessions subscribe; a change found by one request reaches both, per resource
+        snapshot = MenuSnapshot()
+        snapshot.add_listener(server.notify_menu_updated)
+        monkeypatch.setattr(menu_resources, "menu_snapshot", snapshot)
+        monkeypatch.setattr(server, "menu_subscriptions", type(server.menu_subscriptions)())
+        updated = {"first": [], "second": []}
+
+        def collector(name):
+            async def message_handler(message):
+                if getattr(message, "root", None) is not None and message.root.method == "notifications/resources/updated":
+                    updated[name].append(str(message.root.params.uri))
+            return message_handler
+
+        async with Client(server.mcp, message_handler=collector("first")) as first, \
+                Client(server.mcp, message_handler=collector("second")) as second:
+            await first.session.subscribe_resource(AnyUrl("menu://all"))
+            await second.session.subscribe_resource(AnyUrl("menu://category/dessert"))
+            await second.session.subscribe_resource(AnyUrl("menu://category/appetizer"))
+            await second.session.unsubscribe_resource(AnyUrl("menu://category/appetizer"))
+            await menu_resources.get_menu_changes(0)
+            await first.ping()
+            await second.ping()
+            updated["first"].clear()
+            updated["second"].clear()
+
+            self.change_menu(menu_backend, item2={"is_available": True})
+            await menu_resources.get_menu_changes(1)
+            await first.ping()
+            await second.ping()
+
+        assert updated["first"] == ["menu://all"]
+        assert updated["second"] == ["menu://category/dessert"]
+
+        # -----Closed sessions are dropped instead of failing later notifications
+        self.change_menu(menu_backend, item2={"is_available": False})
+        await menu_resources.get_menu_changes(2)
+        assert len(server.menu_subscriptions) == 0
@@ -0,0 +1,132 @@
+"""Tests for response shaping (token budget, continuation cursors and summaries)"""
+
+import json
+
+import httpx
+import pytest
+from fastmcp import Client
+from fastmcp.exceptions import ToolError
+
+from backend_mcp import server
+from backend_mcp.config import settings
+from backend_mcp import shaping
+from backend_mcp.cursors import CursorPager
+from backend_mcp.shaping import shape, summarize
+from backend_mcp.tools import orders_tool
+
+ORDERS = [
+    {"id": i, "status": ("pending", "delivered")[i % 2], "order_type": "takeaway",
+     "final_amount": 10.0, "special_instructions": "x" * 40}
+    for i in range(300)
+]
+
+
+@pytest.fixture
+def backend(mock_backend, monkeypatch):
+    """Serve ORDERS for every orders route and shrink the budget to a few orders"""
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        return httpx.Response(200, json=ORDERS)
+
+    monkeypatch.setattr(settings, "response_budget_tokens", 1000)
+    return mock_backend(handler, orders_tool)
+
+
+@pytest.fixture
+def pager(monkeypatch):
+    """A small pager of its own for shape()"""
+
+    pager = CursorPager(secret="test-secret", max_entries=4, ttl=60)
+    monkeypatch.setattr(shaping, "pager", pager)
+    return pager
+
+
+# -----Summary Tests
+class TestSummarize:
+
+    def test_counts_and_totals_by_status(self):
+        summary = summarize(ORDERS)
+
+        assert summary["count"] == 300
+        assert summary["by_status"] == {"pending": 150, "delivered": 150}
+        assert summary["by_order_type"] == {"takeaway": 300}
+        assert summary["total_amount"] == 3000.0
+        assert summary["amount_by_status"] == {"pending": 1500.0, "delivered": 1500.0}
+
+    def test_records_without_known_keys(self):
+        assert summarize([{"id": 1}, 2]) == {"count": 2}
+
+
+# -----Shape Tests
+class TestShape:
+
+    @pytest.mark.asyncio
+    async def test_cursor_walks_the_whole_list(self, pager):
+        page = await shape("tool", ORDERS, len(json.dumps(ORDERS)))
+        seen = list(page["items"])
+        while page["next_cursor"]:
+            page = await pager.resume(page["next_cursor"])
+            seen.extend(page["items"])
+
+        assert seen == ORDERS
+        assert page["total"] == 300
+        assert page["summary"]["count"] == 300
+        assert len(pager) == 0
+
+    @pytest.mark.asyncio
+    async def test_evicted_cursor_is_rejected(self, pager):
+        first = await shape("tool", ORDERS, len(json.dumps(ORDERS)))
+        for _ in range(pager.max_entries):
+            await shape("tool", ORDERS, len(json.dumps(ORDERS)))
+
+        with pytest.raises(ValueError, match="expired"):
+            await pager.resume(first["next_cursor"])
+        with pytest.raises(ValueError, match="Malformed"):
+            await pager.resume("garbage")
+
+    @pytest.mark.asyncio
+    async def test_last_page_has_no_cursor(self, pager, monkeypatch):
+        # -----Exactly two pages: no empty third page is offered
+        monkeypatch.setattr(settings, "response_budget_tokens", 1000)
+        records = ORDERS[:2]
+        text_length = int(1000 * settings.response_chars_per_token * 0.9)
+
+        first = await shape("tool", records, text_length * 2)
+        second = await pager.resume(first["next_cursor"])
+
+        assert len(first["items"]) == len(second["items"]) == 1
+        assert second["next_cursor"] is None
+
+
+# -----Middleware Tests
+class TestResponseShapingMiddleware:
+
+    @pytest.mark.asyncio
+    async def test_large_list_is_paged(self, backend):
+        async with Client(server.mcp) as mcp_client:
+            result = await mcp_client.call_tool("get_orders_by_status", {"status": "pending"})
+            page = result.structured_content
+            seen = list(page["items"])
+            while page["next_cursor"]:
+                result = await mcp_client.call_tool("get_more_results", {"cursor": page["next_cursor"]})
+                page = result.structured_content
+                seen.extend(page["items"])
+
+        assert len(result.content[0].text) / settings.response_chars_per_token <= 1000
+        assert page["summary"]["by_status"] == {"pending": 150, "delivered": 150}
+        assert seen == ORDERS
+
+    @pytest.mark.asyncio
+    async def test_small_list_passes_through(self, backend, monkeypatch):
+        monkeypatch.setattr(settings, "response_budget_tokens", 0)
+
+        async with Client(server.mcp) as mcp_client:
+            result = await mcp_client.call_tool("get_orders_by_status", {"status": "pending"})
+
+        assert json.loads(result.content[0].text) == ORDERS
+
+    @pytest.mark.asyncio
+    async def test_bad_cursor_is_a_tool_error(self):
+        async with Client(server.mcp) as mcp_client:
+            with pytest.raises(ToolError, match="Malformed cursor"):
+                await mcp_client.call_tool("get_more_results", {"cursor": "nope:0"})
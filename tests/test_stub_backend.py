@@ -0,0 +1,66 @@
+"""Tests running the tools against the in-process stub backend"""
+
+import pytest
+
+from backend_mcp.stub_backend import create_stub_app, stub_transport
+from backend_mcp.tools import analytics_tool, customer_tool, menu_tool, orders_tool, promos_tool, reviews_tool
+
+
+@pytest.fixture
+def stub(mock_backend, monkeypatch):
+    """Route every tool module's client to a small stub backend"""
+
+    app = create_stub_app(orders=50, menu_items=10)
+    mock_backend(stub_transport(app), analytics_tool, customer_tool, menu_tool, orders_tool, promos_tool, reviews_tool)
+    monkeypatch.setattr(orders_tool, "_supported_filters", None)
+    return app.state.data
+
+
+# -----Stub Backend Tests
+class TestStubBackend:
+
+    @pytest.mark.asyncio
+    async def test_snapshot_joins_every_part(self, stub):
+        snapshot = await orders_tool.get_order_snapshot(4)
+
+        assert snapshot["order"]["id"] == 4
+        assert snapshot["journey"][-1]["status"] == snapshot["current_status"]
+        assert snapshot["reviews"][0]["order_id"] == 4
+        assert snapshot["menu_items"] and snapshot["errors"] == []
+
+    @pytest.mark.asyncio
+    async def test_filters_are_discovered_from_openapi(self, stub):
+        assert await orders_tool.get_supported_filters() == frozenset(orders_tool._FILTER_MATCHERS)
+
+        orders = await orders_tool.get_filtered_orders(status="pending", limit=100)
+        expected = [order for order in stub.orders if order["status"] == "pending"]
+        assert orders == expected
+
+    @pytest.mark.asyncio
+    async def test_summary_matches_generated_data(self, stub):
+        summary = await orders_tool.get_orders_summary()
+
+        assert summary["order_count"] == len(stub.orders)
+
+    @pytest.mark.asyncio
+    async def test_missing_order_is_reported_in_batch(self, stub):
+        result = await orders_tool.get_orders_details_batch([1, 999])
+
+        assert result["succeeded"] == 1
+        assert result["errors"] == [{"order_id": 999, "status_code": 404, "error": "Order not found"}]
+
+    @pytest.mark.asyncio
+    async def test_responses_have_the_backend_fields(self, stub):
+        # -----Same fields tests/test_server.py expects from the real backend
+        stats = await analytics_tool.get_dashboard_stats()
+        popular = await analytics_tool.get_popular_items(limit=5, days=30)
+        promo = await promos_tool.apply_promo_code("PROMO1", 100.0)
+        customer = await customer_tool.get_customer_profile(3)
+
+        assert {"todays_orders_count", "todays_revenue", "pending_orders_count", "completed_today_count",
+                "average_order_value", "pending_orders_total", "completed_orders_total"} <= set(stats)
+        assert [item["rank"] for item in popular] == [1, 2, 3, 4, 5]
+        assert {"menu_item_name", "order_count", "total_quantity"} <= set(popular[0])
+        assert promo == {"valid": True, "discount_amount": 10.0, "final_amount": 90.0,
+                         "message": "Promo code PROMO1 applied"}
+        assert {"first_name", "last_name", "email"} <= set(customer)
@@ -0,0 +1,163 @@
+"""Tests for tracing spans and traceparent propagation (offline)"""
+
+import json
+import threading
+
+import httpx
+import pytest
+from fastmcp import Client, FastMCP
+from fastmcp.exceptions import ToolError
+
+from backend_mcp import linewriter
+from backend_mcp.config import settings
+from backend_mcp.middleware import TracingMiddleware
+from backend_mcp.tracing import FileExporter, InMemoryExporter, Tracer, tracer
+
+
+@pytest.fixture
+def exporter(monkeypatch):
+    """Record spans of the global tracer in memory"""
+    exporter = InMemoryExporter()
+    monkeypatch.setattr(tracer, "exporter", exporter)
+    return exporter
+
+
+# -----Span Tests
+class TestSpans:
+
+    def test_disabled_tracer_records_nothing(self):
+        with Tracer().start_span("work") as span:
+            assert span is None
+
+    def test_child_spans_share_the_trace(self):
+        exporter = InMemoryExporter()
+        local = Tracer(exporter)
+
+        with local.start_span("parent") as parent:
+            with local.start_span("child") as child:
+                pass
+
+        assert [span.name for span in exporter.spans] == ["child", "parent"]
+        assert child.trace_id == parent.trace_id
+        assert child.parent_id == parent.span_id
+        assert parent.parent_id is None
+
+    def test_errors_mark_the_span(self):
+        exporter = InMemoryExporter()
+
+        with pytest.raises(ValueError):
+            with Tracer(exporter).start_span("work"):
+                raise ValueError("boom")
+
+        assert exporter.spans[0].status == "ERROR"
+        assert exporter.spans[0].status_message == "boom"
+
+    def test_file_exporter_writes_json_lines(self, tmp_path):
+        path = tmp_path / "traces.jsonl"
+        local = Tracer(FileExporter(str(path)))
+
+        with local.start_span("one", answer=42):
+            pass
+        local.shutdown()
+
+        record = json.loads(path.read_text().strip())
+        assert record["name"] == "one"
+        assert record["attributes"] == {"answer": 42}
+        assert record["duration_ms"] >= 0
+
+    def test_file_exporter_writes_off_the_calling_thread(self, tmp_path, monkeypatch):
+        # -----Spans end on the event loop; serializing and writing happen on the writer thread
+        threads = []
+        dumps = linewriter.json.dumps
+
+        def recording_dumps(*args, **kwargs):
+            threads.append(threading.current_thread())
+            return dumps(*args, **kwargs)
+
+        monkeypatch.setattr(linewriter.json, "dumps", recording_dumps)
+        local = Tracer(FileExporter(str(tmp_path / "traces.jsonl")))
+        for name in ("one", "two"):
+            with local.start_span(name):
+                pass
+        local.shutdown()
+
+        assert len(threads) == 2
+        assert threading.current_thread() not in threads
+        assert len((tmp_path / "traces.jsonl").read_text().splitlines()) == 2
+
+
+# -----Backend Propagation Tests
+class TestPropagation:
+
+    @pytest.mark.asyncio
+    async def test_traceparent_is_sent_to_backend(self, exporter, mock_backend):
+        seen = []
+
+        def handler(request):
+            seen.append(request.headers.get("traceparent"))
+            return httpx.Response(200, json={"ok": True})
+
+        client = mock_backend(handler)
+        await client.get("/orders/1")
+
+        span = exporter.spans[-1]
+        assert seen == [f"00-{span.trace_id}-{span.span_id}-01"]
+        assert span.attributes["http.status_code"] == 200
+        assert span.attributes["backend.route_group"] == "orders"
+
+    @pytest.mark.asyncio
+    async def test_no_header_when_tracing_is_off(self, monkeypatch, mock_backend):
+        monkeypatch.setattr(tracer, "exporter", None)
+        seen = []
+
+        def handler(request):
+            seen.append(request.headers.get("traceparent"))
+            return httpx.Response(200, json={})
+
+        client = mock_backend(handler)
+        await client.get("/orders/1")
+
+        assert seen == [None]
+
+    @pytest.mark.asyncio
+    async def test_retries_stay_in_one_span(self, exporter, monkeypatch, mock_backend):
+        monkeypatch.setattr(settings, "retry_backoff_base", 0.0)
+        statuses = iter([503, 200])
+        client = mock_backend(lambda request: httpx.Response(next(statuses), json={}))
+
+        await client.get("/menu-items/")
+
+        assert len(exporter.spans) == 1
+        assert exporter.spans[0].attributes["backend.attempts"] == 2
+
+
+# -----Tool Call Span Tests
+class TestToolSpans:
+
+    @pytest.mark.asyncio
+    async def test_backend_spans_are_children_of_the_tool_span(self, exporter, mock_backend):
+        backend = mock_backend(lambda request: httpx.Response(200, json={}))
+        server = FastMCP(name="test", middleware=[TracingMiddleware()])
+
+        @server.tool()
+        async def two_calls() -> dict:
+            await backend.get("/orders/1")
+            await backend.get("/orders/1/journey")
+            return {}
+
+        @server.tool()
+        async def broken() -> dict:
+            raise RuntimeError("nope")
+
+        async with Client(server) as mcp_client:
+            await mcp_client.call_tool("two_calls")
+            with pytest.raises(ToolError):
+                await mcp_client.call_tool("broken")
+
+        root = next(span for span in exporter.spans if span.name == "tools/call two_calls")
+        children = [span for span in exporter.spans if span.parent_id == root.span_id]
+        assert [span.name for span in children] == ["GET /orders/1", "GET /orders/1/journey"]
+        assert all(span.trace_id == root.trace_id for span in children)
+
+        failed = next(span for span in exporter.spans if span.name == "tools/call broken")
+        assert failed.status == "ERROR"